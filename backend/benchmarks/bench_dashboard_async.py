@@ -0,0 +1,81 @@
+"""
+So sánh p50/p99 của build_dashboard ở chế độ tuần tự và async (các câu
+truy vấn gửi đồng thời) khi mỗi câu lệnh chịu thêm độ trễ mạng giả lập.
+
+Độ trễ được thêm bằng trace callback của sqlite3, chạy trong luồng đang
+thực thi câu lệnh (với aiosqlite là luồng riêng của từng connection) nên
+không chặn event loop. Chế độ async cần greenlet và aiosqlite
+(pip install -r requirements-optional.txt).
+
+    python -m benchmarks.bench_dashboard_async --latency-ms 5 --expenses 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+from sqlalchemy import event
+from benchmarks.common import create_benchmark_app, measure, summarize, print_table
+
+
+def add_latency(engine, latency_ms, driver_call=None):
+    """Ngủ `latency_ms` trước mỗi câu lệnh trên mọi connection mới của `engine`"""
+    def delay(_statement):
+        time.sleep(latency_ms / 1000)
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        if driver_call is None:
+            dbapi_connection.set_trace_callback(delay)
+        else:
+            driver_call(connection_record.driver_connection, delay)
+
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--expenses', type=int, default=5000, help='Số expense của user')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Độ trễ giả lập cho mỗi câu lệnh')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    from flask_app import db
+    from flask_app.async_db import async_db
+    from flask_app.controllers.overview import build_dashboard
+    from flask_app.seed import seed_database
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_dashboard_async.db')
+    create_benchmark_app(f'sqlite:///{path}', DASHBOARD_ASYNC=True, PASSWORD_HASH_WORKERS=0)
+    user_ids, _ = seed_database(users=1, expenses=args.expenses, incomes=args.expenses // 10,
+                                notifications=0, items=10, prefix='dashboard')
+    user_id = user_ids[0]
+
+    modes = [('sync', False)]
+    try:
+        import aiosqlite  # noqa: F401
+    except ImportError:
+        aiosqlite = None
+    if async_db.available and aiosqlite is not None:
+        modes.append(('async', True))
+    else:
+        print('Bỏ qua chế độ async: cần cài greenlet và aiosqlite (pip install -r requirements-optional.txt)')
+
+    if args.latency_ms:
+        add_latency(db.engine, args.latency_ms)
+        if len(modes) > 1:
+            from sqlalchemy.util import await_only
+
+            # Connection aiosqlite chạy trong luồng riêng, đặt callback qua API async của nó
+            add_latency(async_db.engine.sync_engine, args.latency_ms,
+                        lambda connection, delay: await_only(connection.set_trace_callback(delay)))
+
+    results = []
+    for mode, use_async in modes:
+        samples = measure(lambda: build_dashboard(user_id, use_async=use_async), args.repeat)
+        results.append({'mode': mode, 'expenses': args.expenses, 'latency_ms': args.latency_ms, **summarize(samples)})
+    print_table(results, ['mode', 'expenses', 'latency_ms', 'p50_ms', 'p99_ms', 'mean_ms'])
+    async_db.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Throughput đăng nhập khi có traffic khác chạy song song, và ảnh hưởng của
+việc băm mật khẩu lên các request còn lại trong cùng worker.
+
+Chạy ba kịch bản trên cùng server (prefork, xem benchmarks.loadtest):
+  - baseline: chỉ có traffic nền (dashboard, list)
+  - inline:   thêm các user đăng nhập liên tục, băm mật khẩu trong luồng request
+  - pool:     như inline nhưng băm trên process pool (PASSWORD_HASH_WORKERS)
+
+    python -m benchmarks.bench_login --login-users 4 --background-users 8 --duration 10
+    python -m benchmarks.bench_login --method pbkdf2:sha256:600000 --hash-workers 4
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from benchmarks.common import print_table
+from benchmarks.loadtest import PreforkServer, prepare_database, run_users, wait_until_ready
+
+BACKGROUND_MIX = {'dashboard': 1, 'list': 1}
+LOGIN_MIX = {'login': 1}
+
+
+def run_scenario(database_url, accounts, args, login_users, hash_workers):
+    overrides = {
+        'PASSWORD_HASH_METHOD': args.method,
+        'PASSWORD_HASH_WORKERS': hash_workers,
+        'PASSWORD_HASH_QUEUE_SIZE': args.queue_size,
+    }
+    server = PreforkServer(database_url, args.workers, overrides)
+    users = [(accounts[i % len(accounts)], BACKGROUND_MIX) for i in range(args.background_users)]
+    users += [(accounts[i % len(accounts)], LOGIN_MIX) for i in range(login_users)]
+    try:
+        server.start()
+        wait_until_ready(server.port)
+        return run_users(server.port, users, args.duration, args.warmup, random_seed=args.seed)
+    finally:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2, help='Số process server')
+    parser.add_argument('--hash-workers', type=int, default=2, help='Số process băm mật khẩu mỗi worker (kịch bản pool)')
+    parser.add_argument('--queue-size', type=int, default=32)
+    parser.add_argument('--method', default='scrypt', help='PASSWORD_HASH_METHOD')
+    parser.add_argument('--login-users', type=int, default=4)
+    parser.add_argument('--background-users', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-login-')
+    database_url = 'sqlite:///' + os.path.join(workdir, 'bench_login.db')
+    try:
+        accounts = prepare_database(database_url, 'small', args.seed, True, PASSWORD_HASH_METHOD=args.method)
+        scenarios = [('baseline', 0, 0), ('inline', args.login_users, 0), ('pool', args.login_users, args.hash_workers)]
+        rows = []
+        for name, login_users, hash_workers in scenarios:
+            print(f'Kịch bản {name}...', file=sys.stderr)
+            result = run_scenario(database_url, accounts, args, login_users, hash_workers)
+            login = result['routes'].get('login', {})
+            background = [result['routes'][route] for route in BACKGROUND_MIX if route in result['routes']]
+            rows.append({
+                'scenario': name,
+                'login_rps': login.get('throughput_rps', 0.0),
+                'login_p95_ms': login.get('p95_ms', 0.0),
+                'login_503': result['statuses'].get('503', 0),
+                'other_rps': round(sum(route['throughput_rps'] for route in background), 2),
+                'other_p50_ms': max((route['p50_ms'] for route in background), default=0.0),
+                'other_p95_ms': max((route['p95_ms'] for route in background), default=0.0),
+                'errors': result['errors'],
+            })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(rows, list(rows[0]))
+
+
+if __name__ == '__main__':
+    main()
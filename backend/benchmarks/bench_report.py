@@ -0,0 +1,90 @@
+"""
+So sánh ReportService.build_report với cách làm theo từng dòng (nạp mọi
+Expense/Income qua ORM rồi cộng dồn trong vòng lặp Python) trên một user có
+nhiều năm dữ liệu, và so sánh engine numpy với engine vòng lặp Python trên
+các ô (tháng, danh mục) đã đọc sẵn. Engine numpy chỉ chạy khi có cài numpy
+(pip install -r requirements-optional.txt).
+
+    python -m benchmarks.bench_report --expenses 50000 --years 5
+"""
+import argparse
+from datetime import datetime, time, timedelta
+from benchmarks.common import create_benchmark_app, measure, summarize, print_table
+
+
+def per_row_report(user_id, start, end, window):
+    """Cùng báo cáo với build_report(engine='python') nhưng đọc từng giao dịch qua ORM"""
+    from flask_app.services import report_service
+    from flask_app.services.rollup_service import TRANSACTION_MODELS, INCOME, EXPENSE
+
+    months = report_service.generate_monthly_labels(start, end)
+    first_month = start.year * 12 + start.month - 1
+    series = {}
+    for kind in (INCOME, EXPENSE):
+        model = TRANSACTION_MODELS[kind]
+        columns = ([], [], [])
+        for obj in model.query.filter(
+            model.user_id == user_id,
+            model.date >= datetime.combine(start, time.min),
+            model.date < datetime.combine(end + timedelta(days=1), time.min)
+        ):
+            columns[0].append(obj.date.year * 12 + obj.date.month - 1)
+            columns[1].append(obj.category)
+            columns[2].append(float(obj.amount))
+        series[kind] = report_service._python_series(columns, first_month, len(months), window)
+    return report_service._python_summary(series[INCOME]['totals'], series[EXPENSE]['totals'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--expenses', type=int, default=50000, help='Số expense của user')
+    parser.add_argument('--years', type=int, default=5, help='Khoảng thời gian của dữ liệu và báo cáo')
+    parser.add_argument('--window', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    from flask_app.seed import seed_database
+    from flask_app.services.report_service import ReportService, EXPENSE, np, _numpy_series, _python_series
+
+    create_benchmark_app(PASSWORD_HASH_WORKERS=0)
+    days = args.years * 365
+    user_ids, counts = seed_database(users=1, expenses=args.expenses, incomes=args.expenses // 10,
+                                     notifications=0, items=0, days=days, prefix='report')
+    user_id = user_ids[0]
+    end = datetime.utcnow().date()
+    start = (end - timedelta(days=days)).replace(day=1)
+    months = (end.year - start.year) * 12 + end.month - start.month + 1
+    first_month = start.year * 12 + start.month - 1
+    rows = counts['expenses'] + counts['incomes']
+
+    # Hai cách phải cho cùng kết quả trước khi so thời gian
+    expected = per_row_report(user_id, start, end, args.window)
+    report = ReportService.build_report(user_id, start, end, args.window, engine='python')
+    assert report['totals']['net'] == round(expected['income_total'] - expected['expense_total'], 2)
+
+    engines = [('python', _python_series)]
+    if np is not None:
+        engines.append(('numpy', _numpy_series))
+    else:
+        print('Bỏ qua engine numpy: chưa cài numpy (pip install -r requirements-optional.txt)')
+
+    results = [{
+        'engine': 'orm per-row', 'part': 'report', 'rows': rows,
+        **summarize(measure(lambda: per_row_report(user_id, start, end, args.window), args.repeat))
+    }]
+    cells = ReportService.fetch_columns(user_id, EXPENSE, start, end)
+    for engine, series in engines:
+        results.append({
+            'engine': engine, 'part': 'report', 'rows': rows,
+            **summarize(measure(lambda: ReportService.build_report(user_id, start, end, args.window, engine=engine), args.repeat))
+        })
+        results.append({
+            'engine': engine, 'part': 'compute', 'rows': len(cells[0]),
+            **summarize(measure(lambda: series(cells, first_month, months, args.window), args.repeat))
+        })
+    print(f'{months} tháng, {len(cells[0])} ô (tháng, danh mục) expense')
+    print_table(results, ['engine', 'part', 'rows', 'p50_ms', 'p99_ms', 'mean_ms'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+So sánh độ trễ tìm kiếm giữa ilike('%q%') và SearchService khi số dòng tăng.
+Với --other-users, mỗi user khác cũng có cùng số dòng (có cả từ hiếm), nên
+tổng số dòng của bảng tăng theo cả số user: độ trễ của SearchService chỉ nên
+phụ thuộc số dòng của user đang tìm.
+
+    python -m benchmarks.bench_search --sizes 1000,10000,50000 --other-users 4
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from benchmarks.common import create_benchmark_app, create_user, measure, summarize, print_table
+
+WORDS = [
+    'an', 'sang', 'trua', 'toi', 'cafe', 'tra', 'sua', 'xang', 'xe', 'grab', 'taxi', 'dien', 'nuoc',
+    'internet', 'thue', 'nha', 'sieu', 'thi', 'cho', 'quan', 'ao', 'giay', 'phim', 've', 'may', 'bay',
+    'khach', 'san', 'qua', 'sinh', 'nhat', 'thuoc', 'kham', 'benh', 'hoc', 'phi', 'sach', 'bao', 'hiem',
+]
+RARE_WORD = 'xylophone'
+RARE_MATCHES = 10
+
+
+def seed(user_id, size):
+    from flask_app import db
+    from flask_app.models.expense import Expense
+
+    rng = random.Random(size * 1000 + user_id)
+    now = datetime.utcnow()
+    rare_rows = set(rng.sample(range(size), RARE_MATCHES))
+    rows = []
+    for i in range(size):
+        words = rng.choices(WORDS, k=rng.randint(2, 6))
+        if i in rare_rows:
+            words.append(RARE_WORD)
+        rows.append({
+            'user_id': user_id,
+            'category': 'food',
+            'amount': rng.randint(10, 500) * 1000,
+            'description': ' '.join(words),
+            'date': now - timedelta(minutes=i),
+            'created_at': now,
+            'updated_at': now
+        })
+    for start in range(0, size, 5000):
+        db.session.execute(insert(Expense), rows[start:start + 5000])
+    db.session.commit()
+
+
+def run(sizes, repeat, other_users=0):
+    from flask_app import db
+    from flask_app.models.expense import Expense
+    from flask_app.services.search_service import SearchService
+
+    results = []
+    for size in sizes:
+        create_benchmark_app()
+        user = create_user()
+        seed(user.id, size)
+        for index in range(other_users):
+            seed(create_user(f'other{index}').id, size)
+        SearchService.reindex()
+        total = Expense.query.count()
+
+        def legacy(term):
+            return Expense.query.filter(
+                Expense.user_id == user.id,
+                Expense.description.ilike(f'%{term}%')
+            ).limit(20).all()
+
+        for label, term in (('rare', RARE_WORD), ('common', 'cafe'), ('prefix', 'xylo')):
+            for name, fn in (
+                ('ilike', lambda: legacy(term)),
+                (SearchService.backend(), lambda: SearchService.search(user.id, term, 'expenses', 20)),
+            ):
+                stats = summarize(measure(fn, repeat))
+                results.append({'rows': size, 'total_rows': total, 'query': label, 'impl': name, **stats})
+        db.session.remove()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,50000', help='Số expense của user được tìm')
+    parser.add_argument('--other-users', type=int, default=0, help='Số user khác có cùng số expense')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    results = run([int(size) for size in args.sizes.split(',')], args.repeat, args.other_users)
+    print_table(results, ['rows', 'total_rows', 'query', 'impl', 'p50_ms', 'p99_ms', 'mean_ms'])
+
+
+if __name__ == '__main__':
+    main()
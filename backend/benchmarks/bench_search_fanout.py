@@ -0,0 +1,75 @@
+"""
+So sánh p50/p99 của search_all ở chế độ tuần tự và song song.
+
+Dùng SQLite trên file (mỗi luồng cần connection riêng) và có thể giả lập
+độ trễ mạng tới database bằng --latency-ms (ngủ trước mỗi câu lệnh).
+
+    python -m benchmarks.bench_search_fanout --rows 5000 --latency-ms 2
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert
+from benchmarks.common import create_benchmark_app, create_user, measure, summarize, print_table
+
+WORDS = ['an', 'sang', 'cafe', 'xang', 'xe', 'dien', 'nuoc', 'thue', 'nha', 'sieu', 'thi', 'phim', 'luong', 'thuong']
+
+
+def seed(user_id, rows):
+    from flask_app import db
+    from flask_app.models import Expense, Income, Notification, UserItem
+    from flask_app.services.search_service import SearchService
+
+    rng = random.Random(rows)
+    now = datetime.utcnow()
+
+    def text(k=4):
+        return ' '.join(rng.choices(WORDS, k=k))
+
+    tables = {
+        Expense: lambda i: {'category': 'food', 'amount': 1000, 'description': text(), 'date': now - timedelta(hours=i)},
+        Income: lambda i: {'category': 'salary', 'amount': 1000, 'description': text(), 'date': now - timedelta(hours=i)},
+        Notification: lambda i: {'title': text(2), 'description': text(), 'is_read': False},
+        UserItem: lambda i: {'name': text(2), 'balance': 1000},
+    }
+    for model, make_row in tables.items():
+        data = [{'user_id': user_id, 'created_at': now, 'updated_at': now, **make_row(i)} for i in range(rows)]
+        for start in range(0, rows, 5000):
+            db.session.execute(insert(model), data[start:start + 5000])
+    db.session.commit()
+    SearchService.reindex(user_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000, help='Số dòng mỗi bảng')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='Độ trễ giả lập cho mỗi câu lệnh')
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--query', default='cafe')
+    args = parser.parse_args()
+
+    from flask_app import db
+    from flask_app.controllers.search import search_tables
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_search_fanout.db')
+    app = create_benchmark_app(f'sqlite:///{path}', SEARCH_WORKERS=4)
+    user = create_user()
+    seed(user.id, args.rows)
+
+    if args.latency_ms:
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def inject_latency(*_):
+            time.sleep(args.latency_ms / 1000)
+
+    results = []
+    for mode, parallel in (('serial', False), ('parallel', True)):
+        samples = measure(lambda: search_tables(user.id, args.query, 20, 0, parallel=parallel), args.repeat)
+        results.append({'mode': mode, 'rows': args.rows, 'latency_ms': args.latency_ms, **summarize(samples)})
+    print_table(results, ['mode', 'rows', 'latency_ms', 'p50_ms', 'p99_ms', 'mean_ms'])
+
+
+if __name__ == '__main__':
+    main()
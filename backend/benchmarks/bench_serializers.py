@@ -0,0 +1,86 @@
+"""
+So sánh marshmallow Schema.dump với serializer biên dịch sẵn (schemas.compiled)
+và JSON provider mặc định của Flask với FastJSONProvider (orjson nếu có cài,
+xem requirements-optional.txt).
+
+Trước khi đo, kiểm tra output của hai cách serialize giống hệt nhau theo byte.
+
+    python -m benchmarks.bench_serializers --rows 1000,10000
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from benchmarks.common import create_benchmark_app, create_user, measure, summarize, print_table
+
+
+def seed(user_id, rows):
+    from flask_app import db
+    from flask_app.models import Expense, Income, Notification, UserItem
+
+    rng = random.Random(rows)
+    now = datetime.utcnow()
+    tables = {
+        Expense: lambda i: {'category': 'food', 'amount': rng.randint(1, 10 ** 6) / 100, 'description': f'Chi tiêu {i}', 'date': now - timedelta(hours=i)},
+        Income: lambda i: {'category': 'salary', 'amount': rng.randint(1, 10 ** 6) / 100, 'description': f'Thu nhập {i}', 'date': now - timedelta(hours=i)},
+        Notification: lambda i: {'title': f'Thông báo {i}', 'description': 'Nội dung', 'is_read': bool(i % 2)},
+        UserItem: lambda i: {'name': f'Món đồ {i}', 'status': 'borrowed', 'quantity': i, 'balance': i * 1.5, 'deposit': None},
+    }
+    for model, make_row in tables.items():
+        data = [{'user_id': user_id, 'created_at': now, 'updated_at': now, **make_row(i)} for i in range(rows)]
+        for start in range(0, rows, 5000):
+            db.session.execute(insert(model), data[start:start + 5000])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', default='1000,10000')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    from flask_app import db
+    from flask_app.json_provider import FastJSONProvider, orjson
+    from flask_app.models import Expense, Income, Notification, UserItem
+    from flask_app.schemas import expenses_schema, incomes_schema, notifications_schema, user_items_schema
+    from flask_app.schemas.compiled import (
+        expenses_serializer, incomes_serializer, notifications_serializer, user_items_serializer
+    )
+
+    cases = (
+        ('expenses', Expense, expenses_schema, expenses_serializer),
+        ('incomes', Income, incomes_schema, incomes_serializer),
+        ('notifications', Notification, notifications_schema, notifications_serializer),
+        ('user_items', UserItem, user_items_schema, user_items_serializer),
+    )
+
+    results = []
+    for rows in [int(size) for size in args.rows.split(',')]:
+        app = create_benchmark_app()
+        default_json = DefaultJSONProvider(app)
+        fast_json = FastJSONProvider(app)
+        user = create_user()
+        seed(user.id, rows)
+
+        for name, model, schema, serializer in cases:
+            objs = model.query.filter_by(user_id=user.id).all()
+
+            expected = default_json.dumps(schema.dump(objs))
+            if default_json.dumps(serializer.dump(objs)) != expected:
+                raise SystemExit(f'{name}: output của serializer biên dịch khác Schema.dump')
+
+            for impl, fn in (
+                ('Schema.dump', lambda: schema.dump(objs)),
+                ('compiled', lambda: serializer.dump(objs)),
+                ('Schema.dump + json', lambda: default_json.response(schema.dump(objs))),
+                ('compiled + ' + ('orjson' if orjson else 'json'), lambda: fast_json.response(serializer.dump(objs))),
+            ):
+                results.append({'rows': rows, 'schema': name, 'impl': impl, **summarize(measure(fn, args.repeat))})
+        db.session.remove()
+
+    print_table(results, ['rows', 'schema', 'impl', 'p50_ms', 'p99_ms', 'mean_ms'])
+
+
+if __name__ == '__main__':
+    main()
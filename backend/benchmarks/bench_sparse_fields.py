@@ -0,0 +1,107 @@
+"""
+So sánh danh sách expense đầy đủ (entity ORM) với sparse fieldset
+(?fields=id,amount,date,category -> Core select chỉ các cột đó).
+
+Đo độ trễ của một trang (service + serializer) và bộ nhớ đỉnh (tracemalloc)
+khi đọc toàn bộ lịch sử của một user có nhiều dòng.
+
+    python -m benchmarks.bench_sparse_fields --rows 100000 --limit 500
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from benchmarks.common import create_benchmark_app, create_user, measure, summarize, print_table
+
+FIELDS = ('id', 'amount', 'date', 'category')
+
+
+def seed(user_id, rows, description_length):
+    from flask_app import db
+    from flask_app.models.expense import Expense
+
+    rng = random.Random(rows)
+    now = datetime.utcnow()
+    text = 'chi tiêu hàng ngày ' * (description_length // 19 + 1)
+    data = [{
+        'user_id': user_id,
+        'category': rng.choice(('food', 'transport', 'bill')),
+        'amount': rng.randint(1, 10 ** 6) / 100,
+        'description': text[:description_length],
+        'date': now - timedelta(minutes=i),
+        'created_at': now,
+        'updated_at': now
+    } for i in range(rows)]
+    for start in range(0, rows, 5000):
+        db.session.execute(insert(Expense), data[start:start + 5000])
+    db.session.commit()
+
+
+def peak_memory(fn):
+    """Bộ nhớ đỉnh (MB) khi chạy fn, session được dọn trước và sau"""
+    from flask_app import db
+
+    db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.session.remove()
+    return round(peak / 1024 / 1024, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--limit', type=int, default=500)
+    parser.add_argument('--description-length', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    from flask_app import db
+    from flask_app.models.expense import Expense
+    from flask_app.services.expense_service import ExpenseService
+    from flask_app.schemas.compiled import expenses_serializer
+    from flask_app.utils import select_columns
+
+    create_benchmark_app(MAX_PAGE_SIZE=args.limit)
+    user_id = create_user().id
+    seed(user_id, args.rows, args.description_length)
+
+    def page(fields):
+        def run():
+            items, _ = ExpenseService.get_expenses_page(user_id, None, args.limit, fields)
+            return expenses_serializer.only(fields).dump(items)
+        return run
+
+    def full_history(fields):
+        def run():
+            db.session.remove()
+            if fields:
+                stmt = select_columns(Expense, fields).where(Expense.user_id == user_id)
+                return expenses_serializer.only(fields).dump(db.session.execute(stmt).all())
+            return expenses_serializer.dump(Expense.query.filter_by(user_id=user_id).all())
+        return run
+
+    results = []
+    for name, fields in (('full entity', None), ('fields=' + ','.join(FIELDS), FIELDS)):
+        def clean_page(fields=fields):
+            db.session.remove()
+            return page(fields)()
+
+        results.append({
+            'impl': name,
+            'page_p50_ms': summarize(measure(clean_page, args.repeat))['p50_ms'],
+            'page_peak_mb': peak_memory(page(fields)),
+            'history_ms': summarize(measure(full_history(fields), 3, warmup=1))['p50_ms'],
+            'history_peak_mb': peak_memory(full_history(fields)),
+        })
+    print(f'{args.rows} dòng, description {args.description_length} ký tự, trang {args.limit} dòng')
+    print_table(results, ['impl', 'page_p50_ms', 'page_peak_mb', 'history_ms', 'history_peak_mb'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Tiện ích dùng chung cho các benchmark: app chạy trên SQLite riêng,
+đo thời gian và tính phân vị.
+
+Chạy từ thư mục backend, ví dụ: python -m benchmarks.bench_search
+"""
+import os
+import time
+from config import Config
+
+
+class BenchmarkConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.getenv('BENCHMARK_DATABASE_URL', 'sqlite://')
+    SQLALCHEMY_ECHO = False
+    JWT_SECRET_KEY = 'benchmark'
+    TESTING = True
+
+
+def create_benchmark_app(database_url=None, **overrides):
+    """Tạo app với database trống (mặc định SQLite in-memory) và đẩy app context"""
+    from flask_app import create_app, db
+
+    attributes = dict(overrides)
+    if database_url:
+        attributes['SQLALCHEMY_DATABASE_URI'] = database_url
+    config_class = type('BenchmarkRunConfig', (BenchmarkConfig,), attributes)
+
+    app = create_app(config_class)
+    app.app_context().push()
+    db.drop_all()
+    db.create_all()
+    return app
+
+
+def create_user(username='benchmark'):
+    from flask_app import db
+    from flask_app.models.user import User
+
+    user = User(username=username, email=f'{username}@example.com', password_hash='-')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def measure(fn, repeat=50, warmup=3):
+    """Gọi fn `repeat` lần, trả về danh sách thời gian (giây)"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """p50/p99/mean tính bằng mili giây"""
+    return {
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+def print_table(rows, columns):
+    widths = [max(len(str(column)), *(len(str(row.get(column, ''))) for row in rows)) for column in columns]
+    print('  '.join(str(column).ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print('  '.join(str(row.get(column, '')).ljust(width) for column, width in zip(columns, widths)))
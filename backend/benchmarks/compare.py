@@ -0,0 +1,76 @@
+"""
+So sánh hai file kết quả của benchmarks.suite theo từng (case, scale).
+Thoát với mã 1 nếu có case chậm hơn quá ngưỡng, dùng được trong CI.
+Trên máy dùng chung (nhiễu lớn), --metric min_ms ổn định hơn p50_ms.
+
+    python -m benchmarks.compare benchmarks/results/abc123.json benchmarks/results/def456.json --threshold 10
+"""
+import argparse
+import json
+from benchmarks.common import print_table
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    return report['meta'], {(row['case'], row['scale']): row for row in report['results']}
+
+
+def compare(base, new, metric='p50_ms', threshold=10.0, min_delta_ms=0.05):
+    """
+    Danh sách dòng so sánh; một case bị coi là chậm đi (regression) khi
+    chênh lệch vượt `threshold` phần trăm và lớn hơn `min_delta_ms` (nhiễu).
+    """
+    rows = []
+    for key in sorted(base.keys() | new.keys()):
+        case, scale = key
+        if key not in base or key not in new:
+            rows.append({'case': case, 'scale': scale, 'status': 'mới' if key in new else 'bị bỏ'})
+            continue
+        before, after = base[key][metric], new[key][metric]
+        delta = after - before
+        change = delta / before * 100 if before else 0.0
+        if abs(delta) < min_delta_ms or abs(change) < threshold:
+            status = ''
+        else:
+            status = 'CHẬM HƠN' if delta > 0 else 'nhanh hơn'
+        rows.append({
+            'case': case,
+            'scale': scale,
+            'base': before,
+            'new': after,
+            'change': f'{change:+.1f}%',
+            'status': status,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--metric', default='p50_ms', choices=['p50_ms', 'p90_ms', 'p99_ms', 'mean_ms', 'min_ms'])
+    parser.add_argument('--threshold', type=float, default=10.0, help='Phần trăm chậm đi tối đa cho phép')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help='Bỏ qua chênh lệch nhỏ hơn giá trị này')
+    parser.add_argument('--all', action='store_true', help='In cả các case không thay đổi')
+    args = parser.parse_args()
+
+    base_meta, base = load(args.base)
+    new_meta, new = load(args.new)
+    rows = compare(base, new, args.metric, args.threshold, args.min_delta_ms)
+
+    print(f'{base_meta["revision"]} -> {new_meta["revision"]} ({args.metric}, ngưỡng {args.threshold}%)')
+    shown = rows if args.all else [row for row in rows if row['status'] and 'base' in row]
+    if shown:
+        print_table(shown, ['scale', 'case', 'base', 'new', 'change', 'status'])
+    unmatched = sum(1 for row in rows if 'base' not in row)
+    if unmatched and not args.all:
+        print(f'{unmatched} case chỉ có ở một trong hai file (dùng --all để xem).')
+    regressions = [row for row in rows if row['status'] == 'CHẬM HƠN']
+    print(f'{len(regressions)} case chậm hơn, {sum(1 for row in rows if row["status"] == "nhanh hơn")} case nhanh hơn.')
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,403 @@
+"""
+Load test end-to-end: chạy create_app() trên database đã seed (mặc định file
+SQLite, chế độ WAL) dưới một WSGI server nhiều worker, rồi cho nhiều virtual
+user đã đăng nhập (JWT tạo bằng create_access_token) gửi một tỉ lệ request
+login/dashboard/list/create/search ở các mức đồng thời tăng dần.
+
+Báo cáo throughput, p50/p95/p99 và tỉ lệ lỗi theo route cho mỗi mức, ghi ra
+JSON (mặc định benchmarks/results/loadtest-<commit>.json).
+
+    python -m benchmarks.loadtest --workers 4 --concurrency 1,4,16,64 --duration 10
+    python -m benchmarks.loadtest --mix dashboard=5,list=3,search=2 --scale medium
+    python -m benchmarks.loadtest --server gunicorn --threads 8   # nếu có cài gunicorn
+
+Server mặc định (prefork) là các process con của werkzeug dùng chung một
+socket đã bind sẵn, mỗi process xử lý request bằng nhiều luồng.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.client import HTTPConnection, HTTPException
+from config import Config
+from benchmarks.common import percentile, print_table
+from benchmarks.suite import SCALES, RESULTS_DIR, git_revision
+
+SEARCH_TERMS = ['an', 'cafe', 'grab', 'tien dien', 'luong', 'sach', 'thuoc']
+DEFAULT_MIX = 'login=1,dashboard=4,list=4,create=2,search=2'
+
+
+class LoadTestConfig(Config):
+    SQLALCHEMY_ECHO = False
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY') or 'loadtest'
+
+
+def make_config(database_url, **overrides):
+    return type('LoadTestRunConfig', (LoadTestConfig,), {'SQLALCHEMY_DATABASE_URI': database_url, **overrides})
+
+
+# --- Các loại request -------------------------------------------------------
+# Mỗi action nhận (account, rng) và trả về (method, path, body, cần JWT)
+
+def _login(account, rng):
+    return 'POST', '/api/auth/login', {'username': account['username'], 'password': account['password']}, False
+
+
+def _dashboard(account, rng):
+    return 'GET', '/api/overview/dashboard', None, True
+
+
+def _list(account, rng):
+    return 'GET', '/api/expenses/?limit=50', None, True
+
+
+def _create(account, rng):
+    body = {'category': rng.choice(['food', 'transport', 'bill']), 'amount': rng.randint(10, 500) * 1000, 'description': 'load test'}
+    return 'POST', '/api/expenses/', body, True
+
+
+def _search(account, rng):
+    return 'GET', '/api/search/?q=' + rng.choice(SEARCH_TERMS).replace(' ', '+'), None, True
+
+
+ACTIONS = {
+    'login': _login,
+    'dashboard': _dashboard,
+    'list': _list,
+    'create': _create,
+    'search': _search,
+}
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ACTIONS:
+            raise ValueError(f'Route không hợp lệ trong --mix: {name} (chọn {", ".join(ACTIONS)})')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# --- Chuẩn bị database và tài khoản -----------------------------------------
+
+def prepare_database(database_url, scale, random_seed, seed, **overrides):
+    """Seed database (nếu `seed`) và trả về danh sách tài khoản kèm JWT"""
+    from flask_jwt_extended import create_access_token
+    from flask_app import create_app, db
+    from flask_app.models import User
+    from flask_app.seed import seed_database, SEED_PASSWORD
+
+    # Băm mật khẩu ngay trong process cha: không để lại process pool trước khi fork
+    app = create_app(make_config(database_url, **overrides, PASSWORD_HASH_WORKERS=0))
+    with app.app_context():
+        db.create_all()
+        if seed:
+            user_ids, counts = seed_database(**SCALES[scale], seed=random_seed, prefix='load')
+            print('Seed: ' + ', '.join(f'{count} {table}' for table, count in counts.items()), file=sys.stderr)
+            users = User.query.filter(User.id.in_(user_ids)).order_by(User.id).all()
+        else:
+            users = User.query.order_by(User.id).limit(100).all()
+        if not users:
+            raise SystemExit('Database không có user nào, bỏ --no-seed để sinh dữ liệu')
+
+        if db.engine.dialect.name == 'sqlite':
+            # WAL cho phép nhiều process đọc trong khi một process ghi
+            with db.engine.connect() as connection:
+                connection.exec_driver_sql('PRAGMA journal_mode=WAL')
+
+        accounts = [{
+            'username': user.username,
+            'password': SEED_PASSWORD,
+            'token': create_access_token(identity=str(user.id), expires_delta=False),
+        } for user in users]
+        # Không để process con thừa hưởng connection của process cha
+        db.engine.dispose()
+    return accounts
+
+
+# --- Server -----------------------------------------------------------------
+
+def _serve(fd, database_url, overrides):
+    from werkzeug.serving import make_server
+    from flask_app import create_app
+    from flask_app.hashing import password_hasher
+
+    # SIGTERM thoát qua finally để dừng cả process pool băm mật khẩu
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = create_app(make_config(database_url, **overrides))
+    try:
+        make_server('127.0.0.1', 0, app, threaded=True, fd=fd).serve_forever()
+    finally:
+        password_hasher.shutdown(wait=True)
+
+
+class PreforkServer:
+    """Bind một socket rồi fork `workers` process, mỗi process là một ThreadedWSGIServer trên socket đó"""
+
+    def __init__(self, database_url, workers, overrides=None):
+        self.database_url = database_url
+        self.workers = workers
+        self.overrides = overrides or {}
+        self.processes = []
+        self.socket = None
+        self.port = None
+
+    def start(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen(1024)
+        self.port = self.socket.getsockname()[1]
+
+        context = multiprocessing.get_context('fork')
+        for _ in range(self.workers):
+            # Không đặt daemon: process daemon không được tạo process con (pool băm mật khẩu)
+            process = context.Process(target=_serve, args=(self.socket.fileno(), self.database_url, self.overrides))
+            process.start()
+            self.processes.append(process)
+
+    def stop(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+        if self.socket is not None:
+            self.socket.close()
+
+
+class GunicornServer:
+    def __init__(self, database_url, workers, threads):
+        self.database_url = database_url
+        self.workers = workers
+        self.threads = threads
+        self.process = None
+        self.port = None
+
+    def start(self):
+        executable = shutil.which('gunicorn')
+        if executable is None:
+            raise SystemExit('Không tìm thấy gunicorn, dùng --server prefork')
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            self.port = probe.getsockname()[1]
+        env = dict(os.environ, DATABASE_URL=self.database_url, JWT_SECRET_KEY=LoadTestConfig.JWT_SECRET_KEY)
+        self.process = subprocess.Popen([
+            executable, '--workers', str(self.workers), '--threads', str(self.threads),
+            '--bind', f'127.0.0.1:{self.port}', '--log-level', 'warning', 'flask_app:create_app()'
+        ], env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(10)
+
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/healthz')
+            if connection.getresponse().status == 200:
+                return
+        except (OSError, HTTPException):
+            time.sleep(0.2)
+    raise SystemExit(f'Server không sẵn sàng sau {timeout}s')
+
+
+# --- Virtual user -----------------------------------------------------------
+
+def virtual_user(port, account, names, weights, stop_at, think_time, rng, samples):
+    connection = HTTPConnection('127.0.0.1', port, timeout=60)
+    while time.monotonic() < stop_at:
+        name = rng.choices(names, weights)[0]
+        method, path, body, needs_auth = ACTIONS[name](account, rng)
+        headers = {'Content-Type': 'application/json'}
+        if needs_auth:
+            headers['Authorization'] = 'Bearer ' + account['token']
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+
+        started = time.monotonic()
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+            if response.will_close:
+                connection.close()
+        except (OSError, HTTPException):
+            status = 0
+            connection.close()
+        samples.append((name, status, time.perf_counter() - start, started))
+        if think_time:
+            time.sleep(rng.expovariate(1 / think_time))
+    connection.close()
+
+
+def _latency_summary(latencies, errors, duration):
+    count = len(latencies)
+    return {
+        'requests': count,
+        'throughput_rps': round(count / duration, 2),
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'mean_ms': round(sum(latencies) / count * 1000, 2) if count else 0.0,
+    }
+
+
+def run_users(port, users, duration, warmup, think_time=0, random_seed=42):
+    """
+    Chạy mỗi phần tử (account, mix) của `users` trên một luồng trong
+    warmup + duration giây; chỉ tính các request bắt đầu sau warmup.
+    Trả về tổng hợp chung, theo mã trạng thái và theo route.
+    """
+    started = time.monotonic()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+    buckets = [[] for _ in users]
+    threads = [
+        threading.Thread(target=virtual_user, args=(
+            port, account, list(mix), list(mix.values()), stop_at, think_time,
+            random.Random(random_seed * 1000 + i), buckets[i]
+        ), daemon=True)
+        for i, (account, mix) in enumerate(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    by_route = defaultdict(lambda: ([], [0]))
+    statuses = defaultdict(int)
+    for bucket in buckets:
+        for name, status, latency, request_started in bucket:
+            if request_started < measure_from or request_started >= stop_at:
+                continue
+            latencies, errors = by_route[name]
+            latencies.append(latency)
+            statuses[status] += 1
+            if status == 0 or status >= 400:
+                errors[0] += 1
+
+    all_latencies = [latency for latencies, _ in by_route.values() for latency in latencies]
+    all_errors = sum(errors[0] for _, errors in by_route.values())
+    return {
+        **_latency_summary(all_latencies, all_errors, duration),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'routes': {
+            name: _latency_summary(latencies, errors[0], duration)
+            for name, (latencies, errors) in sorted(by_route.items())
+        },
+    }
+
+
+def run_level(port, accounts, mix, concurrency, duration, warmup, think_time, random_seed):
+    """`concurrency` virtual user cùng dùng tỉ lệ route `mix`"""
+    users = [(accounts[i % len(accounts)], mix) for i in range(concurrency)]
+    return {
+        'concurrency': concurrency,
+        'duration_s': duration,
+        **run_users(port, users, duration, warmup, think_time, random_seed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', default='1,4,16,32', help='Các mức số virtual user, phân tách bằng dấu phẩy')
+    parser.add_argument('--duration', type=float, default=10, help='Số giây đo ở mỗi mức')
+    parser.add_argument('--warmup', type=float, default=2, help='Số giây chạy trước khi bắt đầu đo ở mỗi mức')
+    parser.add_argument('--think-time', type=float, default=0, help='Thời gian nghỉ trung bình giữa hai request (giây)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Tỉ lệ các route (mặc định {DEFAULT_MIX})')
+    parser.add_argument('--server', choices=['prefork', 'gunicorn'], default='prefork')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--threads', type=int, default=8, help='Số luồng mỗi worker (gunicorn)')
+    parser.add_argument('--scale', choices=list(SCALES), default='small', help='Quy mô dữ liệu seed')
+    parser.add_argument('--database-url', help='Mặc định file SQLite tạm')
+    parser.add_argument('--no-seed', action='store_true', help='Dùng dữ liệu sẵn có trong --database-url')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='File JSON kết quả')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+        levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    except ValueError as e:
+        parser.error(str(e))
+
+    workdir = None
+    database_url = args.database_url
+    if database_url is None:
+        workdir = tempfile.mkdtemp(prefix='loadtest-')
+        database_url = 'sqlite:///' + os.path.join(workdir, 'loadtest.db')
+
+    accounts = prepare_database(database_url, args.scale, args.seed, not args.no_seed)
+    if args.server == 'gunicorn':
+        server = GunicornServer(database_url, args.workers, args.threads)
+    else:
+        server = PreforkServer(database_url, args.workers)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'server': args.server,
+            'workers': args.workers,
+            'threads': args.threads if args.server == 'gunicorn' else None,
+            'database': database_url.split('://')[0],
+            'scale': None if args.no_seed else args.scale,
+            'accounts': len(accounts),
+            'mix': mix,
+            'duration_s': args.duration,
+            'warmup_s': args.warmup,
+            'think_time_s': args.think_time,
+        },
+        'levels': [],
+    }
+    try:
+        server.start()
+        wait_until_ready(server.port)
+        for concurrency in levels:
+            print(f'Mức {concurrency} virtual user...', file=sys.stderr)
+            report['levels'].append(run_level(
+                server.port, accounts, mix, concurrency, args.duration, args.warmup, args.think_time, args.seed
+            ))
+    finally:
+        server.stop()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'loadtest-{report["meta"]["revision"]}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    rows = []
+    for level in report['levels']:
+        rows.append({'concurrency': level['concurrency'], 'route': '(tổng)', **level})
+        rows.extend({'concurrency': level['concurrency'], 'route': name, **summary} for name, summary in level['routes'].items())
+    print_table(rows, ['concurrency', 'route', 'requests', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'error_rate'])
+    print(f'Đã ghi {output}')
+
+
+if __name__ == '__main__':
+    main()
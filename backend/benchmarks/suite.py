@@ -0,0 +1,895 @@
+"""
+Bộ benchmark cho mọi phương thức của các *Service, dump của mọi schema,
+search_all và get_dashboard ở nhiều quy mô dữ liệu (sinh bằng flask_app.seed).
+Kết quả được ghi ra JSON để so sánh giữa các commit bằng benchmarks.compare.
+
+    python -m benchmarks.suite --scales small,medium
+    python -m benchmarks.suite --scales small -k 'ExpenseService.*' -k 'get_dashboard*'
+    python -m benchmarks.compare benchmarks/results/<cũ>.json benchmarks/results/<mới>.json
+
+Các case ghi dữ liệu nhưng không tự commit (apply_*, track, index...) được
+rollback sau mỗi lần gọi, thời gian đo bao gồm cả rollback.
+"""
+import argparse
+import fnmatch
+import gc
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from benchmarks.common import create_benchmark_app, measure, percentile, summarize, print_table
+
+SCALES = {
+    'small': {'users': 5, 'expenses': 200, 'incomes': 40, 'notifications': 40, 'items': 10},
+    'medium': {'users': 10, 'expenses': 2000, 'incomes': 200, 'notifications': 200, 'items': 50},
+    'large': {'users': 20, 'expenses': 10000, 'incomes': 1000, 'notifications': 1000, 'items': 200},
+}
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+CASES = []
+
+
+class Case:
+    def __init__(self, name, setup, rounds=None):
+        self.name = name
+        self.setup = setup
+        self.rounds = rounds
+
+
+def case(name, rounds=None):
+    """
+    Đăng ký một case. Hàm được trang trí nhận BenchContext, chuẩn bị dữ liệu
+    và trả về hàm sẽ được đo (gọi ctx.calls lần). `rounds` giới hạn số lần
+    đo cho các case chậm.
+    """
+    def decorator(setup):
+        CASES.append(Case(name, setup, rounds))
+        return setup
+    return decorator
+
+
+class BenchContext:
+    """Dữ liệu dùng chung cho các case của một quy mô: user nhiều dữ liệu nhất và một dòng mẫu mỗi bảng"""
+
+    def __init__(self, app, user_id, rounds, warmup):
+        from flask_jwt_extended import create_access_token
+        from flask_app.models import User, Expense, Income, Notification, UserItem
+
+        self.app = app
+        self.client = app.test_client()
+        self.user_id = user_id
+        self.username = User.query.get(user_id).username
+        self.headers = {'Authorization': 'Bearer ' + create_access_token(identity=str(user_id))}
+        self.rounds = rounds
+        self.warmup = warmup
+        self.now = datetime.utcnow()
+        self.sample_ids = {
+            model: model.query.filter_by(user_id=user_id).order_by(model.id.desc()).first().id
+            for model in (Expense, Income, Notification, UserItem)
+        }
+        self._counter = itertools.count()
+
+    @property
+    def calls(self):
+        return self.rounds + self.warmup
+
+    def unique(self, prefix):
+        return f'{prefix}{next(self._counter)}'
+
+
+def _rollback_after(fn):
+    from flask_app import db
+
+    def run():
+        fn()
+        db.session.rollback()
+    return run
+
+
+def _pop_each(items, fn):
+    """Mỗi lần gọi dùng một phần tử mới (cho các case xóa/đổi trạng thái không lặp lại được)"""
+    iterator = iter(items)
+    return lambda: fn(next(iterator))
+
+
+# --- Expense / Income -------------------------------------------------------
+
+def _register_transaction_cases(service_name, kind, category, other_category):
+    def service():
+        module = importlib.import_module(f'flask_app.services.{kind}_service')
+        return getattr(module, service_name)
+
+    def model():
+        from flask_app.models import Expense, Income
+        return Expense if kind == 'expense' else Income
+
+    @case(f'{service_name}.create_{kind}')
+    def create(ctx):
+        create_fn = getattr(service(), f'create_{kind}')
+        return lambda: create_fn(ctx.user_id, category, 50000, 'benchmark', ctx.now)
+
+    @case(f'{service_name}.get_{kind}_by_id')
+    def get_by_id(ctx):
+        get_fn = getattr(service(), f'get_{kind}_by_id')
+        return lambda: get_fn(ctx.sample_ids[model()], ctx.user_id)
+
+    @case(f'{service_name}.get_all_{kind}s', rounds=5)
+    def get_all(ctx):
+        return lambda: getattr(service(), f'get_all_{kind}s')(ctx.user_id)
+
+    @case(f'{service_name}.get_{kind}s_page')
+    def get_page(ctx):
+        return lambda: getattr(service(), f'get_{kind}s_page')(ctx.user_id, None, 50)
+
+    @case(f'{service_name}.get_{kind}s_page[fields]')
+    def get_page_fields(ctx):
+        fields = ('id', 'amount', 'date', 'category')
+        return lambda: getattr(service(), f'get_{kind}s_page')(ctx.user_id, None, 50, fields)
+
+    def filters(ctx, **extra):
+        from flask_app.utils import date_window
+        start, end = date_window(ctx.now.date() - timedelta(days=90), ctx.now.date())
+        return {'start': start, 'end': end, **extra}
+
+    @case(f'{service_name}.get_{kind}s_page[filtered]')
+    def get_page_filtered(ctx):
+        window = filters(ctx, categories=(category,), min_amount=10000)
+        return lambda: getattr(service(), f'get_{kind}s_page')(ctx.user_id, None, 50, None, window)
+
+    @case(f'{service_name}.get_{kind}s_summary[rollup]')
+    def summary_rollup(ctx):
+        window = filters(ctx)
+        return lambda: getattr(service(), f'get_{kind}s_summary')(ctx.user_id, window)
+
+    @case(f'{service_name}.get_{kind}s_summary[scan]')
+    def summary_scan(ctx):
+        window = filters(ctx, categories=(category,), min_amount=10000)
+        return lambda: getattr(service(), f'get_{kind}s_summary')(ctx.user_id, window)
+
+    @case(f'{service_name}.update_{kind}')
+    def update(ctx):
+        update_fn = getattr(service(), f'update_{kind}')
+        amounts = itertools.cycle((1000, 2000))
+        return lambda: update_fn(ctx.sample_ids[model()], ctx.user_id, amount=next(amounts))
+
+    @case(f'{service_name}.delete_{kind}')
+    def delete(ctx):
+        create_fn = getattr(service(), f'create_{kind}')
+        delete_fn = getattr(service(), f'delete_{kind}')
+        ids = [create_fn(ctx.user_id, category, 1000, 'benchmark', ctx.now).id for _ in range(ctx.calls)]
+        return _pop_each(ids, lambda row_id: delete_fn(row_id, ctx.user_id))
+
+    @case(f'{service_name}.get_{kind}s_by_time_period')
+    def by_time_period(ctx):
+        period_fn = getattr(service(), f'get_{kind}s_by_time_period')
+        return lambda: period_fn(ctx.user_id, ctx.now - timedelta(days=30), ctx.now)
+
+    @case(f'BulkService.delete_transactions[{kind}]')
+    def bulk_delete(ctx):
+        from flask_app.services.bulk_service import BulkService
+        create_fn = getattr(service(), f'create_{kind}')
+        batches = [[create_fn(ctx.user_id, category, 1000, 'bulk', ctx.now).id for _ in range(20)] for _ in range(ctx.calls)]
+        return _pop_each(batches, lambda ids: BulkService.delete_transactions(model(), ctx.user_id, ids))
+
+    @case(f'BulkService.recategorize[{kind}]')
+    def recategorize(ctx):
+        from flask_app.services.bulk_service import BulkService
+        ids = [row.id for row in model().query.filter_by(user_id=ctx.user_id).order_by(model().id).limit(50)]
+        categories = itertools.cycle((other_category, category))
+        return lambda: BulkService.recategorize(model(), ctx.user_id, next(categories), ids=ids)
+
+    @case(f'ImportService.import_rows[{kind}]')
+    def import_rows(ctx):
+        from flask_app.schemas import expense_schema, income_schema
+        from flask_app.services.import_service import ImportService
+        schema = expense_schema if kind == 'expense' else income_schema
+
+        def run():
+            batch = ctx.unique('import')
+            rows = [(i, {
+                'category': category,
+                'amount': 1000 + i,
+                'description': f'{batch} {i}',
+                'date': ctx.now.isoformat()
+            }) for i in range(100)]
+            return ImportService.import_rows(model(), schema, ctx.user_id, rows)
+        return run
+
+
+_register_transaction_cases('ExpenseService', 'expense', 'food', 'other')
+_register_transaction_cases('IncomeService', 'income', 'salary', 'other')
+
+
+# --- Notification -----------------------------------------------------------
+
+def _create_notifications(ctx, count):
+    from flask_app.services.notification_service import NotificationService
+    return [NotificationService.create_notification(ctx.user_id, 'Benchmark', 'Nội dung').id for _ in range(count)]
+
+
+@case('NotificationService.create_notification')
+def _create_notification(ctx):
+    from flask_app.services.notification_service import NotificationService
+    return lambda: NotificationService.create_notification(ctx.user_id, 'Benchmark', 'Nội dung')
+
+
+@case('NotificationService.get_notifications_since')
+def _get_notifications_since(ctx):
+    from flask_app.services.notification_service import NotificationService
+    return lambda: NotificationService.get_notifications_since(ctx.user_id, 0, 100)
+
+
+@case('NotificationService.get_notification_by_id')
+def _get_notification_by_id(ctx):
+    from flask_app.models import Notification
+    from flask_app.services.notification_service import NotificationService
+    return lambda: NotificationService.get_notification_by_id(ctx.sample_ids[Notification], ctx.user_id)
+
+
+@case('NotificationService.get_all_notifications', rounds=5)
+def _get_all_notifications(ctx):
+    from flask_app.services.notification_service import NotificationService
+    return lambda: NotificationService.get_all_notifications(ctx.user_id)
+
+
+@case('NotificationService.get_notifications_page')
+def _get_notifications_page(ctx):
+    from flask_app.services.notification_service import NotificationService
+    return lambda: NotificationService.get_notifications_page(ctx.user_id, None, 50)
+
+
+@case('NotificationService.update_notification')
+def _update_notification(ctx):
+    from flask_app.models import Notification
+    from flask_app.services.notification_service import NotificationService
+    states = itertools.cycle((True, False))
+    return lambda: NotificationService.update_notification(ctx.sample_ids[Notification], ctx.user_id, is_read=next(states))
+
+
+@case('NotificationService.delete_notification')
+def _delete_notification(ctx):
+    from flask_app.services.notification_service import NotificationService
+    ids = _create_notifications(ctx, ctx.calls)
+    return _pop_each(ids, lambda row_id: NotificationService.delete_notification(row_id, ctx.user_id))
+
+
+@case('NotificationService.mark_as_read')
+def _mark_as_read(ctx):
+    from flask_app.services.notification_service import NotificationService
+    ids = _create_notifications(ctx, ctx.calls)
+    return _pop_each(ids, lambda row_id: NotificationService.mark_as_read(row_id, ctx.user_id))
+
+
+@case('BulkService.mark_notifications_read')
+def _bulk_mark_read(ctx):
+    from flask_app.services.bulk_service import BulkService
+    batches = [_create_notifications(ctx, 20) for _ in range(ctx.calls)]
+    return _pop_each(batches, lambda ids: BulkService.mark_notifications_read(ctx.user_id, ids))
+
+
+# --- User item --------------------------------------------------------------
+
+@case('UserItemService.create_user_item')
+def _create_user_item(ctx):
+    from flask_app.services.user_item_service import UserItemService
+    return lambda: UserItemService.create_user_item(ctx.user_id, 'Benchmark', 'borrowed', 1, 10000, 0)
+
+
+@case('UserItemService.get_user_item_by_id')
+def _get_user_item_by_id(ctx):
+    from flask_app.models import UserItem
+    from flask_app.services.user_item_service import UserItemService
+    return lambda: UserItemService.get_user_item_by_id(ctx.sample_ids[UserItem], ctx.user_id)
+
+
+@case('UserItemService.get_all_user_items', rounds=5)
+def _get_all_user_items(ctx):
+    from flask_app.services.user_item_service import UserItemService
+    return lambda: UserItemService.get_all_user_items(ctx.user_id)
+
+
+@case('UserItemService.get_user_items_page')
+def _get_user_items_page(ctx):
+    from flask_app.services.user_item_service import UserItemService
+    return lambda: UserItemService.get_user_items_page(ctx.user_id, None, 50)
+
+
+@case('UserItemService.update_user_item')
+def _update_user_item(ctx):
+    from flask_app.models import UserItem
+    from flask_app.services.user_item_service import UserItemService
+    balances = itertools.cycle((1000, 2000))
+    return lambda: UserItemService.update_user_item(ctx.sample_ids[UserItem], ctx.user_id, balance=next(balances))
+
+
+@case('UserItemService.delete_user_item')
+def _delete_user_item(ctx):
+    from flask_app.services.user_item_service import UserItemService
+    ids = [UserItemService.create_user_item(ctx.user_id, 'Benchmark', 'borrowed', 1, 1000, 0).id for _ in range(ctx.calls)]
+    return _pop_each(ids, lambda row_id: UserItemService.delete_user_item(row_id, ctx.user_id))
+
+
+# --- Auth -------------------------------------------------------------------
+
+@case('AuthService.create_user', rounds=5)
+def _create_user(ctx):
+    from flask_app.services.auth_service import AuthService
+
+    def run():
+        name = ctx.unique('benchmark_user')
+        return AuthService.create_user(name, f'{name}@example.com', 'password')
+    return run
+
+
+@case('AuthService.authenticate_user', rounds=5)
+def _authenticate_user(ctx):
+    from flask_app.seed import SEED_PASSWORD
+    from flask_app.services.auth_service import AuthService
+    return lambda: AuthService.authenticate_user(ctx.username, SEED_PASSWORD)
+
+
+@case('AuthService.rehash_password', rounds=5)
+def _rehash_password(ctx):
+    from flask_app.models import User
+    from flask_app.seed import SEED_PASSWORD
+    from flask_app.services.auth_service import AuthService
+    user = User.query.filter_by(username=ctx.username).first()
+    return lambda: AuthService.rehash_password(user, SEED_PASSWORD)
+
+
+@case('AuthService.revoke_token')
+def _revoke_token(ctx):
+    from flask_app.services.auth_service import AuthService
+    return lambda: AuthService.revoke_token({'jti': ctx.unique('jti'), 'exp': time.time() + 3600})
+
+
+@case('token_denylist.is_revoked')
+def _is_revoked(ctx):
+    # Kiểm tra chạy trên mọi request có JWT, đo với token chưa bị thu hồi
+    from flask_app.revocation import token_denylist
+    return lambda: token_denylist.is_revoked('not-revoked')
+
+
+# --- Export -----------------------------------------------------------------
+
+def _consume(iterable):
+    for _ in iterable:
+        pass
+
+
+@case('ExportService.iter_rows', rounds=5)
+def _iter_rows(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.export_service import ExportService
+    return lambda: _consume(ExportService.iter_rows(Expense, ctx.user_id))
+
+
+@case('ExportService.render_csv', rounds=5)
+def _render_csv(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.export_service import ExportService
+    rows = list(ExportService.iter_rows(Expense, ctx.user_id))
+    return lambda: _consume(ExportService.render_csv(Expense, rows))
+
+
+@case('ExportService.render_ndjson', rounds=5)
+def _render_ndjson(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.export_service import ExportService
+    rows = list(ExportService.iter_rows(Expense, ctx.user_id))
+    return lambda: _consume(ExportService.render_ndjson(Expense, rows))
+
+
+@case('ExportService.encode[gzip]', rounds=5)
+def _encode(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.export_service import ExportService
+    chunks = list(ExportService.render_csv(Expense, list(ExportService.iter_rows(Expense, ctx.user_id))))
+    return lambda: _consume(ExportService.encode(chunks, compress=True))
+
+
+@case('ExportService.export[csv]', rounds=5)
+def _export(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.export_service import ExportService
+    return lambda: _consume(ExportService.export(Expense, ctx.user_id, 'csv'))
+
+
+# --- Rollup -----------------------------------------------------------------
+
+@case('RollupService.snapshot')
+def _snapshot(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.rollup_service import RollupService
+    expense = Expense.query.get(ctx.sample_ids[Expense])
+    return lambda: RollupService.snapshot(expense)
+
+
+@case('RollupService.track')
+def _track(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.rollup_service import RollupService
+    expense = Expense.query.get(ctx.sample_ids[Expense])
+    return _rollback_after(lambda: RollupService.track(expense))
+
+
+@case('RollupService.track_change')
+def _track_change(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.rollup_service import RollupService
+    expense = Expense.query.get(ctx.sample_ids[Expense])
+    before = (*RollupService.snapshot(expense)[:4], RollupService.snapshot(expense)[4] + 1)
+    return _rollback_after(lambda: RollupService.track_change(before, expense))
+
+
+@case('RollupService.apply_transaction')
+def _apply_transaction(ctx):
+    from flask_app.services.rollup_service import RollupService, EXPENSE
+    return _rollback_after(lambda: RollupService.apply_transaction(EXPENSE, ctx.user_id, ctx.now, 'food', 1000))
+
+
+@case('RollupService.apply_debt')
+def _apply_debt(ctx):
+    from flask_app.services.rollup_service import RollupService
+    return _rollback_after(lambda: RollupService.apply_debt(ctx.user_id, 1000))
+
+
+@case('RollupService.apply_unread')
+def _apply_unread(ctx):
+    from flask_app.services.rollup_service import RollupService
+    return _rollback_after(lambda: RollupService.apply_unread(ctx.user_id, 1))
+
+
+@case('RollupService.move_category')
+def _move_category(ctx):
+    from flask_app.services.rollup_service import RollupService, EXPENSE
+    return _rollback_after(lambda: RollupService.move_category(EXPENSE, ctx.user_id, 'food', 'other', 1000, 1))
+
+
+@case('RollupService.get_unread_count')
+def _get_unread_count(ctx):
+    from flask_app.services.rollup_service import RollupService
+    return lambda: RollupService.get_unread_count(ctx.user_id)
+
+
+@case('RollupService.reconcile_unread', rounds=10)
+def _reconcile_unread(ctx):
+    from flask_app.services.rollup_service import RollupService
+    return lambda: RollupService.reconcile_unread(ctx.user_id, dry_run=True)
+
+
+@case('RollupService.get_totals')
+def _get_totals(ctx):
+    from flask_app.services.rollup_service import RollupService
+    return lambda: RollupService.get_totals(ctx.user_id)
+
+
+@case('RollupService.get_daily')
+def _get_daily(ctx):
+    from flask_app.services.rollup_service import RollupService, EXPENSE
+    return lambda: RollupService.get_daily(ctx.user_id, EXPENSE, (ctx.now - timedelta(days=30)).date())
+
+
+@case('RollupService.get_monthly_after')
+def _get_monthly_after(ctx):
+    from flask_app.services.rollup_service import RollupService, EXPENSE
+    return lambda: RollupService.get_monthly_after(ctx.user_id, EXPENSE, ctx.now.year - 1, ctx.now.month)
+
+
+@case('RollupService.get_categories')
+def _get_categories(ctx):
+    from flask_app.services.rollup_service import RollupService, EXPENSE
+    return lambda: RollupService.get_categories(ctx.user_id, EXPENSE)
+
+
+@case('RollupService.summarize')
+def _summarize(ctx):
+    from flask_app.services.rollup_service import RollupService
+    return lambda: RollupService.summarize('expense', ctx.user_id, {'categories': ('food', 'bill')})
+
+
+@case('RollupService.invalidate_checkpoints')
+def _invalidate_checkpoints(ctx):
+    from flask_app.services.rollup_service import RollupService
+    return _rollback_after(lambda: RollupService.invalidate_checkpoints(ctx.user_id, ctx.now - timedelta(days=200)))
+
+
+@case('RollupService.rebuild', rounds=5)
+def _rebuild(ctx):
+    from flask_app.services.rollup_service import RollupService
+    return lambda: RollupService.rebuild(ctx.user_id)
+
+
+# --- Balance ----------------------------------------------------------------
+
+@case('BalanceService.get_checkpoint[cached]')
+def _get_checkpoint_cached(ctx):
+    from flask_app.services.balance_service import BalanceService
+    month = ctx.now.date().replace(day=1)
+    BalanceService.get_checkpoint(ctx.user_id, month)
+    return lambda: BalanceService.get_checkpoint(ctx.user_id, month)
+
+
+@case('BalanceService.get_checkpoint[cold]')
+def _get_checkpoint_cold(ctx):
+    from flask_app import db
+    from flask_app.models import BalanceCheckpoint
+    from flask_app.services.balance_service import BalanceService
+    month = ctx.now.date().replace(day=1)
+
+    def run():
+        BalanceCheckpoint.query.filter_by(user_id=ctx.user_id).delete()
+        db.session.commit()
+        return BalanceService.get_checkpoint(ctx.user_id, month)
+    return run
+
+
+@case('BalanceService.get_checkpoints')
+def _get_checkpoints(ctx):
+    from flask_app import db
+    from flask_app.models import BalanceCheckpoint
+    from flask_app.services.balance_service import BalanceService
+    current = ctx.now.date().replace(day=1)
+    months = [(current - timedelta(days=31 * index)).replace(day=1) for index in range(24)]
+
+    def run():
+        BalanceCheckpoint.query.filter_by(user_id=ctx.user_id).delete()
+        db.session.commit()
+        return BalanceService.get_checkpoints(ctx.user_id, months)
+    return run
+
+
+@case('BalanceService.get_history[month]')
+def _get_history_month(ctx):
+    from flask_app.services.balance_service import BalanceService
+    end = ctx.now.date()
+    return lambda: BalanceService.get_history(ctx.user_id, end - timedelta(days=5 * 365), end, 'month')
+
+
+@case('BalanceService.get_history[day]')
+def _get_history_day(ctx):
+    from flask_app.services.balance_service import BalanceService
+    end = ctx.now.date()
+    return lambda: BalanceService.get_history(ctx.user_id, end - timedelta(days=30), end, 'day')
+
+
+@case('BalanceService.get_history[week]')
+def _get_history_week(ctx):
+    from flask_app.services.balance_service import BalanceService
+    end = ctx.now.date()
+    return lambda: BalanceService.get_history(ctx.user_id, end - timedelta(days=365), end, 'week')
+
+
+# --- Report -----------------------------------------------------------------
+
+@case('ReportService.fetch_columns')
+def _fetch_columns(ctx):
+    from flask_app.services.report_service import ReportService, EXPENSE
+    end = ctx.now.date()
+    return lambda: ReportService.fetch_columns(ctx.user_id, EXPENSE, end - timedelta(days=365), end)
+
+
+@case('ReportService.build_report[python]')
+def _build_report_python(ctx):
+    from flask_app.services.report_service import ReportService
+    end = ctx.now.date()
+    return lambda: ReportService.build_report(ctx.user_id, end - timedelta(days=365), end, engine='python')
+
+
+@case('ReportService.build_report[numpy]')
+def _build_report_numpy(ctx):
+    from flask_app.services.report_service import ReportService
+    end = ctx.now.date()
+    return lambda: ReportService.build_report(ctx.user_id, end - timedelta(days=365), end, engine='numpy')
+
+
+# --- Search -----------------------------------------------------------------
+
+@case('SearchService.backend')
+def _backend(ctx):
+    from flask_app.services.search_service import SearchService
+    return SearchService.backend
+
+
+@case('SearchService.index')
+def _index(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.search_service import SearchService
+    expense = Expense.query.get(ctx.sample_ids[Expense])
+    return _rollback_after(lambda: SearchService.index(expense))
+
+
+@case('SearchService.index_rows')
+def _index_rows(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.search_service import SearchService
+    rows = [
+        {'id': row.id, 'user_id': row.user_id, 'category': row.category, 'description': row.description}
+        for row in Expense.query.filter_by(user_id=ctx.user_id).limit(100)
+    ]
+
+    def run():
+        # index_rows dành cho dòng mới chèn: xóa chỉ mục cũ trước (trong cùng transaction)
+        SearchService.remove_ids(Expense, [row['id'] for row in rows])
+        SearchService.index_rows(Expense, rows)
+    return _rollback_after(run)
+
+
+@case('SearchService.remove')
+def _remove(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.search_service import SearchService
+    expense = Expense.query.get(ctx.sample_ids[Expense])
+    return _rollback_after(lambda: SearchService.remove(expense))
+
+
+@case('SearchService.remove_ids')
+def _remove_ids(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.search_service import SearchService
+    ids = [row.id for row in Expense.query.filter_by(user_id=ctx.user_id).limit(100)]
+    return _rollback_after(lambda: SearchService.remove_ids(Expense, ids))
+
+
+@case('SearchService.search')
+def _search(ctx):
+    from flask_app.services.search_service import SearchService
+    return lambda: SearchService.search(ctx.user_id, 'an trua', 'expenses')
+
+
+@case('SearchService.reindex', rounds=3)
+def _reindex(ctx):
+    from flask_app.services.search_service import SearchService
+    return lambda: SearchService.reindex(ctx.user_id)
+
+
+# --- Version ----------------------------------------------------------------
+
+@case('VersionService.get')
+def _version_get(ctx):
+    from flask_app.services.version_service import VersionService
+    return lambda: VersionService.get(ctx.user_id, 'expenses')
+
+
+@case('VersionService.get_many')
+def _get_many(ctx):
+    from flask_app.events import DASHBOARD_COLLECTIONS
+    from flask_app.services.version_service import VersionService
+    return lambda: VersionService.get_many(ctx.user_id, DASHBOARD_COLLECTIONS)
+
+
+@case('VersionService.bump')
+def _version_bump(ctx):
+    from flask_app.services.version_service import VersionService
+    return _rollback_after(lambda: VersionService.bump(ctx.user_id, 'expenses'))
+
+
+@case('VersionService.get_row_version')
+def _get_row_version(ctx):
+    from flask_app.models import Expense
+    from flask_app.services.version_service import VersionService
+    return lambda: VersionService.get_row_version(Expense, ctx.sample_ids[Expense], ctx.user_id)
+
+
+# --- Schemas ----------------------------------------------------------------
+
+def _register_schema_cases():
+    from flask_app import schemas
+    from flask_app.schemas import compiled
+
+    def models():
+        from flask_app.models import Expense, Income, Notification, UserItem
+        return {'expense': Expense, 'income': Income, 'notification': Notification, 'user_item': UserItem}
+
+    for kind in ('expense', 'income', 'notification', 'user_item'):
+        for module, suffix in ((schemas, '_schema'), (compiled, '_serializer')):
+            single, many = getattr(module, kind + suffix), getattr(module, kind + 's' + suffix)
+            label = 'schemas.compiled' if module is compiled else 'schemas'
+
+            def dump_one(ctx, kind=kind, single=single):
+                obj = models()[kind].query.get(ctx.sample_ids[models()[kind]])
+                return lambda: single.dump(obj)
+
+            def dump_page(ctx, kind=kind, many=many):
+                model = models()[kind]
+                objs = model.query.filter_by(user_id=ctx.user_id).order_by(model.id).limit(500).all()
+                return lambda: many.dump(objs)
+
+            case(f'{label}.{kind}{suffix}.dump')(dump_one)
+            case(f'{label}.{kind}s{suffix}.dump[500]')(dump_page)
+
+
+_register_schema_cases()
+
+
+# --- Endpoint ---------------------------------------------------------------
+
+@case('search_all')
+def _search_all(ctx):
+    return lambda: ctx.client.get('/api/search/?q=an', headers=ctx.headers)
+
+
+@case('get_dashboard[uncached]')
+def _get_dashboard_uncached(ctx):
+    from flask_app.cache import dashboard_cache
+
+    def run():
+        dashboard_cache.clear()
+        return ctx.client.get('/api/overview/dashboard', headers=ctx.headers)
+    return run
+
+
+@case('get_dashboard[cached]')
+def _get_dashboard_cached(ctx):
+    return lambda: ctx.client.get('/api/overview/dashboard', headers=ctx.headers)
+
+
+@case('build_dashboard[rollup]')
+def _build_dashboard_rollup(ctx):
+    from flask_app.controllers.overview import build_dashboard
+    return lambda: build_dashboard(ctx.user_id, source='rollup')
+
+
+@case('build_dashboard[scan]')
+def _build_dashboard_scan(ctx):
+    from flask_app.controllers.overview import build_dashboard
+    return lambda: build_dashboard(ctx.user_id, source='scan')
+
+
+# --- Runner -----------------------------------------------------------------
+
+def service_methods():
+    """Tên Class.method của mọi phương thức public trong flask_app.services"""
+    import flask_app.services as package
+
+    names = set()
+    for module_info in pkgutil.iter_modules(package.__path__):
+        module = importlib.import_module(f'{package.__name__}.{module_info.name}')
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if class_name.endswith('Service') and cls.__module__ == module.__name__:
+                names.update(f'{class_name}.{name}' for name in vars(cls) if not name.startswith('_'))
+    return names
+
+
+def uncovered_methods():
+    covered = {case.name.split('[')[0] for case in CASES}
+    return sorted(service_methods() - covered)
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return revision + ('-dirty' if dirty else '')
+
+
+class SQLiteSnapshot:
+    """
+    Bản sao (sqlite3 backup API) của database sau khi seed, được khôi phục
+    trước mỗi case để case ghi dữ liệu không ảnh hưởng tới case sau.
+    """
+
+    def __init__(self):
+        import sqlite3
+        self.copy = sqlite3.connect(':memory:')
+        self._backup(lambda connection: connection.backup(self.copy))
+
+    def restore(self):
+        self._backup(lambda connection: self.copy.backup(connection))
+
+    @staticmethod
+    def _backup(fn):
+        from flask_app import db
+        from flask_app.cache import dashboard_cache
+
+        db.session.remove()
+        dashboard_cache.clear()
+        connection = db.engine.raw_connection()
+        try:
+            fn(connection.driver_connection)
+        finally:
+            connection.close()
+
+
+def run_scale(scale, cases, rounds, warmup, random_seed, database_url=None):
+    from flask_app import db
+    from flask_app.seed import seed_database
+
+    app = create_benchmark_app(database_url)
+    user_ids, counts = seed_database(**SCALES[scale], seed=random_seed, prefix='bench')
+    print(f'[{scale}] ' + ', '.join(f'{count} {table}' for table, count in counts.items()), file=sys.stderr)
+    snapshot = SQLiteSnapshot() if db.engine.dialect.name == 'sqlite' else None
+    if snapshot is None:
+        print('Không phải SQLite: các case ghi dữ liệu sẽ ảnh hưởng tới case sau', file=sys.stderr)
+
+    results = []
+    for bench_case in cases:
+        if snapshot is not None:
+            snapshot.restore()
+        case_rounds = min(rounds, bench_case.rounds) if bench_case.rounds else rounds
+        ctx = BenchContext(app, user_ids[0], case_rounds, warmup)
+        fn = bench_case.setup(ctx)
+        gc.collect()
+        samples = measure(fn, case_rounds, warmup)
+        db.session.remove()
+        results.append({
+            'case': bench_case.name,
+            'scale': scale,
+            'rounds': case_rounds,
+            'min_ms': round(min(samples) * 1000, 3),
+            **summarize(samples),
+            'p90_ms': round(percentile(samples, 90) * 1000, 3),
+        })
+    db.session.remove()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='small', help=f'Các quy mô, phân tách bằng dấu phẩy ({", ".join(SCALES)})')
+    parser.add_argument('-k', '--filter', action='append', default=[], help='Chỉ chạy case khớp mẫu (fnmatch), lặp lại được')
+    parser.add_argument('--rounds', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='Mặc định SQLite in-memory')
+    parser.add_argument('--output', help='File JSON kết quả (mặc định benchmarks/results/<commit>.json)')
+    parser.add_argument('--list', action='store_true', help='Liệt kê các case rồi thoát')
+    args = parser.parse_args()
+
+    cases = [
+        bench_case for bench_case in CASES
+        if not args.filter or any(fnmatch.fnmatchcase(bench_case.name, pattern) for pattern in args.filter)
+    ]
+    missing = uncovered_methods()
+    if missing:
+        print('Phương thức service chưa có benchmark: ' + ', '.join(missing), file=sys.stderr)
+    if args.list:
+        for bench_case in cases:
+            print(bench_case.name)
+        return
+
+    scales = [scale.strip() for scale in args.scales.split(',') if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f'Quy mô không hợp lệ: {", ".join(unknown)}')
+
+    import sqlalchemy
+    revision = git_revision()
+    report = {
+        'meta': {
+            'revision': revision,
+            'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'platform': platform.platform(),
+            'database': args.database_url or 'sqlite://',
+            'rounds': args.rounds,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'scales': {scale: SCALES[scale] for scale in scales},
+        },
+        'results': [],
+    }
+    for scale in scales:
+        report['results'].extend(run_scale(scale, cases, args.rounds, args.warmup, args.seed, args.database_url))
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{revision}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print_table(report['results'], ['scale', 'case', 'rounds', 'p50_ms', 'p90_ms', 'p99_ms', 'mean_ms'])
+    print(f'Đã ghi {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -9,4 +9,68 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600))
-    SQLALCHEMY_ECHO = True
+    # Danh sách token đã thu hồi (logout): chỉ trong process nếu để trống,
+    # sqlite:///đường/dẫn để dùng chung giữa các worker trên cùng máy
+    JWT_DENYLIST_URL = os.getenv('JWT_DENYLIST_URL', '')
+    JWT_DENYLIST_POLL_INTERVAL = float(os.getenv('JWT_DENYLIST_POLL_INTERVAL', 1.0))
+    # Echo ghi log mọi câu SQL một cách đồng bộ, chỉ bật khi debug; dùng SQL profiler bên dưới
+    SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO', 'false').lower() == 'true'
+    SQL_PROFILER_ENABLED = os.getenv('SQL_PROFILER_ENABLED', 'true').lower() == 'true'
+    SQL_SERVER_TIMING = os.getenv('SQL_SERVER_TIMING', 'true').lower() == 'true'
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', 10))
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_SAMPLE_RATE = float(os.getenv('SLOW_QUERY_SAMPLE_RATE', 0.25))
+    # Connection pool: profile small/default/large, DB_POOL_* (nếu đặt) ghi đè từng giá trị
+    DB_POOL_PROFILE = os.getenv('DB_POOL_PROFILE', 'default')
+    DB_POOL_SIZE = os.getenv('DB_POOL_SIZE')
+    DB_MAX_OVERFLOW = os.getenv('DB_MAX_OVERFLOW')
+    DB_POOL_TIMEOUT = os.getenv('DB_POOL_TIMEOUT')
+    DB_POOL_RECYCLE = os.getenv('DB_POOL_RECYCLE')
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING')
+    DB_READY_MAX_WAIT_MS = float(os.getenv('DB_READY_MAX_WAIT_MS', 500))
+    DB_READY_WINDOW = int(os.getenv('DB_READY_WINDOW', 30))
+    # Băm mật khẩu: method/tham số theo werkzeug (vd. scrypt:32768:8:1, pbkdf2:sha256:600000);
+    # hash cũ khác cấu hình được băm lại khi đăng nhập thành công
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', 16))
+    # Process pool băm mật khẩu (0 = băm ngay trong luồng request); hàng đợi đầy thì trả 503
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 0))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 5))
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 500))
+    SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', 20))
+    SEARCH_PARALLEL = os.getenv('SEARCH_PARALLEL', 'false').lower() == 'true'
+    SEARCH_WORKERS = int(os.getenv('SEARCH_WORKERS', 8))
+    SEARCH_TIMEOUT = float(os.getenv('SEARCH_TIMEOUT', 2.0))
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 500))
+    IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', 1000))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    BULK_MAX_IDS = int(os.getenv('BULK_MAX_IDS', 1000))
+    SSE_HEARTBEAT_INTERVAL = float(os.getenv('SSE_HEARTBEAT_INTERVAL', 15))
+    SSE_QUEUE_SIZE = int(os.getenv('SSE_QUEUE_SIZE', 100))
+    SSE_MAX_DURATION = int(os.getenv('SSE_MAX_DURATION', 300))
+    SSE_REPLAY_LIMIT = int(os.getenv('SSE_REPLAY_LIMIT', 100))
+    REALTIME_BROKER_URL = os.getenv('REALTIME_BROKER_URL', '')
+    # 'fast': FastJSONProvider, dùng orjson nếu có cài (requirements-optional.txt)
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'fast')
+    # Nguồn số liệu của dashboard: 'rollup' (bảng tổng hợp) hoặc 'scan' (tính trực tiếp
+    # trên bảng giao dịch, xem flask_app.aggregation)
+    DASHBOARD_SOURCE = os.getenv('DASHBOARD_SOURCE', 'rollup')
+    # Dashboard gửi các câu truy vấn đồng thời qua engine async (cần greenlet và driver
+    # aiosqlite/aiomysql trong requirements-optional.txt); ?mode=async|sync ghi đè theo request
+    DASHBOARD_ASYNC = os.getenv('DASHBOARD_ASYNC', 'false').lower() == 'true'
+    DASHBOARD_ASYNC_DATABASE_URL = os.getenv('DASHBOARD_ASYNC_DATABASE_URL')
+    DASHBOARD_ASYNC_TIMEOUT = float(os.getenv('DASHBOARD_ASYNC_TIMEOUT', 5.0))
+    DASHBOARD_CACHE_ENABLED = os.getenv('DASHBOARD_CACHE_ENABLED', 'true').lower() == 'true'
+    DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 60))
+    DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv('DASHBOARD_CACHE_MAX_ENTRIES', 1024))
+    DASHBOARD_CACHE_MAX_BYTES = int(os.getenv('DASHBOARD_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    # Số điểm tối đa của /api/overview/balance-history
+    BALANCE_HISTORY_MAX_POINTS = int(os.getenv('BALANCE_HISTORY_MAX_POINTS', 1000))
+    # Số tháng tối đa của /api/overview/report
+    REPORT_MAX_MONTHS = int(os.getenv('REPORT_MAX_MONTHS', 120))
+    # Engine tính báo cáo: 'python' hoặc 'numpy' (cần numpy, xem requirements-optional.txt). Sau khi database đã cộng
+    # theo (tháng, danh mục) chỉ còn vài trăm ô, vòng lặp Python nhanh hơn numpy
+    REPORT_ENGINE = os.getenv('REPORT_ENGINE', 'python')
@@ -13,16 +13,56 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # JSON provider dùng orjson nếu có cài đặt
+    if app.config.get('JSON_PROVIDER') == 'fast':
+        from flask_app.json_provider import FastJSONProvider
+        app.json = FastJSONProvider(app)
+
+    # Cấu hình connection pool theo profile trước khi tạo engine
+    from flask_app.pool import engine_options, pool_monitor
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    # Token đã thu hồi, kiểm tra bởi token_in_blocklist_loader trong extensions.py
+    from flask_app.revocation import token_denylist
+    token_denylist.init_app(app)
     # Import models here to register them with SQLAlchemy
     from flask_app.models.user import User
     from flask_app.models.expense import Expense
     from flask_app.models.income import Income
     from flask_app.models.notification import Notification
     from flask_app.models.user_item import UserItem
+    from flask_app.models.rollup import UserTotal, DailyRollup, MonthlyRollup, CategoryRollup, BalanceCheckpoint
+    from flask_app.models.search import SearchToken
+    from flask_app.models.version import CollectionVersion
+
+    # Số liệu pool (thời gian chờ, connection đang dùng, lỗi) cho /readyz
+    # và profiler SQL theo request (Server-Timing, N+1, log câu chậm)
+    from flask_app.profiler import sql_profiler
+    with app.app_context():
+        pool_monitor.init_app(app, db.engine)
+        sql_profiler.init_app(app, db.engine)
+
+    # Engine async cho chế độ dashboard truy vấn đồng thời
+    from flask_app.async_db import async_db
+    async_db.init_app(app)
+
+    # Cache dashboard và các listener xóa cache khi dữ liệu thay đổi
+    from flask_app.cache import dashboard_cache
+    from flask_app.events import register_events
+    dashboard_cache.init_app(app)
+    register_events(db.session)
+
+    # Process pool băm mật khẩu cho đăng ký/đăng nhập
+    from flask_app.hashing import password_hasher
+    password_hasher.init_app(app)
+
+    # Hub pub/sub cho luồng SSE thông báo
+    from flask_app.realtime import notification_hub
+    notification_hub.init_app(app)
 
     # Register blueprints
     from flask_app.controllers.auth import auth_bp
@@ -32,6 +72,7 @@ def create_app(config_class=Config):
     from flask_app.controllers.overview import overview_bp
     from flask_app.controllers.user_item import user_item_bp
     from flask_app.controllers.search import search_bp
+    from flask_app.controllers.health import health_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(expense_bp, url_prefix='/api/expenses')
@@ -40,6 +81,11 @@ def create_app(config_class=Config):
     app.register_blueprint(overview_bp, url_prefix='/api/overview')
     app.register_blueprint(user_item_bp, url_prefix='/api/user-items')
     app.register_blueprint(search_bp, url_prefix='/api/search')
+    app.register_blueprint(health_bp)
+
+    # Đăng ký lệnh CLI
+    from flask_app.commands import register_commands
+    register_commands(app)
 
 
 
@@ -0,0 +1,115 @@
+"""
+Tổng hợp dashboard trực tiếp trên bảng giao dịch, chạy được trên MySQL,
+SQLite và PostgreSQL.
+
+Thay vì một câu GROUP BY cho mỗi loại thống kê, mọi thống kê chi tiêu được
+tính trong một câu duy nhất: quét một lần các expense của user (theo index
+user_id), gắn cho mỗi dòng thứ trong tuần (chỉ khi nằm trong 30 ngày gần
+nhất) và tháng (chỉ khi nằm trong 365 ngày gần nhất), rồi GROUP BY theo
+(danh mục, thứ, tháng). Kết quả có tối đa vài trăm dòng, được cộng lại ở
+Python thành tổng chi, thống kê theo thứ, theo tháng và theo danh mục. Tổng
+thu và dư nợ lấy bằng một câu UNION ALL thứ hai.
+"""
+from datetime import datetime, time, timedelta
+from sqlalchemy import select, func, case, extract, literal, union_all, Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from flask_app.models import Expense, Income, UserItem
+
+
+class day_of_week(FunctionElement):
+    """Thứ trong tuần theo quy ước DAYOFWEEK của MySQL: 1 = Chủ nhật ... 7 = Thứ bảy"""
+    type = Integer()
+    inherit_cache = True
+    name = 'day_of_week'
+
+
+@compiles(day_of_week)
+def _day_of_week_default(element, compiler, **kw):
+    return 'DAYOFWEEK(%s)' % compiler.process(element.clauses, **kw)
+
+
+@compiles(day_of_week, 'sqlite')
+def _day_of_week_sqlite(element, compiler, **kw):
+    return "(CAST(strftime('%%w', %s) AS INTEGER) + 1)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(day_of_week, 'postgresql')
+def _day_of_week_postgresql(element, compiler, **kw):
+    return '(CAST(EXTRACT(DOW FROM %s) AS INTEGER) + 1)' % compiler.process(element.clauses, **kw)
+
+
+def dashboard_windows(now):
+    """Mốc bắt đầu (đầu ngày) của cửa sổ thống kê theo thứ và theo tháng"""
+    week_start = datetime.combine((now - timedelta(days=30)).date(), time.min)
+    year_start = datetime.combine((now - timedelta(days=365)).date(), time.min)
+    return week_start, year_start
+
+
+def aggregate_queries(user_id, now):
+    """Hai câu lệnh: phân rã chi tiêu theo (danh mục, thứ, tháng) và tổng thu / dư nợ"""
+    week_start, year_start = dashboard_windows(now)
+    tagged = select(
+        Expense.category,
+        Expense.amount,
+        case((Expense.date >= week_start, day_of_week(Expense.date))).label('day_of_week'),
+        case((Expense.date >= year_start, extract('month', Expense.date))).label('month')
+    ).where(Expense.user_id == user_id).subquery()
+
+    breakdown = select(
+        tagged.c.category,
+        tagged.c.day_of_week,
+        tagged.c.month,
+        func.sum(tagged.c.amount).label('total')
+    ).group_by(tagged.c.category, tagged.c.day_of_week, tagged.c.month).order_by(tagged.c.category)
+
+    totals = union_all(
+        select(literal('income').label('kind'), func.sum(Income.amount).label('total')).where(Income.user_id == user_id),
+        select(literal('debt').label('kind'), func.sum(UserItem.balance).label('total')).where(UserItem.user_id == user_id)
+    )
+    return {'breakdown': breakdown, 'totals': totals}
+
+
+def _add(totals, key, amount):
+    totals[key] = totals.get(key, 0) + amount
+
+
+def collect_aggregates(rows):
+    """Gộp kết quả của `aggregate_queries` thành các tổng của dashboard"""
+    aggregates = {
+        'total_expense': 0,
+        'weekly': {},
+        'monthly': {},
+        'categories': {},
+    }
+    for row in rows['breakdown']:
+        total = row.total or 0
+        aggregates['total_expense'] += total
+        _add(aggregates['categories'], row.category, total)
+        if row.day_of_week is not None:
+            _add(aggregates['weekly'], int(row.day_of_week), total)
+        if row.month is not None:
+            _add(aggregates['monthly'], int(row.month), total)
+
+    totals = {row.kind: row.total for row in rows['totals']}
+    aggregates['total_income'] = totals.get('income') or 0
+    aggregates['total_debt'] = totals.get('debt') or 0
+    return aggregates
+
+
+def diff_dashboards(expected, actual, tolerance=0.005, path=''):
+    """Danh sách (đường dẫn, giá trị mong đợi, giá trị thực tế) khác nhau giữa hai dashboard"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            differences += diff_dashboards(expected.get(key), actual.get(key), tolerance, f'{path}.{key}')
+        return differences
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        differences = []
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            differences += diff_dashboards(left, right, tolerance, f'{path}[{index}]')
+        return differences
+    if isinstance(expected, float) and isinstance(actual, (int, float)):
+        # Tổng trên SQLite là số thực: chấp nhận lệch dưới nửa xu
+        return [] if abs(expected - actual) <= tolerance else [(path, expected, actual)]
+    return [] if expected == actual else [(path, expected, actual)]
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+from sqlalchemy.engine import make_url
+
+try:
+    # sqlalchemy.ext.asyncio cần greenlet
+    from sqlalchemy.ext.asyncio import create_async_engine
+except ImportError:
+    create_async_engine = None
+
+# Driver async tương ứng với từng backend của DATABASE_URL
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+aiomysql',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def async_url(url):
+    """URL của engine async cho cùng database, None nếu backend không có driver async"""
+    if not url:
+        return None
+    url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name())
+    if drivername is None or url.database in (None, '', ':memory:'):
+        # SQLite trong bộ nhớ không dùng chung được giữa hai engine
+        return None
+    return url.set(drivername=drivername)
+
+
+class AsyncDatabase:
+    """
+    Engine async của SQLAlchemy trên một event loop riêng (một luồng nền mỗi
+    process). View đồng bộ gửi một nhóm câu truy vấn độc lập vào loop, mỗi
+    câu chạy trên một connection riêng và đồng thời với nhau, rồi chờ kết
+    quả; tổng thời gian gần bằng câu chậm nhất thay vì tổng các câu.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.url = None
+        self.timeout = 5.0
+        self.engine_options = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._engine = None
+        # Loop và connection không dùng được trong process con sau khi fork
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def init_app(self, app):
+        from flask_app.pool import engine_options
+
+        self.dispose()
+        self.enabled = app.config['DASHBOARD_ASYNC']
+        self.timeout = app.config['DASHBOARD_ASYNC_TIMEOUT']
+        self.url = app.config.get('DASHBOARD_ASYNC_DATABASE_URL') or async_url(app.config.get('SQLALCHEMY_DATABASE_URI'))
+        options = engine_options(app.config)
+        # Engine async dùng AsyncAdaptedQueuePool, chỉ giữ kích thước/timeout của profile
+        options.pop('poolclass', None)
+        self.engine_options = options
+        if self.enabled and not self.available:
+            app.logger.warning(
+                'DASHBOARD_ASYNC bật nhưng không dùng được (cần greenlet và driver async, '
+                'xem requirements-optional.txt); dashboard chạy tuần tự'
+            )
+
+    @property
+    def available(self):
+        return create_async_engine is not None and self.url is not None
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._engine = None
+
+    def _start(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='async-db', daemon=True).start()
+                self._engine = create_async_engine(self.url, **self.engine_options)
+                self._loop = loop
+            return self._loop
+
+    @property
+    def engine(self):
+        self._start()
+        return self._engine
+
+    def run(self, coroutine):
+        """Chạy `coroutine` trên loop của engine và chờ kết quả (tối đa `timeout` giây)"""
+        loop = self._start()
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            # Hủy coroutine để các câu lệnh dừng và trả connection về pool,
+            # không chạy tiếp song song với lần chạy lại tuần tự
+            future.cancel()
+            raise
+
+    async def _fetch(self, statement):
+        async with self._engine.connect() as connection:
+            return (await connection.execute(statement)).all()
+
+    async def _fetch_all(self, statements):
+        names = list(statements)
+        results = await asyncio.gather(*(self._fetch(statements[name]) for name in names))
+        return dict(zip(names, results))
+
+    def execute_all(self, statements):
+        """Chạy đồng thời các câu SELECT trong dict `statements`, trả về dict tên -> danh sách Row"""
+        return self.run(self._fetch_all(statements))
+
+    def dispose(self):
+        with self._lock:
+            loop, engine = self._loop, self._engine
+            self._loop = self._engine = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result(self.timeout)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+
+
+async_db = AsyncDatabase()
@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Cache LRU trong tiến trình cho response đã serialize, theo từng user.
+
+    Mục hết hạn sau `ttl` giây; mục ít dùng nhất bị loại khi vượt
+    `max_entries` hoặc `max_bytes`. Mỗi key có số thế hệ (generation) tăng
+    khi `invalidate`, nên giá trị tính trước lần invalidate không bao giờ
+    được lưu sau đó.
+
+    `invalidate` chỉ có tác dụng trong tiến trình gọi nó. Để nhiều worker
+    không trả dữ liệu cũ, mỗi mục lưu kèm `version` (phiên bản dữ liệu đọc
+    từ database trước khi tính giá trị) và `get` chỉ trả về mục có cùng
+    version với phiên bản hiện tại: ghi ở worker nào cũng làm mục ở mọi
+    worker khác hết hiệu lực ngay ở request kế tiếp.
+    """
+
+    def __init__(self, ttl=60, max_entries=1024, max_bytes=16 * 1024 * 1024, enabled=True):
+        self.configure(ttl, max_entries, max_bytes, enabled)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._epoch = 0
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(self, ttl, max_entries, max_bytes, enabled=True):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+    def init_app(self, app):
+        self.configure(
+            app.config['DASHBOARD_CACHE_TTL'],
+            app.config['DASHBOARD_CACHE_MAX_ENTRIES'],
+            app.config['DASHBOARD_CACHE_MAX_BYTES'],
+            app.config['DASHBOARD_CACHE_ENABLED']
+        )
+        self.clear()
+
+    def generation(self, key):
+        """Thế hệ hiện tại của `key`, truyền lại cho `set`"""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def get(self, key, version=None):
+        """Bytes đã cache của `key` với phiên bản `version`, None nếu không có"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, cached_version = entry
+            if expires_at <= time.monotonic() or cached_version != version:
+                self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation, version=None):
+        """Lưu `value` (tính từ dữ liệu ở phiên bản `version`) trừ khi `key` đã bị invalidate sau `generation`"""
+        if not self.enabled or len(value) > self.max_bytes:
+            return False
+        with self._lock:
+            if (self._epoch, self._generations.get(key, 0)) != generation:
+                return False
+            self._discard(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, version)
+            self._size += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._discard(key)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._generations.clear()
+            self._entries.clear()
+            self._size = 0
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+
+dashboard_cache = ResponseCache()
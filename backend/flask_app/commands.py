@@ -0,0 +1,133 @@
+import click
+from flask.cli import AppGroup
+
+rollups_cli = AppGroup('rollups', help='Quản lý các bảng tổng hợp của dashboard.')
+
+
+@rollups_cli.command('rebuild')
+@click.option('--user-id', type=int, default=None, help='Chỉ tính lại cho một người dùng.')
+def rebuild_rollups(user_id):
+    """Tính lại toàn bộ bảng rollup từ expenses, incomes và user_items."""
+    from flask_app.services.rollup_service import RollupService
+
+    count = RollupService.rebuild(user_id)
+    click.echo(f'Đã tính lại rollup cho {count} người dùng.')
+
+
+notifications_cli = AppGroup('notifications', help='Quản lý thông báo.')
+
+
+@notifications_cli.command('reconcile-unread')
+@click.option('--user-id', type=int, default=None, help='Chỉ kiểm tra một người dùng.')
+@click.option('--dry-run', is_flag=True, help='Chỉ báo cáo phần lệch, không sửa.')
+def reconcile_unread(user_id, dry_run):
+    """So khớp bộ đếm thông báo chưa đọc với bảng notifications và sửa phần lệch."""
+    from flask_app.services.rollup_service import RollupService
+
+    drift = RollupService.reconcile_unread(user_id, dry_run=dry_run)
+    for row_user_id, stored, actual in drift:
+        click.echo(f'user {row_user_id}: {stored} -> {actual}')
+    action = 'Phát hiện' if dry_run else 'Đã sửa'
+    click.echo(f'{action} {len(drift)} bộ đếm bị lệch.')
+
+
+search_cli = AppGroup('search', help='Quản lý chỉ mục tìm kiếm toàn văn.')
+
+
+@search_cli.command('reindex')
+@click.option('--user-id', type=int, default=None, help='Chỉ đánh chỉ mục lại cho một người dùng.')
+def reindex_search(user_id):
+    """Xây lại chỉ mục tìm kiếm từ expenses, incomes, notifications và user_items."""
+    from flask_app.services.search_service import SearchService
+
+    count = SearchService.reindex(user_id)
+    click.echo(f'Đã đánh chỉ mục {count} bản ghi ({SearchService.backend()}).')
+
+
+dashboard_cli = AppGroup('dashboard', help='Kiểm tra số liệu dashboard.')
+
+
+@dashboard_cli.command('verify')
+@click.option('--user-id', type=int, default=None, help='Chỉ kiểm tra một người dùng.')
+def verify_dashboard(user_id):
+    """So sánh dashboard tính từ rollup với dashboard tính trực tiếp trên bảng giao dịch."""
+    from datetime import datetime
+    from flask_app import db
+    from flask_app.aggregation import diff_dashboards
+    from flask_app.controllers.overview import build_dashboard
+    from flask_app.models import User
+
+    user_ids = [user_id] if user_id is not None else [row[0] for row in db.session.query(User.id).order_by(User.id)]
+    now = datetime.utcnow()
+    mismatched = 0
+    for row_user_id in user_ids:
+        expected = build_dashboard(row_user_id, source='rollup', now=now)
+        actual = build_dashboard(row_user_id, source='scan', now=now)
+        differences = diff_dashboards(expected, actual)
+        if differences:
+            mismatched += 1
+            for path, rollup_value, scan_value in differences:
+                click.echo(f'user {row_user_id} {path}: rollup={rollup_value!r} scan={scan_value!r}')
+
+    click.echo(f'{len(user_ids) - mismatched}/{len(user_ids)} người dùng khớp ({db.engine.dialect.name}).')
+    if mismatched:
+        raise SystemExit(1)
+
+
+@click.command('check-query-plans')
+@click.option('--verbose', is_flag=True, help='In plan của mọi câu lệnh.')
+def check_query_plans(verbose):
+    """Chạy EXPLAIN cho mọi truy vấn của services trên SQLite, lỗi nếu có full scan."""
+    from flask_app.query_plans import collect_query_plans
+
+    failures = 0
+    for statement, plan, full_scans in collect_query_plans():
+        if full_scans:
+            failures += 1
+        if full_scans or verbose:
+            click.echo(('FULL SCAN' if full_scans else 'OK') + ': ' + ' '.join(statement.split()))
+            for detail in plan:
+                click.echo(f'    {detail}')
+
+    if failures:
+        click.echo(f'{failures} câu lệnh quét toàn bộ bảng.')
+        raise SystemExit(1)
+    click.echo('Không có câu lệnh nào quét toàn bộ bảng.')
+
+
+@click.command('seed')
+@click.option('--users', type=int, default=10, show_default=True, help='Số user mới.')
+@click.option('--expenses', type=int, default=500, show_default=True, help='Số expense trung bình mỗi user.')
+@click.option('--incomes', type=int, default=50, show_default=True, help='Số income trung bình mỗi user.')
+@click.option('--notifications', type=int, default=50, show_default=True, help='Số thông báo trung bình mỗi user.')
+@click.option('--items', type=int, default=10, show_default=True, help='Số user item trung bình mỗi user.')
+@click.option('--days', type=int, default=365, show_default=True, help='Khoảng thời gian của dữ liệu (ngày).')
+@click.option('--distribution', type=click.Choice(['uniform', 'zipf']), default='zipf', show_default=True,
+              help='Cách chia dữ liệu giữa các user.')
+@click.option('--seed', 'random_seed', type=int, default=42, show_default=True, help='Seed của bộ sinh ngẫu nhiên.')
+@click.option('--prefix', default='seed', show_default=True, help='Tiền tố username.')
+@click.option('--force', is_flag=True, help='Cho phép chạy trên database không phải SQLite.')
+def seed(users, expenses, incomes, notifications, items, days, distribution, random_seed, prefix, force):
+    """Sinh dữ liệu giả lập cho benchmark và phát triển local."""
+    from flask_app import db
+    from flask_app.seed import seed_database, SEED_PASSWORD
+
+    if db.engine.dialect.name != 'sqlite' and not force:
+        raise click.UsageError(f'Database hiện tại là {db.engine.dialect.name}, dùng --force nếu thật sự muốn sinh dữ liệu.')
+
+    user_ids, counts = seed_database(
+        users=users, expenses=expenses, incomes=incomes, notifications=notifications, items=items,
+        days=days, distribution=distribution, seed=random_seed, prefix=prefix
+    )
+    click.echo(', '.join(f'{count} {table}' for table, count in counts.items()))
+    if user_ids:
+        click.echo(f'User id {user_ids[0]}..{user_ids[-1]}, mật khẩu: {SEED_PASSWORD}')
+
+
+def register_commands(app):
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(notifications_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(dashboard_cli)
+    app.cli.add_command(check_query_plans)
+    app.cli.add_command(seed)
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt, create_access_token
 from flask_app.services.auth_service import AuthService
+from flask_app.hashing import HashingUnavailable
 from flask_app.schemas.user import user_schema, user_login_schema
 
 
@@ -13,11 +14,14 @@ def register():
     if errors:
         return jsonify({'error': errors}), 400
     
-    user, error = AuthService.create_user(
-        username=data['username'],
-        email=data['email'],
-        password=data['password']
-    )
+    try:
+        user, error = AuthService.create_user(
+            username=data['username'],
+            email=data['email'],
+            password=data['password']
+        )
+    except HashingUnavailable as e:
+        return hashing_unavailable(e)
     
     if error:
         return jsonify({'error': error}), 400
@@ -31,18 +35,26 @@ def login():
     if errors:
         return jsonify({'error': errors}), 400
     
-    user, error = AuthService.authenticate_user(
-        username=data['username'],
-        password=data['password']
-    )
+    try:
+        user, error = AuthService.authenticate_user(
+            username=data['username'],
+            password=data['password']
+        )
+    except HashingUnavailable as e:
+        return hashing_unavailable(e)
     
     if error:
         return jsonify({'error': error}), 401
     
-    access_token = create_access_token(identity=user.id)
+    access_token = create_access_token(identity=str(user.id))
     return jsonify(access_token=access_token, user=user_schema.dump(user)), 200
 
+def hashing_unavailable(error):
+    # Pool băm mật khẩu đầy: trả lỗi ngay để client thử lại thay vì chiếm luồng worker
+    return jsonify({'error': str(error)}), 503, {'Retry-After': '1'}
+
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    return jsonify({"message": "Đăng xuất thành công (client cần xóa token)"}), 200
\ No newline at end of file
+    AuthService.revoke_token(get_jwt())
+    return jsonify({"message": "Đăng xuất thành công"}), 200
\ No newline at end of file
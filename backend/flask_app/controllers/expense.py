@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_app.services.expense_service import ExpenseService
-from flask_app.schemas.expense import expense_schema, expenses_schema
-from flask_app.utils import handle_db_errors, build_response
+from flask_app.services.import_service import ImportService, parse_stream
+from flask_app.services.export_service import export_response
+from flask_app.services.bulk_service import BulkService, recategorize_args
+from flask_app.schemas.expense import expense_schema
+from flask_app.schemas.compiled import expenses_serializer
+from flask_app.utils import handle_db_errors, build_response, get_page_args, get_fields_arg, get_filter_args, summary_headers, page_headers, parse_id_list, collection_etag, row_etag
 from flask_app import db
 from datetime import datetime
 from flask_app.models.expense import Expense
@@ -18,17 +22,14 @@ def create_expense():
     if not all(key in data for key in ['category', 'amount']):
         return jsonify({"error": "Missing required fields"}), 400
     
-    expense = Expense(
+    expense = ExpenseService.create_expense(
         user_id=user_id,
         category=data['category'],
         amount=float(data['amount']),
         description=data.get('description', ''),
-        date=data.get('date') or datetime.utcnow()  
+        date=data.get('date') or datetime.utcnow()
     )
     
-    db.session.add(expense)
-    db.session.commit()
-    
     return jsonify({
         "message": "Expense đã tạo thành công",
         "expense": {
@@ -43,16 +44,82 @@ def create_expense():
 @expense_bp.route('/', methods=['GET'])
 @jwt_required()
 @handle_db_errors
+@collection_etag('expenses')
 def get_expenses():
     user_id = get_jwt_identity()
-    expenses = ExpenseService.get_all_expenses(user_id)
-    return build_response(
-        data=expenses_schema.dump(expenses),
+    try:
+        cursor, limit = get_page_args()
+        fields = get_fields_arg(expense_schema)
+    except ValueError:
+        return jsonify({'error': 'Tham số cursor, limit hoặc fields không hợp lệ'}), 400
+    try:
+        filters = get_filter_args()
+    except ValueError as e:
+        return jsonify({'error': f'Bộ lọc không hợp lệ: {e}'}), 400
+
+    expenses, next_cursor = ExpenseService.get_expenses_page(user_id, cursor, limit, fields, filters)
+    headers = page_headers(next_cursor)
+    if cursor is None:
+        # Tổng của cả cửa sổ lọc, chỉ tính ở trang đầu
+        headers.update(summary_headers(*ExpenseService.get_expenses_summary(user_id, filters)))
+    response, status = build_response(
+        data=expenses_serializer.only(fields).dump(expenses),
         message="Expenses được truy xuất thành công"
     )
+    return response, status, headers
+
+@expense_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_expenses():
+    user_id = get_jwt_identity()
+    try:
+        rows = parse_stream(request.stream, request.mimetype)
+        report = ImportService.import_rows(
+            Expense, expense_schema, user_id, rows,
+            chunk_size=current_app.config['IMPORT_CHUNK_SIZE'],
+            max_errors=current_app.config['IMPORT_MAX_ERRORS']
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(report), 200
+
+@expense_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_expenses():
+    user_id = get_jwt_identity()
+    try:
+        return export_response(Expense, user_id, 'expenses')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@expense_bp.route('/bulk-delete', methods=['POST'])
+@jwt_required()
+def bulk_delete_expenses():
+    user_id = get_jwt_identity()
+    try:
+        ids = parse_id_list((request.get_json(silent=True) or {}).get('ids'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    deleted = BulkService.delete_transactions(Expense, user_id, ids)
+    return jsonify({'deleted': deleted}), 200
+
+@expense_bp.route('/recategorize', methods=['POST'])
+@jwt_required()
+def recategorize_expenses():
+    user_id = get_jwt_identity()
+    try:
+        category, filters = recategorize_args(Expense, request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    updated = BulkService.recategorize(Expense, user_id, category, **filters)
+    return jsonify({'updated': updated}), 200
 
 @expense_bp.route('/<int:expense_id>', methods=['GET'])
 @jwt_required()
+@row_etag(Expense, 'expense_id')
 def get_expense(expense_id):
     user_id = get_jwt_identity()
     expense = ExpenseService.get_expense_by_id(expense_id, user_id)
@@ -64,6 +131,7 @@ def get_expense(expense_id):
 
 @expense_bp.route('/<int:expense_id>', methods=['PUT'])
 @jwt_required()
+@row_etag(Expense, 'expense_id')
 def update_expense(expense_id):
     user_id = get_jwt_identity()
     data = request.get_json()
@@ -77,6 +145,7 @@ def update_expense(expense_id):
 
 @expense_bp.route('/<int:expense_id>', methods=['DELETE'])
 @jwt_required()
+@row_etag(Expense, 'expense_id')
 def delete_expense(expense_id):
     user_id = get_jwt_identity()
     
@@ -0,0 +1,30 @@
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from flask_app.pool import pool_monitor
+from flask_app import db
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    # Liveness: process còn phục vụ request, không chạm tới database
+    return jsonify({'status': 'ok'}), 200
+
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    # Readiness: load balancer ngừng gửi request khi pool bão hòa hoặc mất kết nối database
+    stats = pool_monitor.stats()
+    ready, reason = pool_monitor.readiness(stats)
+    if ready:
+        try:
+            db.session.execute(text('SELECT 1'))
+        except SQLAlchemyError:
+            ready, reason = False, 'Không kết nối được database'
+        finally:
+            db.session.remove()
+
+    body = {'status': 'ready' if ready else 'not ready', 'pool': stats}
+    if reason:
+        body['reason'] = reason
+    return jsonify(body), 200 if ready else 503
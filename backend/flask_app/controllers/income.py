@@ -1,7 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_app.services.income_service import IncomeService
-from flask_app.schemas.income import income_schema, incomes_schema
+from flask_app.services.import_service import ImportService, parse_stream
+from flask_app.services.export_service import export_response
+from flask_app.services.bulk_service import BulkService, recategorize_args
+from flask_app.schemas.income import income_schema
+from flask_app.schemas.compiled import incomes_serializer
+from flask_app.utils import get_page_args, get_fields_arg, get_filter_args, summary_headers, page_headers, parse_id_list, collection_etag, row_etag
+from flask_app.models.income import Income
 
 income_bp = Blueprint('incomes', __name__)
 
@@ -27,13 +33,78 @@ def create_income():
 
 @income_bp.route('/', methods=['GET'])
 @jwt_required()
+@collection_etag('incomes')
 def get_incomes():
     user_id = get_jwt_identity()
-    incomes = IncomeService.get_all_incomes(user_id)
-    return jsonify(incomes_schema.dump(incomes)), 200
+    try:
+        cursor, limit = get_page_args()
+        fields = get_fields_arg(income_schema)
+    except ValueError:
+        return jsonify({'error': 'Tham số cursor, limit hoặc fields không hợp lệ'}), 400
+    try:
+        filters = get_filter_args()
+    except ValueError as e:
+        return jsonify({'error': f'Bộ lọc không hợp lệ: {e}'}), 400
+
+    incomes, next_cursor = IncomeService.get_incomes_page(user_id, cursor, limit, fields, filters)
+    headers = page_headers(next_cursor)
+    if cursor is None:
+        # Tổng của cả cửa sổ lọc, chỉ tính ở trang đầu
+        headers.update(summary_headers(*IncomeService.get_incomes_summary(user_id, filters)))
+    return jsonify(incomes_serializer.only(fields).dump(incomes)), 200, headers
+
+@income_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_incomes():
+    user_id = get_jwt_identity()
+    try:
+        rows = parse_stream(request.stream, request.mimetype)
+        report = ImportService.import_rows(
+            Income, income_schema, user_id, rows,
+            chunk_size=current_app.config['IMPORT_CHUNK_SIZE'],
+            max_errors=current_app.config['IMPORT_MAX_ERRORS']
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(report), 200
+
+@income_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_incomes():
+    user_id = get_jwt_identity()
+    try:
+        return export_response(Income, user_id, 'incomes')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@income_bp.route('/bulk-delete', methods=['POST'])
+@jwt_required()
+def bulk_delete_incomes():
+    user_id = get_jwt_identity()
+    try:
+        ids = parse_id_list((request.get_json(silent=True) or {}).get('ids'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    deleted = BulkService.delete_transactions(Income, user_id, ids)
+    return jsonify({'deleted': deleted}), 200
+
+@income_bp.route('/recategorize', methods=['POST'])
+@jwt_required()
+def recategorize_incomes():
+    user_id = get_jwt_identity()
+    try:
+        category, filters = recategorize_args(Income, request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    updated = BulkService.recategorize(Income, user_id, category, **filters)
+    return jsonify({'updated': updated}), 200
 
 @income_bp.route('/<int:income_id>', methods=['GET'])
 @jwt_required()
+@row_etag(Income, 'income_id')
 def get_income(income_id):
     user_id = get_jwt_identity()
     income = IncomeService.get_income_by_id(income_id, user_id)
@@ -45,6 +116,7 @@ def get_income(income_id):
 
 @income_bp.route('/<int:income_id>', methods=['PUT'])
 @jwt_required()
+@row_etag(Income, 'income_id')
 def update_income(income_id):
     user_id = get_jwt_identity()
     data = request.get_json()
@@ -58,6 +130,7 @@ def update_income(income_id):
 
 @income_bp.route('/<int:income_id>', methods=['DELETE'])
 @jwt_required()
+@row_etag(Income, 'income_id')
 def delete_income(income_id):
     user_id = get_jwt_identity()
     
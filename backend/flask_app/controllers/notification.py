@@ -1,7 +1,16 @@
-from flask import Blueprint, request, jsonify
+import time
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_app.services.notification_service import NotificationService
-from flask_app.schemas.notification import notification_schema, notifications_schema
+from flask_app.services.export_service import export_response
+from flask_app.services.bulk_service import BulkService
+from flask_app.services.rollup_service import RollupService
+from flask_app.schemas.notification import notification_schema
+from flask_app.schemas.compiled import notification_serializer, notifications_serializer
+from flask_app.utils import get_page_args, get_fields_arg, page_headers, parse_id_list, collection_etag, row_etag
+from flask_app.models.notification import Notification
+from flask_app.realtime import notification_hub, format_event, CLOSED
+from flask_app import db
 
 notification_bp = Blueprint('notifications', __name__)
 
@@ -25,13 +34,104 @@ def create_notification():
 
 @notification_bp.route('/', methods=['GET'])
 @jwt_required()
+@collection_etag('notifications')
 def get_notifications():
     user_id = get_jwt_identity()
-    notifications = NotificationService.get_all_notifications(user_id)
-    return jsonify(notifications_schema.dump(notifications)), 200
+    try:
+        cursor, limit = get_page_args()
+        fields = get_fields_arg(notification_schema)
+    except ValueError:
+        return jsonify({'error': 'Tham số cursor, limit hoặc fields không hợp lệ'}), 400
+
+    notifications, next_cursor = NotificationService.get_notifications_page(user_id, cursor, limit, fields)
+    return jsonify(notifications_serializer.only(fields).dump(notifications)), 200, page_headers(next_cursor)
+
+@notification_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_notifications():
+    user_id = get_jwt_identity()
+    try:
+        return export_response(Notification, user_id, 'notifications')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@notification_bp.route('/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    user_id = get_jwt_identity()
+    # Đọc bộ đếm trong user_totals, không truy vấn bảng notifications
+    return jsonify({'unread': RollupService.get_unread_count(user_id)}), 200
+
+@notification_bp.route('/stream', methods=['GET'])
+@jwt_required()
+def stream_notifications():
+    user_id = get_jwt_identity()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID không hợp lệ'}), 400
+
+    config = current_app.config
+    heartbeat = config['SSE_HEARTBEAT_INTERVAL']
+    replay_limit = config['SSE_REPLAY_LIMIT']
+    deadline = time.monotonic() + config['SSE_MAX_DURATION']
+    # Đăng ký trước khi đọc lại từ database để không lọt sự kiện ở khoảng giữa
+    subscription = notification_hub.subscribe(user_id)
+
+    def generate():
+        replayed = set()
+        try:
+            yield 'retry: 3000\n\n'
+            if last_id is not None:
+                missed = NotificationService.get_notifications_since(user_id, last_id, replay_limit + 1)
+                for notification in missed[:replay_limit]:
+                    replayed.add(notification.id)
+                    yield format_event(notification.id, current_app.json.dumps(notification_serializer.dump(notification)))
+                if len(missed) > replay_limit:
+                    # Thiếu quá nhiều sự kiện: client nên tải lại danh sách thay vì đọc lại từng cái
+                    yield format_event(max(replayed, default=last_id), '{}', event='reset')
+            # Trả connection về pool, luồng có thể mở trong nhiều phút
+            db.session.remove()
+
+            while time.monotonic() < deadline:
+                event = subscription.get(min(heartbeat, max(deadline - time.monotonic(), 0)))
+                if event is CLOSED:
+                    # Client đọc chậm, hàng đợi đầy: đóng để client kết nối lại với Last-Event-ID
+                    break
+                if event is None:
+                    yield ': heartbeat\n\n'
+                    continue
+                event_id, data = event
+                if event_id not in replayed:
+                    yield format_event(event_id, data)
+        finally:
+            notification_hub.unsubscribe(subscription)
+
+    response = current_app.response_class(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Hủy đăng ký cả khi client ngắt kết nối trước khi generator chạy
+    response.call_on_close(lambda: notification_hub.unsubscribe(subscription))
+    return response
+
+@notification_bp.route('/read', methods=['PUT'])
+@jwt_required()
+def mark_notifications_as_read():
+    user_id = get_jwt_identity()
+    try:
+        ids = parse_id_list((request.get_json(silent=True) or {}).get('ids'), required=False)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    updated = BulkService.mark_notifications_read(user_id, ids)
+    return jsonify({'updated': updated}), 200
 
 @notification_bp.route('/<int:notification_id>', methods=['GET'])
 @jwt_required()
+@row_etag(Notification, 'notification_id')
 def get_notification(notification_id):
     user_id = get_jwt_identity()
     notification = NotificationService.get_notification_by_id(notification_id, user_id)
@@ -43,6 +143,7 @@ def get_notification(notification_id):
 
 @notification_bp.route('/<int:notification_id>', methods=['PUT'])
 @jwt_required()
+@row_etag(Notification, 'notification_id')
 def update_notification(notification_id):
     user_id = get_jwt_identity()
     data = request.get_json()
@@ -56,6 +157,7 @@ def update_notification(notification_id):
 
 @notification_bp.route('/<int:notification_id>/read', methods=['PUT'])
 @jwt_required()
+@row_etag(Notification, 'notification_id')
 def mark_notification_as_read(notification_id):
     user_id = get_jwt_identity()
     
@@ -66,6 +168,7 @@ def mark_notification_as_read(notification_id):
 
 @notification_bp.route('/<int:notification_id>', methods=['DELETE'])
 @jwt_required()
+@row_etag(Notification, 'notification_id')
 def delete_notification(notification_id):
     user_id = get_jwt_identity()
     
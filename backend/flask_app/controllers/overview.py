@@ -1,9 +1,18 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_app.models import Expense, Income, UserItem
+from sqlalchemy import select, and_, or_
+from flask_app.models import Expense, Income
+from flask_app.models.rollup import UserTotal, DailyRollup, MonthlyRollup, CategoryRollup
 from flask_app import db
 from datetime import datetime, timedelta
-from sqlalchemy import func, extract, and_
+from flask_app.services.rollup_service import EXPENSE
+from flask_app.services.balance_service import BalanceService
+from flask_app.services.report_service import ReportService
+from flask_app.async_db import async_db
+from flask_app.aggregation import aggregate_queries, collect_aggregates
+from flask_app.cache import dashboard_cache
+from flask_app.events import cache_key, dashboard_version
+from flask_app.utils import admin_required, validate_date
 import calendar
 
 overview_bp = Blueprint('overview', __name__)
@@ -12,53 +21,215 @@ overview_bp = Blueprint('overview', __name__)
 @jwt_required()
 def get_dashboard():
     user_id = get_jwt_identity()
-    
+    key = cache_key(user_id)
+    mode = request.args.get('mode')
+    use_async = current_app.config['DASHBOARD_ASYNC'] if mode is None else mode == 'async'
+
+    # Đọc phiên bản trước khi tính dashboard: mục cache không bao giờ mới hơn phiên bản đi kèm
+    version = dashboard_version(user_id)
+    body = dashboard_cache.get(key, version)
+    if body is None:
+        generation = dashboard_cache.generation(key)
+        body = jsonify(build_dashboard(user_id, use_async=use_async)).get_data()
+        dashboard_cache.set(key, body, generation, version)
+
+    return current_app.response_class(body, mimetype=current_app.json.mimetype), 200
+
+@overview_bp.route('/balance-history', methods=['GET'])
+@jwt_required()
+def get_balance_history():
+    """Số dư theo thời gian: ?from=&to= (YYYY-MM-DD, mặc định 30 ngày tới hôm nay) và ?interval=day|week|month"""
+    user_id = get_jwt_identity()
+    interval = request.args.get('interval', 'day')
+    dates = {}
+    for name in ('from', 'to'):
+        raw = request.args.get(name)
+        if raw:
+            dates[name] = validate_date(raw)
+            if dates[name] is None:
+                return jsonify({'error': f'Ngày không hợp lệ: {raw}'}), 400
+    end = dates.get('to') or datetime.utcnow().date()
+    start = dates.get('from') or end - timedelta(days=30)
+
+    try:
+        points = BalanceService.get_history(
+            user_id, start, end, interval, max_points=current_app.config['BALANCE_HISTORY_MAX_POINTS']
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'interval': interval,
+        'points': [{
+            'date': point['date'].isoformat(),
+            'total_income': float(point['total_income']),
+            'total_expense': float(point['total_expense']),
+            'balance': float(point['balance'])
+        } for point in points]
+    }), 200
+
+@overview_bp.route('/report', methods=['GET'])
+@jwt_required()
+def get_report():
+    """
+    Báo cáo theo tháng: ?from=&to= (YYYY-MM-DD, mặc định 12 tháng gần nhất),
+    ?window= (số tháng của trung bình trượt, mặc định 3)
+    """
+    user_id = get_jwt_identity()
+    dates = {}
+    for name in ('from', 'to'):
+        raw = request.args.get(name)
+        if raw:
+            dates[name] = validate_date(raw)
+            if dates[name] is None:
+                return jsonify({'error': f'Ngày không hợp lệ: {raw}'}), 400
+    end = dates.get('to') or datetime.utcnow().date()
+    if 'from' in dates:
+        start = dates['from']
+    else:
+        month = end.year * 12 + end.month - 12
+        start = end.replace(year=month // 12, month=month % 12 + 1, day=1)
+
+    try:
+        window = int(request.args.get('window', 3))
+    except ValueError:
+        return jsonify({'error': 'window phải là số nguyên'}), 400
+
+    try:
+        report = ReportService.build_report(
+            user_id, start, end, window,
+            engine=current_app.config['REPORT_ENGINE'],
+            max_months=current_app.config['REPORT_MAX_MONTHS']
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(report), 200
+
+@overview_bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    return jsonify({'dashboard': dashboard_cache.stats()}), 200
+
+def dashboard_queries(user_id, now, source='rollup'):
+    """
+    Các câu truy vấn độc lập của dashboard. `source` = 'rollup' đọc các bảng
+    rollup; 'scan' tính trực tiếp trên bảng giao dịch (xem flask_app.aggregation)
+    """
+    recent_date = now - timedelta(days=7)
+
+    def recent(model):
+        return select(model.id, model.category, model.amount, model.date, model.description).where(
+            model.user_id == user_id,
+            model.date >= recent_date
+        ).order_by(model.date.desc()).limit(5)
+
+    queries = {
+        'recent_expenses': recent(Expense),
+        'recent_incomes': recent(Income),
+    }
+    if source == 'scan':
+        queries.update(aggregate_queries(user_id, now))
+    else:
+        queries.update(rollup_queries(user_id, now))
+    return queries
+
+def rollup_queries(user_id, now):
+    # Thống kê theo tháng (365 ngày gần nhất): các tháng trọn vẹn lấy từ
+    # rollup tháng, phần còn lại của tháng đầu kỳ lấy từ rollup ngày
+    year_start = now - timedelta(days=365)
+    month_end = year_start.date().replace(day=calendar.monthrange(year_start.year, year_start.month)[1])
+
+    def daily(since, until=None):
+        query = select(DailyRollup.day, DailyRollup.total, DailyRollup.count).where(
+            DailyRollup.user_id == user_id,
+            DailyRollup.kind == EXPENSE,
+            DailyRollup.day >= since
+        )
+        if until is not None:
+            query = query.where(DailyRollup.day <= until)
+        return query
+
+    return {
+        'totals': select(UserTotal.total_income, UserTotal.total_expense, UserTotal.total_debt).where(
+            UserTotal.user_id == user_id
+        ),
+        'weekly': daily((now - timedelta(days=30)).date()),
+        'monthly': select(MonthlyRollup.month, MonthlyRollup.total, MonthlyRollup.count).where(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.kind == EXPENSE,
+            or_(
+                MonthlyRollup.year > year_start.year,
+                and_(MonthlyRollup.year == year_start.year, MonthlyRollup.month > year_start.month)
+            )
+        ),
+        'first_month': daily(year_start.date(), month_end),
+        'categories': select(CategoryRollup.category, CategoryRollup.total).where(
+            CategoryRollup.user_id == user_id,
+            CategoryRollup.kind == EXPENSE,
+            CategoryRollup.count != 0
+        ).order_by(CategoryRollup.category),
+    }
+
+def rollup_aggregates(rows):
+    """Các tổng của dashboard từ kết quả của `rollup_queries` (cùng dạng với aggregation.collect_aggregates)"""
+    totals = rows['totals'][0] if rows['totals'] else None
+
+    # Thống kê theo tuần (30 ngày gần nhất, gộp theo DAYOFWEEK: 1 = Chủ nhật)
+    weekly_totals = {}
+    for row in rows['weekly']:
+        if row.count:
+            day_of_week = row.day.isoweekday() % 7 + 1
+            weekly_totals[day_of_week] = weekly_totals.get(day_of_week, 0) + row.total
+
+    monthly_totals = {}
+    for row in rows['monthly']:
+        if row.count:
+            monthly_totals[row.month] = monthly_totals.get(row.month, 0) + row.total
+    for row in rows['first_month']:
+        if row.count:
+            monthly_totals[row.day.month] = monthly_totals.get(row.day.month, 0) + row.total
+
+    return {
+        'total_income': totals.total_income if totals else 0,
+        'total_expense': totals.total_expense if totals else 0,
+        'total_debt': totals.total_debt if totals else 0,
+        'weekly': weekly_totals,
+        'monthly': monthly_totals,
+        'categories': {row.category: row.total for row in rows['categories']},
+    }
+
+def build_dashboard(user_id, use_async=False, source=None, now=None):
+    """
+    Dữ liệu dashboard. Với `use_async`, các câu truy vấn được gửi đồng thời
+    qua engine async (xem flask_app.async_db); nếu không có driver async
+    hoặc lỗi thì chạy lần lượt trên session như bình thường. `source` mặc
+    định là DASHBOARD_SOURCE.
+    """
+    source = source or current_app.config['DASHBOARD_SOURCE']
+    now = now or datetime.utcnow()
+    queries = dashboard_queries(user_id, now, source)
+    rows = None
+    if use_async and async_db.available:
+        try:
+            rows = async_db.execute_all(queries)
+        except Exception:
+            current_app.logger.exception('Dashboard async lỗi, chuyển sang chạy tuần tự')
+    if rows is None:
+        rows = {name: db.session.execute(query).all() for name, query in queries.items()}
+    aggregates = collect_aggregates(rows) if source == 'scan' else rollup_aggregates(rows)
+    return assemble_dashboard(aggregates, rows)
+
+def assemble_dashboard(aggregates, rows):
     # Tổng quan tài chính
-    total_income = db.session.query(func.sum(Income.amount)).filter_by(user_id=user_id).scalar() or 0
-    total_expense = db.session.query(func.sum(Expense.amount)).filter_by(user_id=user_id).scalar() or 0
+    total_income = aggregates['total_income']
+    total_expense = aggregates['total_expense']
     balance = total_income - total_expense
-    total_debt = db.session.query(func.sum(UserItem.balance)).filter_by(user_id=user_id).scalar() or 0
-    
-    # Giao dịch gần đây (7 ngày)
-    recent_date = datetime.utcnow() - timedelta(days=7)
-    
-    recent_transactions = {
-        'expenses': db.session.query(Expense).filter(
-            Expense.user_id == user_id,
-            Expense.date >= recent_date
-        ).order_by(Expense.date.desc()).limit(5).all(),
-        
-        'incomes': db.session.query(Income).filter(
-            Income.user_id == user_id,
-            Income.date >= recent_date
-        ).order_by(Income.date.desc()).limit(5).all()
-    }
-    
-    # Thống kê theo tuần
-    weekly_stats = db.session.query(
-        func.sum(Expense.amount).label('total_expense'),
-        func.dayofweek(Expense.date).label('day_of_week')
-    ).filter(
-        Expense.user_id == user_id,
-        Expense.date >= datetime.utcnow() - timedelta(days=30)
-    ).group_by('day_of_week').all()
-    
-    # Thống kê theo tháng
-    monthly_stats = db.session.query(
-        func.sum(Expense.amount).label('total_expense'),
-        extract('month', Expense.date).label('month')
-    ).filter(
-        Expense.user_id == user_id,
-        Expense.date >= datetime.utcnow() - timedelta(days=365)
-    ).group_by('month').all()
-    
-    # Phân tích chi phí theo danh mục
-    category_stats = db.session.query(
-        Expense.category,
-        func.sum(Expense.amount).label('total_amount')
-    ).filter_by(user_id=user_id).group_by(Expense.category).all()
-    
-    return jsonify({
+    total_debt = aggregates['total_debt']
+
+    return {
         'summary': {
             'balance': float(balance),
             'total_income': float(total_income),
@@ -72,28 +243,28 @@ def get_dashboard():
                 'amount': float(e.amount),
                 'date': e.date.isoformat(),
                 'description': e.description
-            } for e in recent_transactions['expenses']],
-            
+            } for e in rows['recent_expenses']],
+
             'incomes': [{
                 'id': i.id,
                 'category': i.category,
                 'amount': float(i.amount),
                 'date': i.date.isoformat(),
                 'description': i.description
-            } for i in recent_transactions['incomes']]
+            } for i in rows['recent_incomes']]
         },
         'weekly_stats': [{
-            'day': calendar.day_name[w.day_of_week - 1],
-            'total_expense': float(w.total_expense) if w.total_expense else 0
-        } for w in weekly_stats],
-        
+            'day': calendar.day_name[day_of_week - 1],
+            'total_expense': float(total) if total else 0
+        } for day_of_week, total in sorted(aggregates['weekly'].items())],
+
         'monthly_stats': [{
-            'month': calendar.month_name[int(m.month)],
-            'total_expense': float(m.total_expense) if m.total_expense else 0
-        } for m in monthly_stats],
-        
+            'month': calendar.month_name[month],
+            'total_expense': float(total) if total else 0
+        } for month, total in sorted(aggregates['monthly'].items())],
+
         'category_stats': [{
-            'category': dict(Expense.CATEGORY_CHOICES).get(c.category, c.category),
-            'total_amount': float(c.total_amount) if c.total_amount else 0
-        } for c in category_stats]
-    }), 200
\ No newline at end of file
+            'category': dict(Expense.CATEGORY_CHOICES).get(category, category),
+            'total_amount': float(total) if total else 0
+        } for category, total in aggregates['categories'].items()]
+    }
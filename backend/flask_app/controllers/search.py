@@ -1,56 +1,114 @@
-from flask import Blueprint, request, jsonify
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_app.models import Expense, Income, Notification, UserItem
-from flask_app.schemas.expense import expenses_schema
-from flask_app.schemas.income import incomes_schema
-from flask_app.schemas.notification import notifications_schema
-from flask_app.schemas.user_item import user_items_schema
+from flask_app.services.search_service import SearchService
+from flask_app.deadline import statement_deadline, DeadlineExceeded
+from flask_app.utils import partial_headers
+from flask_app import db
+from flask_app.schemas.compiled import (
+    expenses_serializer, incomes_serializer, notifications_serializer, user_items_serializer
+)
 
 search_bp = Blueprint('search', __name__)
 
+_executor = None
+_executor_lock = threading.Lock()
+
 @search_bp.route('/', methods=['GET'])
 @jwt_required()
 def search_all():
     user_id = get_jwt_identity()
     query = request.args.get('q', '').strip()
-    
+
     if not query:
         return jsonify({"error": "Query parameter 'q' is required"}), 400
-    
-    # Tìm kiếm trong tất cả các bảng
-    results = {
-        "expenses": search_expenses(user_id, query),
-        "incomes": search_incomes(user_id, query),
-        "notifications": search_notifications(user_id, query),
-        "user_items": search_user_items(user_id, query)
-    }
-    
-    return jsonify(results), 200
-
-def search_expenses(user_id, query):
-    expenses = Expense.query.filter(
-        Expense.user_id == user_id,
-        Expense.description.ilike(f'%{query}%')
-    ).all()
-    return expenses_schema.dump(expenses)
-
-def search_incomes(user_id, query):
-    incomes = Income.query.filter(
-        Income.user_id == user_id,
-        Income.description.ilike(f'%{query}%')
-    ).all()
-    return incomes_schema.dump(incomes)
-
-def search_notifications(user_id, query):
-    notifications = Notification.query.filter(
-        Notification.user_id == user_id,
-        Notification.description.ilike(f'%{query}%')
-    ).order_by(Notification.created_at.desc()).all()
-    return notifications_schema.dump(notifications)
-
-def search_user_items(user_id, query):
-    items = UserItem.query.filter(
-        UserItem.user_id == user_id,
-        UserItem.name.ilike(f'%{query}%')
-    ).all()
-    return user_items_schema.dump(items)
\ No newline at end of file
+
+    limit = request.args.get('limit', type=int) or current_app.config['SEARCH_PAGE_SIZE']
+    page = request.args.get('page', type=int) or 1
+    if limit < 1 or page < 1:
+        return jsonify({"error": "Tham số limit hoặc page không hợp lệ"}), 400
+    limit = min(limit, current_app.config['MAX_PAGE_SIZE'])
+    offset = (page - 1) * limit
+
+    mode = request.args.get('mode')
+    parallel = current_app.config['SEARCH_PARALLEL'] if mode is None else mode == 'parallel'
+
+    # Tìm kiếm trong tất cả các bảng (kết quả sắp xếp theo độ liên quan)
+    results, timed_out = search_tables(user_id, query, limit, offset, parallel=parallel)
+
+    return jsonify(results), 200, partial_headers(timed_out)
+
+def search_tables(user_id, query, limit=20, offset=0, parallel=False, timeout=None):
+    """
+    Chạy tìm kiếm trên cả bốn bảng, trả về (kết quả theo bảng, các bảng quá hạn).
+    Mỗi bảng có hạn chót `timeout` giây (mặc định SEARCH_TIMEOUT) tính từ lúc
+    bắt đầu; câu lệnh quá hạn bị database ngắt (statement_deadline) nên không
+    giữ luồng hay connection, bảng đó trả về danh sách rỗng. Ở chế độ parallel,
+    mỗi bảng chạy trên một luồng riêng với app context (và session) riêng.
+    """
+    app = current_app._get_current_object()
+    if timeout is None:
+        timeout = app.config['SEARCH_TIMEOUT']
+    deadline = time.monotonic() + timeout
+
+    if parallel:
+        # Việc phải xếp hàng chờ luồng cũng tính vào hạn chót của bảng
+        executor = _get_executor(app.config['SEARCH_WORKERS'])
+        futures = {
+            kind: executor.submit(_run_with_app_context, app, _search_table, search, deadline, user_id, query, limit, offset)
+            for kind, search in SEARCHES.items()
+        }
+        outcomes = {kind: future.result() for kind, future in futures.items()}
+    else:
+        outcomes = {
+            kind: _search_table(search, deadline, user_id, query, limit, offset)
+            for kind, search in SEARCHES.items()
+        }
+
+    timed_out = [kind for kind, rows in outcomes.items() if rows is None]
+    return {kind: rows or [] for kind, rows in outcomes.items()}, timed_out
+
+def _search_table(search, deadline, *args):
+    """Kết quả của `search`, None nếu quá hạn chót"""
+    try:
+        with statement_deadline(db.session.connection(), deadline):
+            return search(*args)
+    except DeadlineExceeded:
+        db.session.rollback()
+        return None
+
+def _run_with_app_context(app, fn, *args):
+    with app.app_context():
+        return fn(*args)
+
+def _get_executor(workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search')
+        return _executor
+
+def search_expenses(user_id, query, limit=20, offset=0):
+    expenses = SearchService.search(user_id, query, 'expenses', limit, offset)
+    return expenses_serializer.dump(expenses)
+
+def search_incomes(user_id, query, limit=20, offset=0):
+    incomes = SearchService.search(user_id, query, 'incomes', limit, offset)
+    return incomes_serializer.dump(incomes)
+
+def search_notifications(user_id, query, limit=20, offset=0):
+    notifications = SearchService.search(user_id, query, 'notifications', limit, offset)
+    return notifications_serializer.dump(notifications)
+
+def search_user_items(user_id, query, limit=20, offset=0):
+    items = SearchService.search(user_id, query, 'user_items', limit, offset)
+    return user_items_serializer.dump(items)
+
+SEARCHES = {
+    "expenses": search_expenses,
+    "incomes": search_incomes,
+    "notifications": search_notifications,
+    "user_items": search_user_items
+}
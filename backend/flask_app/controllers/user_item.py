@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_app.services.user_item_service import UserItemService
-from flask_app.schemas.user_item import user_item_schema, user_items_schema
+from flask_app.schemas.user_item import user_item_schema
+from flask_app.schemas.compiled import user_items_serializer
+from flask_app.utils import get_page_args, get_fields_arg, page_headers, collection_etag, row_etag
+from flask_app.models.user_item import UserItem
 
 user_item_bp = Blueprint('user_items', __name__)
 
@@ -29,13 +32,21 @@ def create_user_item():
 
 @user_item_bp.route('/', methods=['GET'])
 @jwt_required()
+@collection_etag('user_items')
 def get_user_items():
     user_id = get_jwt_identity()
-    user_items = UserItemService.get_all_user_items(user_id)
-    return jsonify(user_items_schema.dump(user_items)), 200
+    try:
+        cursor, limit = get_page_args()
+        fields = get_fields_arg(user_item_schema)
+    except ValueError:
+        return jsonify({'error': 'Tham số cursor, limit hoặc fields không hợp lệ'}), 400
+
+    user_items, next_cursor = UserItemService.get_user_items_page(user_id, cursor, limit, fields)
+    return jsonify(user_items_serializer.only(fields).dump(user_items)), 200, page_headers(next_cursor)
 
 @user_item_bp.route('/<int:item_id>', methods=['GET'])
 @jwt_required()
+@row_etag(UserItem, 'item_id')
 def get_user_item(item_id):
     user_id = get_jwt_identity()
     user_item = UserItemService.get_user_item_by_id(item_id, user_id)
@@ -47,6 +58,7 @@ def get_user_item(item_id):
 
 @user_item_bp.route('/<int:item_id>', methods=['PUT'])
 @jwt_required()
+@row_etag(UserItem, 'item_id')
 def update_user_item(item_id):
     user_id = get_jwt_identity()
     data = request.get_json()
@@ -60,6 +72,7 @@ def update_user_item(item_id):
 
 @user_item_bp.route('/<int:item_id>', methods=['DELETE'])
 @jwt_required()
+@row_etag(UserItem, 'item_id')
 def delete_user_item(item_id):
     user_id = get_jwt_identity()
     
@@ -0,0 +1,75 @@
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+
+# Số lệnh máy ảo SQLite giữa hai lần kiểm tra hạn chót
+SQLITE_PROGRESS_STEPS = 1000
+
+
+class DeadlineExceeded(Exception):
+    """Câu lệnh bị database ngắt vì quá hạn chót"""
+
+
+@contextmanager
+def statement_deadline(connection, deadline):
+    """
+    Giới hạn các câu lệnh chạy trên `connection` (Connection của SQLAlchemy)
+    trong khối with tới thời điểm `deadline` (theo time.monotonic()). Chính
+    database ngắt câu lệnh đang chạy khi hết hạn, nên luồng và connection
+    được giải phóng ngay thay vì chạy tiếp tới khi xong:
+    - SQLite: progress handler của sqlite3 trả về khác 0 khi quá hạn
+    - MySQL: max_execution_time (MariaDB: max_statement_time) của session,
+      đặt theo thời gian còn lại trước mỗi câu lệnh
+    - PostgreSQL: statement_timeout, đặt theo thời gian còn lại
+
+    Lỗi của câu lệnh bị ngắt được đổi thành DeadlineExceeded; transaction
+    của connection cần được rollback sau đó.
+    """
+    dialect = connection.dialect
+    dbapi_connection = connection.connection.driver_connection
+
+    def remaining_ms():
+        return max(int((deadline - time.monotonic()) * 1000), 1)
+
+    def set_timeout(conn, cursor, statement, parameters, context, executemany):
+        if dialect.name == 'mysql' and getattr(dialect, 'is_mariadb', False):
+            cursor.execute(f'SET SESSION max_statement_time = {remaining_ms() / 1000:.3f}')
+        elif dialect.name == 'mysql':
+            cursor.execute(f'SET SESSION max_execution_time = {remaining_ms()}')
+        else:
+            # SET LOCAL: hết hiệu lực khi transaction kết thúc, kể cả khi bị hủy do timeout
+            cursor.execute(f'SET LOCAL statement_timeout = {remaining_ms()}')
+
+    if dialect.name == 'sqlite':
+        dbapi_connection.set_progress_handler(lambda: int(time.monotonic() >= deadline), SQLITE_PROGRESS_STEPS)
+    elif dialect.name in ('mysql', 'postgresql'):
+        event.listen(connection, 'before_cursor_execute', set_timeout)
+
+    try:
+        yield
+    except DBAPIError as e:
+        if time.monotonic() >= deadline:
+            raise DeadlineExceeded(str(e.orig)) from e
+        raise
+    else:
+        if dialect.name == 'postgresql':
+            _execute(connection, 'SET LOCAL statement_timeout = DEFAULT')
+    finally:
+        if dialect.name == 'sqlite':
+            dbapi_connection.set_progress_handler(None, 0)
+        elif dialect.name in ('mysql', 'postgresql'):
+            event.remove(connection, 'before_cursor_execute', set_timeout)
+        # Biến session của MySQL còn giữ sau rollback nên luôn phải đặt lại
+        if dialect.name == 'mysql' and not (connection.invalidated or connection.closed):
+            variable = 'max_statement_time' if getattr(dialect, 'is_mariadb', False) else 'max_execution_time'
+            _execute(connection, f'SET SESSION {variable} = DEFAULT')
+
+
+def _execute(connection, statement):
+    # Chạy thẳng trên DBAPI cursor để không kích hoạt lại before_cursor_execute
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        cursor.execute(statement)
+    finally:
+        cursor.close()
@@ -0,0 +1,79 @@
+from sqlalchemy import event
+from flask_app.cache import dashboard_cache
+from flask_app.models.expense import Expense
+from flask_app.models.income import Income
+from flask_app.models.user_item import UserItem
+from flask_app.services.version_service import VersionService, MODEL_COLLECTIONS, ROLLUP_COLLECTION
+
+# Các model mà dashboard phụ thuộc vào
+DASHBOARD_MODELS = (Expense, Income, UserItem)
+# Các phiên bản quyết định nội dung dashboard: thay đổi khi bất kỳ tiến trình nào commit
+DASHBOARD_COLLECTIONS = tuple(MODEL_COLLECTIONS[model] for model in DASHBOARD_MODELS) + (ROLLUP_COLLECTION,)
+
+CHANGED_USERS_KEY = 'dashboard_changed_users'
+ALL_USERS = object()
+
+
+def cache_key(user_id):
+    return str(user_id)
+
+
+def dashboard_version(user_id):
+    """
+    Phiên bản dữ liệu dashboard của `user_id`, lưu kèm mục cache. Xóa cache
+    khi commit chỉ có tác dụng trong tiến trình đã ghi; so phiên bản lưu
+    trong database giúp các worker khác không trả dashboard cũ.
+    """
+    return VersionService.get_many(int(user_id), DASHBOARD_COLLECTIONS)
+
+
+def mark_changed(session, user_id=None):
+    """
+    Đánh dấu dữ liệu dashboard của `user_id` (None = mọi user) đã thay đổi.
+    Dùng cho các thao tác ghi bằng Core (insert/update hàng loạt) không đi
+    qua flush của ORM; cache chỉ bị xóa khi transaction commit.
+    """
+    changed = session.info.setdefault(CHANGED_USERS_KEY, set())
+    changed.add(ALL_USERS if user_id is None else cache_key(user_id))
+
+
+def _after_flush(session, flush_context):
+    collections = set()
+    modified = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in (*session.new, *modified, *session.deleted):
+        if isinstance(obj, DASHBOARD_MODELS) and obj.user_id is not None:
+            mark_changed(session, obj.user_id)
+        collection = MODEL_COLLECTIONS.get(type(obj))
+        if collection and obj.user_id is not None:
+            collections.add((int(obj.user_id), collection))
+
+    # Tăng phiên bản danh sách ngay trong transaction của lần flush này
+    for user_id, collection in sorted(collections):
+        VersionService.bump(user_id, collection, session.connection())
+
+
+def _after_commit(session):
+    changed = session.info.pop(CHANGED_USERS_KEY, None)
+    if not changed:
+        return
+    if ALL_USERS in changed:
+        dashboard_cache.clear()
+        return
+    for key in changed:
+        dashboard_cache.invalidate(key)
+
+
+def _after_rollback(session):
+    session.info.pop(CHANGED_USERS_KEY, None)
+
+
+def register_events(session):
+    """
+    Gắn các listener vào session (scoped_session của db): xóa cache dashboard
+    và tăng phiên bản danh sách khi expense, income, notification, user item thay đổi
+    """
+    if event.contains(session, 'after_flush', _after_flush):
+        return
+    event.listen(session, 'after_flush', _after_flush)
+    event.listen(session, 'after_commit', _after_commit)
+    event.listen(session, 'after_rollback', _after_rollback)
@@ -8,3 +8,9 @@ migrate = Migrate()
 jwt = JWTManager()
 
 
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    from flask_app.revocation import token_denylist
+    return token_denylist.is_revoked(jwt_payload['jti'])
+
+
@@ -0,0 +1,144 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# forkserver không fork lại process web đang chạy nhiều luồng (và giữ lock).
+# Process con import lại module __main__, script khởi động cần `if __name__ == '__main__'`.
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class HashingUnavailable(Exception):
+    """Pool băm mật khẩu đang đầy hoặc không trả kết quả kịp"""
+
+
+class PasswordHasher:
+    """
+    Băm và kiểm tra mật khẩu trên một process pool riêng, để phần tính toán
+    PBKDF2/scrypt không giữ GIL của worker web. Số việc đang chờ hoặc đang
+    chạy bị giới hạn bởi `queue_size`; khi đầy, HashingUnavailable được raise
+    ngay (controller trả 503) thay vì xếp hàng. `workers=0` băm ngay trong
+    luồng gọi.
+    """
+
+    def __init__(self, method='scrypt', salt_length=16, workers=2, queue_size=32, queue_timeout=0.0, timeout=5.0):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._canonical = {}
+        self.configure(method, salt_length, workers, queue_size, queue_timeout, timeout)
+
+    def configure(self, method, salt_length, workers, queue_size, queue_timeout=0.0, timeout=5.0):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self.pending = 0
+        self.counters = dict.fromkeys(('hashed', 'verified', 'rejected', 'timeouts', 'broken'), 0)
+
+    def init_app(self, app):
+        self.shutdown()
+        self.configure(
+            app.config['PASSWORD_HASH_METHOD'],
+            app.config['PASSWORD_SALT_LENGTH'],
+            app.config['PASSWORD_HASH_WORKERS'],
+            app.config['PASSWORD_HASH_QUEUE_SIZE'],
+            app.config['PASSWORD_HASH_QUEUE_TIMEOUT'],
+            app.config['PASSWORD_HASH_TIMEOUT']
+        )
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Tạo khi dùng lần đầu, tức là sau khi server đã fork xong các worker
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(START_METHOD)
+                )
+            return self._executor
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _release(self, slots):
+        with self._lock:
+            self.pending -= 1
+        slots.release()
+
+    def _broken(self):
+        self._count('broken')
+        # Một process con chết làm hỏng cả pool, lần gọi sau sẽ tạo pool mới
+        self.shutdown()
+        return HashingUnavailable('Dịch vụ xác thực tạm thời gián đoạn, vui lòng thử lại sau')
+
+    def _run(self, fn, *args, **kwargs):
+        if not self.workers:
+            return fn(*args, **kwargs)
+
+        slots = self._slots
+        if not slots.acquire(timeout=self.queue_timeout):
+            self._count('rejected')
+            raise HashingUnavailable('Hệ thống đang bận, vui lòng thử lại sau')
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+        except (BrokenProcessPool, RuntimeError):
+            slots.release()
+            raise self._broken()
+        with self._lock:
+            self.pending += 1
+        future.add_done_callback(lambda _: self._release(slots))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Việc chưa chạy thì hủy để trả chỗ trong hàng đợi
+            future.cancel()
+            self._count('timeouts')
+            raise HashingUnavailable('Hệ thống đang bận, vui lòng thử lại sau')
+        except BrokenProcessPool:
+            raise self._broken()
+
+    def hash(self, password):
+        self._count('hashed')
+        return self._run(generate_password_hash, password, method=self.method, salt_length=self.salt_length)
+
+    def verify(self, password_hash, password):
+        self._count('verified')
+        return self._run(check_password_hash, password_hash, password)
+
+    def canonical_method(self):
+        """Method đầy đủ tham số như werkzeug ghi trong hash, vd. 'scrypt' -> 'scrypt:32768:8:1'"""
+        method = self.method
+        if method not in self._canonical:
+            self._canonical[method] = generate_password_hash('', method=method, salt_length=1).split('$', 1)[0]
+        return self._canonical[method]
+
+    def needs_rehash(self, password_hash):
+        """Hash được tạo với method, tham số hoặc độ dài salt khác cấu hình hiện tại (mạnh hơn hay yếu hơn)"""
+        parts = password_hash.split('$')
+        if len(parts) != 3:
+            return True
+        method, salt, _ = parts
+        return method != self.canonical_method() or len(salt) != self.salt_length
+
+    def stats(self):
+        with self._lock:
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'pending': self.pending,
+                **self.counters,
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,58 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn, thiếu thì dùng module json chuẩn
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider dùng orjson khi có cài đặt, cùng quy ước với provider mặc
+    định của Flask: sắp xếp key, date theo HTTP date, Decimal/UUID thành
+    chuỗi, compact (hoặc thụt lề 2 khi debug) và xuống dòng ở cuối response.
+
+    Khác biệt duy nhất: ký tự ngoài ASCII được ghi thẳng dạng UTF-8 thay vì
+    escape \\uXXXX (ensure_ascii=False), nên đường dự phòng cũng làm như vậy.
+    """
+
+    ensure_ascii = False
+
+    def _options(self, indent=False):
+        # Để datetime và dataclass đi qua `default` giống provider mặc định
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+        except TypeError:
+            # Số nguyên vượt 64 bit, key không sắp xếp được...
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity và số quá lớn: để module json chuẩn xử lý/báo lỗi
+            return super().loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -3,6 +3,13 @@ from .income import Income
 from .expense import Expense
 from .notification import Notification
 from .user_item import UserItem
+from .rollup import UserTotal, DailyRollup, MonthlyRollup, CategoryRollup, BalanceCheckpoint
+from .search import SearchToken
+from .version import CollectionVersion
 
 
-__all__ = ['User', 'Expense', 'Income', 'Notification', 'UserItem']
\ No newline at end of file
+__all__ = [
+    'User', 'Expense', 'Income', 'Notification', 'UserItem',
+    'UserTotal', 'DailyRollup', 'MonthlyRollup', 'CategoryRollup', 'BalanceCheckpoint',
+    'SearchToken', 'CollectionVersion'
+]
\ No newline at end of file
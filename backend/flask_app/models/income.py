@@ -3,6 +3,10 @@ from datetime import datetime
 
 class Income(db.Model):
     __tablename__ = 'incomes'
+    __table_args__ = (
+        db.Index('ix_incomes_user_id_date', 'user_id', 'date'),
+        db.Index('ix_incomes_user_id_category_date', 'user_id', 'category', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -12,6 +16,10 @@ class Income(db.Model):
     date = db.Column(db.DateTime, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Phiên bản của dòng: dùng làm ETag và để khóa lạc quan khi cập nhật
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+
+    __mapper_args__ = {'version_id_col': version}
     
     # Category mặc định
     SALARY = 'salary'
@@ -3,6 +3,10 @@ from datetime import datetime
 
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        db.Index('ix_notifications_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_notifications_user_id_is_read', 'user_id', 'is_read'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -11,6 +15,10 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Phiên bản của dòng: dùng làm ETag và để khóa lạc quan khi cập nhật
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+
+    __mapper_args__ = {'version_id_col': version}
     
     def __repr__(self):
         return f'<Notification {self.id} - {self.title}>'
\ No newline at end of file
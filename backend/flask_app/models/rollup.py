@@ -0,0 +1,74 @@
+from flask_app import db
+
+
+class UserTotal(db.Model):
+    """Tổng cộng dồn theo người dùng (thu, chi, dư nợ, số thông báo chưa đọc)"""
+    __tablename__ = 'user_totals'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    total_income = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    total_expense = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    total_debt = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<UserTotal {self.user_id}>'
+
+
+class DailyRollup(db.Model):
+    """Tổng theo ngày cho từng loại giao dịch ('expense' / 'income')"""
+    __tablename__ = 'daily_rollups'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    kind = db.Column(db.String(10), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DailyRollup {self.user_id} {self.kind} {self.day}>'
+
+
+class MonthlyRollup(db.Model):
+    """Tổng theo tháng cho từng loại giao dịch"""
+    __tablename__ = 'monthly_rollups'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    kind = db.Column(db.String(10), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<MonthlyRollup {self.user_id} {self.kind} {self.year}-{self.month}>'
+
+
+class CategoryRollup(db.Model):
+    """Tổng theo danh mục cho từng loại giao dịch"""
+    __tablename__ = 'category_rollups'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    kind = db.Column(db.String(10), primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CategoryRollup {self.user_id} {self.kind} {self.category}>'
+
+
+class BalanceCheckpoint(db.Model):
+    """
+    Tổng thu/chi cộng dồn của mọi giao dịch trước ngày đầu tháng `month`,
+    tính lười khi cần và bị xóa khi có giao dịch ghi lùi ngày trước tháng đó
+    """
+    __tablename__ = 'balance_checkpoints'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    total_income = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    total_expense = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<BalanceCheckpoint {self.user_id} {self.month}>'
@@ -0,0 +1,58 @@
+from flask_app import db
+from sqlalchemy import event
+
+# Bảng tài liệu tìm kiếm (không khai báo như model vì DDL khác nhau theo database):
+# - SQLite: virtual table FTS5
+# - MySQL: bảng thường có chỉ mục FULLTEXT trên body
+# body chứa các token đã gắn phạm vi user/kind (xem search_service.scoped_tokens)
+FTS_TABLE = 'search_documents'
+FTS_DDL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+    'USING fts5(body, user_id UNINDEXED, kind UNINDEXED, ref_id UNINDEXED)'
+)
+FULLTEXT_DDL = (
+    f'CREATE TABLE IF NOT EXISTS {FTS_TABLE} ('
+    'rowid BIGINT NOT NULL PRIMARY KEY, '
+    'body TEXT NOT NULL, '
+    'user_id INTEGER NOT NULL, '
+    'kind VARCHAR(20) NOT NULL, '
+    'ref_id INTEGER NOT NULL, '
+    f'KEY ix_{FTS_TABLE}_user_id (user_id), '
+    f'FULLTEXT KEY ft_{FTS_TABLE}_body (body)'
+    ') ENGINE=InnoDB'
+)
+
+
+class SearchToken(db.Model):
+    """Inverted index dạng bảng (token -> tài liệu), dùng khi không có FULLTEXT/FTS5"""
+    __tablename__ = 'search_tokens'
+    __table_args__ = (
+        db.Index('ix_search_tokens_kind_ref_id', 'kind', 'ref_id'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    token = db.Column(db.String(64), primary_key=True)
+    kind = db.Column(db.String(20), primary_key=True)
+    ref_id = db.Column(db.Integer, primary_key=True)
+    weight = db.Column(db.Integer, nullable=False, default=1)
+
+    def __repr__(self):
+        return f'<SearchToken {self.token} {self.kind}:{self.ref_id}>'
+
+
+def fts5_available(connection):
+    return bool(connection.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_fts_table(target, connection, **kw):
+    if connection.dialect.name == 'mysql':
+        connection.exec_driver_sql(FULLTEXT_DDL)
+    elif connection.dialect.name == 'sqlite' and fts5_available(connection):
+        connection.exec_driver_sql(FTS_DDL)
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_fts_table(target, connection, **kw):
+    if connection.dialect.name in ('mysql', 'sqlite'):
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {FTS_TABLE}')
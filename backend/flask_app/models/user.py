@@ -1,5 +1,5 @@
 from flask_app import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_app.hashing import password_hasher
 from datetime import datetime
 
 class User(db.Model):
@@ -21,10 +21,10 @@ class User(db.Model):
 
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
         
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.username}>'
\ No newline at end of file
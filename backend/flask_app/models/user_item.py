@@ -3,6 +3,10 @@ from datetime import datetime
 
 class UserItem(db.Model):
     __tablename__ = 'user_items'
+    __table_args__ = (
+        db.Index('ix_user_items_user_id_name', 'user_id', 'name'),
+        db.Index('ix_user_items_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -14,6 +18,10 @@ class UserItem(db.Model):
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Phiên bản của dòng: dùng làm ETag và để khóa lạc quan khi cập nhật
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+
+    __mapper_args__ = {'version_id_col': version}
     
     def __repr__(self):
         return f'<UserItem {self.id} - {self.name}>'
\ No newline at end of file
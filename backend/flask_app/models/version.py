@@ -0,0 +1,13 @@
+from flask_app import db
+
+
+class CollectionVersion(db.Model):
+    """Số phiên bản của từng danh sách theo người dùng, tăng sau mỗi lần ghi"""
+    __tablename__ = 'collection_versions'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    collection = db.Column(db.String(20), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CollectionVersion {self.user_id} {self.collection} {self.version}>'
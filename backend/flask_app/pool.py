@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Cấu hình pool theo profile; DB_POOL_* trong config ghi đè từng giá trị.
+# pool_recycle thấp hơn wait_timeout của MySQL để không dùng lại connection đã bị server đóng.
+POOL_PROFILES = {
+    'small': {'pool_size': 5, 'max_overflow': 5, 'pool_timeout': 10, 'pool_recycle': 1800, 'pool_pre_ping': True},
+    'default': {'pool_size': 10, 'max_overflow': 10, 'pool_timeout': 10, 'pool_recycle': 1800, 'pool_pre_ping': True},
+    # Worker nhiều luồng: pool lớn hơn nhưng timeout ngắn để lỗi sớm thay vì treo request
+    'large': {'pool_size': 20, 'max_overflow': 20, 'pool_timeout': 5, 'pool_recycle': 1800, 'pool_pre_ping': True},
+}
+
+POOL_OVERRIDES = {
+    'DB_POOL_SIZE': ('pool_size', int),
+    'DB_MAX_OVERFLOW': ('max_overflow', int),
+    # Flask-SQLAlchemy tạo engine bằng engine_from_config, pool_timeout bị ép về int
+    'DB_POOL_TIMEOUT': ('pool_timeout', int),
+    'DB_POOL_RECYCLE': ('pool_recycle', int),
+    'DB_POOL_PRE_PING': ('pool_pre_ping', lambda value: str(value).lower() == 'true'),
+}
+
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS từ DB_POOL_PROFILE và các giá trị DB_POOL_*.
+    Các key đã có sẵn trong SQLALCHEMY_ENGINE_OPTIONS được giữ nguyên.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if not uri:
+        return options
+
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # SQLite trong bộ nhớ dùng StaticPool (một connection), không có gì để cấu hình
+        return options
+
+    profile = config.get('DB_POOL_PROFILE') or 'default'
+    if profile not in POOL_PROFILES:
+        raise ValueError(f'DB_POOL_PROFILE không hợp lệ: {profile} (chọn một trong {", ".join(POOL_PROFILES)})')
+    pool_options = dict(POOL_PROFILES[profile], poolclass=InstrumentedQueuePool)
+    for key, (option, convert) in POOL_OVERRIDES.items():
+        if config.get(key) not in (None, ''):
+            pool_options[option] = convert(config[key])
+    return {**pool_options, **options}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool ghi lại thời gian chờ lấy connection (pool không có event cho việc này)"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            pool_monitor.record_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        pool_monitor.record_wait((time.perf_counter() - start) * 1000)
+        return connection
+
+
+class PoolMonitor:
+    """
+    Số liệu của connection pool: thời gian chờ checkout (trong cửa sổ
+    `window` giây gần nhất), số connection đang dùng/overflow và các bộ
+    đếm lỗi, lấy từ event của pool/engine. `readiness()` báo chưa sẵn sàng
+    khi p95 thời gian chờ vượt `max_wait_ms` hoặc có checkout bị timeout.
+    """
+
+    def __init__(self, window=30, max_wait_ms=500):
+        self.window = window
+        self.max_wait_ms = max_wait_ms
+        self.engine = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._waits = deque(maxlen=10000)
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.counters = dict.fromkeys(
+                ('connects', 'checkouts', 'invalidations', 'timeouts', 'disconnects', 'connection_errors', 'errors'), 0
+            )
+
+    def init_app(self, app, engine):
+        self.window = app.config['DB_READY_WINDOW']
+        self.max_wait_ms = app.config['DB_READY_MAX_WAIT_MS']
+        self.engine = engine
+        self.reset()
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+        event.listen(engine, 'handle_error', self._on_error)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self._count('connects')
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.counters['checkouts'] += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            # checkin cũng được gọi cho connection bị invalidate trước khi checkout xong
+            self.in_use = max(self.in_use - 1, 0)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self._count('invalidations')
+
+    def _on_error(self, context):
+        self._count('errors')
+        if context.is_disconnect:
+            self._count('disconnects')
+        if context.connection is None:
+            # Lỗi khi mở connection mới (server không phản hồi, sai thông tin đăng nhập...)
+            self._count('connection_errors')
+
+    def record_wait(self, wait_ms, timed_out=False):
+        with self._lock:
+            self._waits.append((time.monotonic(), wait_ms, timed_out))
+            if timed_out:
+                self.counters['timeouts'] += 1
+
+    def _recent_waits(self):
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            while self._waits and self._waits[0][0] < cutoff:
+                self._waits.popleft()
+            return list(self._waits)
+
+    def stats(self):
+        waits = self._recent_waits()
+        durations = sorted(wait_ms for _, wait_ms, _ in waits)
+
+        def percentile(p):
+            if not durations:
+                return 0.0
+            return round(durations[min(int(len(durations) * p), len(durations) - 1)], 3)
+
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            result = {
+                'pool': type(pool).__name__ if pool is not None else None,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                **self.counters,
+            }
+        if isinstance(pool, QueuePool):
+            result.update(size=pool.size(), checked_in=pool.checkedin(), overflow=max(pool.overflow(), 0))
+        result['wait_ms'] = {
+            'window_s': self.window,
+            'count': len(durations),
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'max': round(durations[-1], 3) if durations else 0.0,
+            'timeouts': sum(1 for _, _, timed_out in waits if timed_out),
+        }
+        return result
+
+    def readiness(self, stats=None):
+        """(ready, lý do) dựa trên thời gian chờ checkout gần đây"""
+        wait = (stats or self.stats())['wait_ms']
+        if wait['timeouts']:
+            return False, f'{wait["timeouts"]} lần lấy connection bị timeout trong {self.window}s'
+        if wait['p95'] > self.max_wait_ms:
+            return False, f'p95 thời gian chờ connection {wait["p95"]}ms > {self.max_wait_ms}ms'
+        return True, None
+
+
+pool_monitor = PoolMonitor()
@@ -0,0 +1,122 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+logger = logging.getLogger('flask_app.sql')
+
+PROFILE_KEY = '_sql_profile'
+# Thuộc tính gắn vào ExecutionContext của từng câu lệnh: context bị bỏ đi
+# cùng câu lệnh kể cả khi câu lệnh lỗi (after_cursor_execute không chạy)
+QUERY_START_ATTR = '_profiler_start'
+
+
+def redact_parameters(parameters):
+    """Chỉ giữ tên và kiểu của tham số, không ghi giá trị vào log"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: chỉ ghi số dòng và kiểu của dòng đầu
+            return {'rows': len(parameters), 'first': redact_parameters(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class RequestProfile:
+    """Số câu SQL, tổng thời gian database và số lần lặp từng câu trong một request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_ms = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, elapsed_ms):
+        self.count += 1
+        self.db_ms += elapsed_ms
+        self.statements[statement] += 1
+
+    def repeated(self, threshold):
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+class SQLProfiler:
+    """
+    Profiler SQL theo request dựa trên before/after_cursor_execute: đếm số
+    câu và thời gian database, gắn header Server-Timing, cảnh báo câu lặp
+    lại nhiều lần (N+1) và ghi log mẫu các câu chậm (tham số đã được ẩn).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.server_timing = True
+        self.n_plus_one_threshold = 5
+        self.slow_query_ms = 200
+        self.sample_rate = 1.0
+
+    def init_app(self, app, engine):
+        self.enabled = app.config['SQL_PROFILER_ENABLED']
+        self.server_timing = app.config['SQL_SERVER_TIMING']
+        self.n_plus_one_threshold = app.config['SQL_N_PLUS_ONE_THRESHOLD']
+        self.slow_query_ms = app.config['SLOW_QUERY_MS']
+        self.sample_rate = app.config['SLOW_QUERY_SAMPLE_RATE']
+        if not self.enabled:
+            return
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        setattr(context, QUERY_START_ATTR, time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - getattr(context, QUERY_START_ATTR)) * 1000
+        profile = g.get(PROFILE_KEY) if has_request_context() else None
+        if profile is not None:
+            profile.record(statement, elapsed_ms)
+        if elapsed_ms >= self.slow_query_ms and random.random() < self.sample_rate:
+            self._log_slow_query(statement, parameters, elapsed_ms)
+
+    def _log_slow_query(self, statement, parameters, elapsed_ms):
+        entry = {
+            'duration_ms': round(elapsed_ms, 2),
+            'statement': statement,
+            'parameters': redact_parameters(parameters),
+        }
+        if has_request_context():
+            entry.update(
+                method=request.method,
+                blueprint=request.blueprint,
+                endpoint=request.endpoint,
+                route=request.url_rule.rule if request.url_rule else None
+            )
+        logger.warning('slow query %s', json.dumps(entry, ensure_ascii=False, default=str))
+
+    def _before_request(self):
+        setattr(g, PROFILE_KEY, RequestProfile())
+
+    def _after_request(self, response):
+        profile = g.pop(PROFILE_KEY, None)
+        if profile is None:
+            return response
+
+        for statement, count in profile.repeated(self.n_plus_one_threshold):
+            logger.warning(
+                'N+1: câu SQL lặp %d lần trong %s %s (%s): %s',
+                count, request.method, request.path, request.endpoint, ' '.join(statement.split())[:300]
+            )
+        if self.server_timing:
+            total_ms = (time.perf_counter() - profile.started) * 1000
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={profile.db_ms:.2f};desc="{profile.count} queries", app;dur={total_ms:.2f}'
+            )
+        return response
+
+
+sql_profiler = SQLProfiler()
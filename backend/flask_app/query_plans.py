@@ -0,0 +1,152 @@
+"""
+Kiểm tra query plan của các truy vấn trong services trên SQLite.
+
+Chạy lần lượt các phương thức của services trên một database SQLite tạm
+(đã áp dụng toàn bộ migration), ghi lại mọi câu SELECT/UPDATE/DELETE được
+gửi xuống database và chạy EXPLAIN QUERY PLAN cho từng câu. Một câu bị coi
+là lỗi nếu plan của nó có bước quét toàn bộ bảng (SCAN <bảng>).
+"""
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from config import Config
+
+SCAN_PATTERN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+CHECKED_PREFIXES = ('SELECT', 'UPDATE', 'DELETE')
+
+
+class QueryPlanConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ECHO = False
+    JWT_SECRET_KEY = 'query-plan-check'
+    TESTING = True
+
+
+@contextmanager
+def capture_statements(engine):
+    """Ghi lại (statement, parameters) của mọi câu lệnh chạy trên engine"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(CHECKED_PREFIXES):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def explain(connection, statement, parameters):
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def find_full_scans(plan, table_names):
+    scans = []
+    for detail in plan:
+        match = SCAN_PATTERN.match(detail)
+        if match and match.group(1) in table_names:
+            scans.append(detail)
+    return scans
+
+
+def run_service_scenario(user_id):
+    """Gọi mọi truy vấn đọc/ghi của services cho một người dùng"""
+    from flask_app.services.expense_service import ExpenseService
+    from flask_app.services.income_service import IncomeService
+    from flask_app.services.notification_service import NotificationService
+    from flask_app.services.user_item_service import UserItemService
+    from flask_app.services.balance_service import BalanceService
+    from flask_app.services.report_service import ReportService
+
+    now = datetime.utcnow()
+    for service, create, kwargs in (
+        (ExpenseService, 'expense', {'category': 'food', 'amount': 10}),
+        (IncomeService, 'income', {'category': 'salary', 'amount': 100}),
+    ):
+        obj = getattr(service, f'create_{create}')(user_id, description='test', date=now, **kwargs)
+        getattr(service, f'get_{create}_by_id')(obj.id, user_id)
+        getattr(service, f'get_all_{create}s')(user_id)
+        getattr(service, f'get_{create}s_page')(user_id, limit=1)
+        getattr(service, f'get_{create}s_page')(user_id, cursor=(obj.date, obj.id), limit=1)
+        getattr(service, f'update_{create}')(obj.id, user_id, amount=20, date=now - timedelta(days=40))
+        getattr(service, f'get_{create}s_by_time_period')(user_id, now - timedelta(days=30), now)
+        filters = {'start': now - timedelta(days=30), 'end': now, 'categories': (kwargs['category'],), 'min_amount': 1}
+        getattr(service, f'get_{create}s_page')(user_id, limit=1, filters=filters)
+        getattr(service, f'get_{create}s_summary')(user_id, filters)
+        getattr(service, f'get_{create}s_summary')(user_id, {'start': now.replace(hour=0, minute=0, second=0, microsecond=0)})
+        getattr(service, f'delete_{create}')(obj.id, user_id)
+        getattr(service, f'create_{create}')(user_id, description='test', date=now, **kwargs)
+
+    BalanceService.get_history(user_id, (now - timedelta(days=90)).date(), now.date(), 'week')
+    ReportService.build_report(user_id, (now - timedelta(days=365)).date(), now.date())
+    ExpenseService.create_expense(user_id, category='food', amount=5, description='test', date=now - timedelta(days=60))
+
+    notification = NotificationService.create_notification(user_id, 'Tiêu đề', 'Nội dung')
+    NotificationService.get_notification_by_id(notification.id, user_id)
+    NotificationService.get_all_notifications(user_id)
+    NotificationService.get_notifications_page(user_id, limit=1)
+    NotificationService.get_notifications_page(user_id, cursor=(notification.created_at, notification.id), limit=1)
+    NotificationService.update_notification(notification.id, user_id, title='Tiêu đề mới')
+    NotificationService.mark_as_read(notification.id, user_id)
+    NotificationService.delete_notification(notification.id, user_id)
+
+    item = UserItemService.create_user_item(user_id, 'Xe máy', balance=100)
+    UserItemService.get_user_item_by_id(item.id, user_id)
+    UserItemService.get_all_user_items(user_id)
+    UserItemService.get_user_items_page(user_id, limit=1)
+    UserItemService.get_user_items_page(user_id, cursor=(item.created_at, item.id), limit=1)
+    UserItemService.update_user_item(item.id, user_id, balance=50)
+    UserItemService.delete_user_item(item.id, user_id)
+
+
+def run_endpoint_scenario(app, user_id):
+    """Gọi các endpoint đọc dữ liệu trực tiếp trong controllers"""
+    from flask_jwt_extended import create_access_token
+    from flask_app.controllers.overview import build_dashboard
+
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    client = app.test_client()
+    for url in ('/api/overview/dashboard', '/api/search/?q=test'):
+        client.get(url, headers=headers)
+    build_dashboard(user_id, source='scan')
+
+
+def collect_query_plans(config_class=QueryPlanConfig):
+    """
+    Tạo app trên SQLite tạm, chạy các kịch bản và trả về danh sách
+    (statement, plan, full_scans) cho mọi câu lệnh đã chạy
+    """
+    from flask_migrate import upgrade
+    from flask_app import create_app, db
+    from flask_app.models.user import User
+
+    app = create_app(config_class)
+    migrations = os.path.join(os.path.dirname(app.root_path), 'migrations')
+    with app.app_context():
+        upgrade(directory=migrations)
+
+        user = User(username='query_plan', email='query_plan@example.com', password_hash='-')
+        db.session.add(user)
+        db.session.commit()
+
+        with capture_statements(db.engine) as statements:
+            run_service_scenario(user.id)
+            run_endpoint_scenario(app, user.id)
+
+        table_names = set(db.metadata.tables)
+        results = []
+        seen = set()
+        with db.engine.connect() as connection:
+            for statement, parameters in statements:
+                if statement in seen:
+                    continue
+                seen.add(statement)
+                plan = explain(connection, statement, parameters)
+                results.append((statement, plan, find_full_scans(plan, table_names)))
+        db.session.remove()
+    return results
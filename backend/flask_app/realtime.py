@@ -0,0 +1,191 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+
+CLOSED = object()
+
+
+def format_event(event_id, data, event='notification'):
+    """Khung SSE cho một sự kiện (`data` là chuỗi JSON một dòng)"""
+    return f'id: {event_id}\nevent: {event}\ndata: {data}\n\n'
+
+
+class Subscription:
+    """
+    Hàng đợi có giới hạn của một kết nối SSE. Khi client đọc chậm và hàng
+    đợi đầy, kết nối bị đóng (client kết nối lại với Last-Event-ID để lấy
+    phần còn thiếu từ database) thay vì để bộ nhớ tăng không giới hạn.
+    """
+
+    def __init__(self, key, max_size):
+        self.key = key
+        self.max_size = max_size
+        self.overflowed = False
+        self._events = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def push(self, event):
+        with self._condition:
+            if self._closed:
+                return False
+            if len(self._events) >= self.max_size:
+                self.overflowed = True
+                self._closed = True
+            else:
+                self._events.append(event)
+            self._condition.notify()
+            return not self._closed
+
+    def get(self, timeout):
+        """Sự kiện tiếp theo, None nếu hết `timeout` giây, CLOSED nếu đã đóng"""
+        with self._condition:
+            if not self._events and not self._closed:
+                self._condition.wait(timeout)
+            if self._closed:
+                return CLOSED
+            if self._events:
+                return self._events.popleft()
+            return None
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+
+class SQLiteBroker:
+    """
+    Broker thay thế (dùng khi chạy local) để phát sự kiện giữa nhiều process:
+    mỗi process ghi sự kiện vào một file SQLite chung và một luồng nền đọc
+    các dòng mới để chuyển cho hub trong process đó.
+    """
+
+    def __init__(self, path, deliver, poll_interval=0.2, retention=300):
+        self.path = path
+        self.deliver = deliver
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._local = threading.local()
+        self._thread = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS events ('
+            'seq INTEGER PRIMARY KEY AUTOINCREMENT, user_key TEXT NOT NULL, '
+            'event_id INTEGER NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        connection.commit()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def publish(self, key, event_id, data):
+        self._connection().execute(
+            'INSERT INTO events (user_key, event_id, data, created_at) VALUES (?, ?, ?, ?)',
+            (key, event_id, data, time.time())
+        )
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            last_seq = self._connection().execute('SELECT COALESCE(MAX(seq), 0) FROM events').fetchone()[0]
+            self._thread = threading.Thread(target=self._poll, args=(last_seq,), name='sse-broker', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _poll(self, last_seq):
+        connection = self._connection()
+        last_prune = time.time()
+        while not self._stopped.wait(self.poll_interval):
+            rows = connection.execute(
+                'SELECT seq, user_key, event_id, data FROM events WHERE seq > ? ORDER BY seq',
+                (last_seq,)
+            ).fetchall()
+            for seq, key, event_id, data in rows:
+                self.deliver(key, event_id, data)
+                last_seq = seq
+            if time.time() - last_prune > self.retention:
+                connection.execute('DELETE FROM events WHERE created_at < ?', (time.time() - self.retention,))
+                last_prune = time.time()
+
+
+class NotificationHub:
+    """
+    Pub/sub trong process cho luồng SSE, theo user. Nếu cấu hình
+    REALTIME_BROKER_URL (sqlite:///đường/dẫn), sự kiện đi qua broker để
+    mọi process đều nhận được.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.broker = None
+        self._broker_path = None
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.queue_size = app.config['SSE_QUEUE_SIZE']
+        url = app.config.get('REALTIME_BROKER_URL') or ''
+        if url.startswith('sqlite:///'):
+            self._broker_path = url[len('sqlite:///'):]
+        elif url:
+            raise ValueError(f'REALTIME_BROKER_URL không được hỗ trợ: {url}')
+
+    def _get_broker(self):
+        # Broker (và luồng nền) chỉ được tạo khi thật sự dùng, không tạo trong lệnh CLI
+        if self._broker_path and self.broker is None:
+            with self._lock:
+                if self.broker is None:
+                    self.broker = SQLiteBroker(self._broker_path, self.deliver)
+        if self.broker is not None:
+            self.broker.start()
+        return self.broker
+
+    def subscribe(self, user_id):
+        self._get_broker()
+        subscription = Subscription(str(user_id), self.queue_size)
+        with self._lock:
+            self._subscriptions.setdefault(subscription.key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.key)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.key]
+
+    def publish(self, user_id, event_id, data):
+        """Phát sự kiện (data là chuỗi JSON) tới mọi kết nối của user"""
+        broker = self._get_broker()
+        if broker is not None:
+            broker.publish(str(user_id), event_id, data)
+        else:
+            self.deliver(str(user_id), event_id, data)
+
+    def deliver(self, key, event_id, data):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(key, ()))
+        for subscription in subscriptions:
+            subscription.push((event_id, data))
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+notification_hub = NotificationHub()
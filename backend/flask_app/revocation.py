@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class TokenDenylist:
+    """
+    jti của các token đã thu hồi, giữ tới khi token hết hạn. `is_revoked`
+    chạy trên mọi request @jwt_required() nên chỉ là một lần tra dict trong
+    bộ nhớ, không chạm tới database hay file.
+
+    Nếu cấu hình JWT_DENYLIST_URL (sqlite:///đường/dẫn), jti được ghi vào
+    file SQLite chung: khi khởi động mỗi process nạp các jti còn hạn, sau đó
+    một luồng nền đọc các dòng mới (thu hồi có hiệu lực ở process khác sau
+    tối đa `poll_interval` giây) và xóa dòng đã hết hạn.
+    """
+
+    def __init__(self, poll_interval=1.0, prune_interval=60):
+        self.poll_interval = poll_interval
+        self.prune_interval = prune_interval
+        self._path = None
+        # jti -> thời điểm hết hạn (epoch giây), None nếu token không hết hạn
+        self._revoked = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started = False
+        self._stopped = threading.Event()
+        self._last_prune = time.time()
+        # Luồng nền không đi theo process con khi fork (server prefork)
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def init_app(self, app):
+        self.poll_interval = app.config['JWT_DENYLIST_POLL_INTERVAL']
+        url = app.config.get('JWT_DENYLIST_URL') or ''
+        if url.startswith('sqlite:///'):
+            self._path = url[len('sqlite:///'):]
+        elif url:
+            raise ValueError(f'JWT_DENYLIST_URL không được hỗ trợ: {url}')
+        else:
+            self._path = None
+        self.stop()
+        with self._lock:
+            self._revoked = {}
+            self._started = False
+            self._stopped = threading.Event()
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started = False
+        self._stopped = threading.Event()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS revoked_tokens ('
+                'seq INTEGER PRIMARY KEY AUTOINCREMENT, jti TEXT NOT NULL UNIQUE, expires_at REAL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def _start(self):
+        # Nạp và chạy luồng đồng bộ khi dùng lần đầu, không chạy trong lệnh CLI
+        with self._lock:
+            if self._started:
+                return
+            if self._path:
+                rows = self._connection().execute(
+                    'SELECT seq, jti, expires_at FROM revoked_tokens WHERE expires_at IS NULL OR expires_at > ?',
+                    (time.time(),)
+                ).fetchall()
+                last_seq = self._connection().execute('SELECT COALESCE(MAX(seq), 0) FROM revoked_tokens').fetchone()[0]
+                self._revoked.update((jti, expires_at) for _, jti, expires_at in rows)
+                threading.Thread(target=self._poll, args=(last_seq,), name='jwt-denylist', daemon=True).start()
+            self._started = True
+
+    def stop(self):
+        self._stopped.set()
+
+    def is_revoked(self, jti):
+        if not self._started:
+            self._start()
+        # Token hết hạn đã bị từ chối khi giải mã, trước khi tới đây: không cần so exp
+        return jti in self._revoked
+
+    def revoke(self, jti, expires_at=None):
+        """Thu hồi token `jti`; `expires_at` là claim exp của token (None nếu không hết hạn)"""
+        if not self._started:
+            self._start()
+        with self._lock:
+            self._revoked[jti] = expires_at
+        if self._path:
+            self._connection().execute(
+                'INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)', (jti, expires_at)
+            )
+        elif time.time() - self._last_prune > self.prune_interval:
+            self.prune()
+
+    def prune(self):
+        """Bỏ các jti đã hết hạn (token hết hạn thì không cần thu hồi nữa)"""
+        now = time.time()
+        self._last_prune = now
+        with self._lock:
+            expired = [jti for jti, expires_at in self._revoked.items() if expires_at is not None and expires_at <= now]
+            for jti in expired:
+                del self._revoked[jti]
+        if self._path:
+            self._connection().execute('DELETE FROM revoked_tokens WHERE expires_at <= ?', (now,))
+        return len(expired)
+
+    def _poll(self, last_seq):
+        connection = self._connection()
+        stopped = self._stopped
+        while not stopped.wait(self.poll_interval):
+            rows = connection.execute(
+                'SELECT seq, jti, expires_at FROM revoked_tokens WHERE seq > ? ORDER BY seq', (last_seq,)
+            ).fetchall()
+            if rows:
+                with self._lock:
+                    for seq, jti, expires_at in rows:
+                        self._revoked[jti] = expires_at
+                        last_seq = seq
+            if time.time() - self._last_prune > self.prune_interval:
+                self.prune()
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+token_denylist = TokenDenylist()
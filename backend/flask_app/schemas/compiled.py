@@ -0,0 +1,104 @@
+from functools import lru_cache
+from marshmallow import fields
+from marshmallow.utils import ensure_text_type, missing
+from flask_app.schemas.expense import ExpenseSchema
+from flask_app.schemas.income import IncomeSchema
+from flask_app.schemas.notification import NotificationSchema
+from flask_app.schemas.user_item import UserItemSchema
+
+
+def _field_expression(field, index, namespace):
+    """
+    Biểu thức Python tương đương field._serialize cho giá trị `v{index}`.
+    Các kiểu/tùy chọn không nhận diện được gọi lại field.serialize.
+    """
+    value = f'v{index}'
+    kind = type(field)
+
+    if kind is fields.Integer and not field.as_string:
+        return f'None if {value} is None else int({value})'
+    if kind is fields.Decimal and not field.as_string:
+        # Giữ nguyên cách làm tròn/NaN của marshmallow
+        namespace[f'format{index}'] = field._format_num
+        return f'None if {value} is None else format{index}({value})'
+    if kind is fields.String:
+        namespace['ensure_text_type'] = ensure_text_type
+        return f'{value} if {value} is None or {value}.__class__ is str else ensure_text_type({value})'
+    if kind is fields.DateTime and field.format in (None, 'iso', 'iso8601'):
+        return f'None if {value} is None else {value}.isoformat()'
+    if kind is fields.Boolean:
+        namespace[f'boolean{index}'] = field._serialize
+        return f'{value} if {value} is None or {value} is True or {value} is False else boolean{index}({value}, None, None)'
+    return None
+
+
+def compile_schema(schema):
+    """
+    Sinh một hàm obj -> dict chuyên biệt cho `schema` (chỉ đọc thuộc tính và
+    chuyển kiểu, không đi qua vòng lặp field của marshmallow). Kết quả giống
+    hệt schema.dump cho các schema phẳng không có hook post_dump, với đối
+    tượng có đủ các thuộc tính (model ORM).
+    """
+    namespace = {'missing': missing}
+    reads = []
+    items = []
+    optional = []
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        attribute = field.attribute or name
+        expression = _field_expression(field, index, namespace)
+        if expression is None or not attribute.isidentifier():
+            # field.serialize trả về `missing` nếu không có giá trị: bỏ key như schema.dump
+            namespace[f'field{index}'] = field
+            reads.append(f'    v{index} = field{index}.serialize({name!r}, obj)')
+            items.append(f'{field.data_key or name!r}: v{index}')
+            optional.append(f'    if v{index} is missing:\n        del result[{field.data_key or name!r}]')
+            continue
+        reads.append(f'    v{index} = obj.{attribute}')
+        items.append(f'{field.data_key or name!r}: {expression}')
+
+    source = '\n'.join([
+        'def dump(obj):',
+        *reads,
+        '    result = {' + ', '.join(items) + '}',
+        *optional,
+        '    return result'
+    ])
+    exec(compile(source, f'<compiled {type(schema).__name__}>', 'exec'), namespace)
+    return namespace['dump']
+
+
+class CompiledSchema:
+    """Bộ serialize thay thế cho một marshmallow Schema, dùng cùng API dump"""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.many = schema.many
+        self._dump = compile_schema(schema)
+
+    def dump(self, obj, *, many=None):
+        many = self.many if many is None else many
+        if many:
+            dump = self._dump
+            return [dump(item) for item in obj]
+        return self._dump(obj)
+
+    def only(self, field_names):
+        """Serializer chỉ gồm `field_names` (sparse fieldset), được cache theo tập field"""
+        if not field_names:
+            return self
+        return _sparse_serializer(type(self.schema), self.many, tuple(field_names))
+
+
+@lru_cache(maxsize=128)
+def _sparse_serializer(schema_class, many, field_names):
+    return CompiledSchema(schema_class(only=field_names, many=many))
+
+
+expense_serializer = CompiledSchema(ExpenseSchema())
+expenses_serializer = CompiledSchema(ExpenseSchema(many=True))
+income_serializer = CompiledSchema(IncomeSchema())
+incomes_serializer = CompiledSchema(IncomeSchema(many=True))
+notification_serializer = CompiledSchema(NotificationSchema())
+notifications_serializer = CompiledSchema(NotificationSchema(many=True))
+user_item_serializer = CompiledSchema(UserItemSchema())
+user_items_serializer = CompiledSchema(UserItemSchema(many=True))
@@ -1,6 +1,6 @@
 from marshmallow import Schema, fields, validate
 from flask_app.models.user import User
-from werkzeug.security import generate_password_hash
+from flask_app.hashing import password_hasher
 class UserSchema(Schema):
     class Meta:
         model = User
@@ -19,7 +19,7 @@ class UserSchema(Schema):
         data = super().load(*args, **kwargs)
         if 'password' in data:
            
-            data['password_hash'] = generate_password_hash(data['password'])
+            data['password_hash'] = password_hasher.hash(data['password'])
         return data
 class UserLoginSchema(Schema):
     username = fields.Str(required=True)
@@ -0,0 +1,159 @@
+"""
+Sinh dữ liệu giả lập (user, expense, income, notification, user item) cho
+benchmark và phát triển local. Dữ liệu được chèn hàng loạt bằng Core insert,
+sau đó tính lại rollup và chỉ mục tìm kiếm.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert, func
+
+SEED_PASSWORD = 'password'
+
+# (danh mục, trọng số, số tiền trung vị VND, các từ mô tả)
+EXPENSE_PROFILE = [
+    ('food', 40, 60000, ['an sang', 'an trua', 'an toi', 'cafe', 'tra sua', 'sieu thi', 'cho']),
+    ('transport', 20, 40000, ['xang xe', 'grab', 'taxi', 'gui xe', 've xe buyt']),
+    ('bill', 10, 500000, ['tien dien', 'tien nuoc', 'internet', 'dien thoai']),
+    ('shopping', 12, 400000, ['quan ao', 'giay dep', 'do gia dung', 'my pham']),
+    ('entertainment', 10, 200000, ['xem phim', 'karaoke', 'du lich', 'sach']),
+    ('house', 3, 5000000, ['tien nha', 'sua nha', 'noi that']),
+    ('other', 5, 150000, ['qua sinh nhat', 'thuoc', 'kham benh', 'hoc phi']),
+]
+INCOME_PROFILE = [
+    ('salary', 45, 15000000, ['luong thang', 'luong cong ty']),
+    ('allowance', 15, 1000000, ['phu cap an trua', 'phu cap xang xe']),
+    ('bonus', 8, 5000000, ['thuong du an', 'thuong tet']),
+    ('investment', 12, 2000000, ['lai tiet kiem', 'co tuc', 'chung khoan']),
+    ('temporary', 12, 1500000, ['lam them', 'ban hang online']),
+    ('principal', 3, 10000000, ['rut tiet kiem']),
+    ('other', 5, 500000, ['duoc tang', 'hoan tien']),
+]
+NOTIFICATION_TITLES = ['Nhắc thanh toán hóa đơn', 'Vượt hạn mức chi tiêu', 'Đã nhận lương', 'Báo cáo tháng', 'Nhắc trả đồ']
+ITEM_NAMES = ['Máy khoan', 'Xe đạp', 'Sách', 'Laptop', 'Lều cắm trại', 'Máy ảnh', 'Ô', 'Bàn ủi']
+ITEM_STATUSES = ['borrowed', 'lent', 'returned']
+
+DISTRIBUTIONS = ('uniform', 'zipf')
+INSERT_BATCH = 5000
+
+
+def user_weights(users, distribution):
+    """Tỉ lệ dữ liệu của từng user: đều nhau hoặc theo Zipf (vài user rất nhiều dữ liệu)"""
+    if distribution == 'uniform':
+        weights = [1.0] * users
+    elif distribution == 'zipf':
+        weights = [1.0 / (rank + 1) for rank in range(users)]
+    else:
+        raise ValueError(f'Phân phối không hợp lệ: {distribution} (chọn {", ".join(DISTRIBUTIONS)})')
+    total = sum(weights)
+    return [weight * users / total for weight in weights]
+
+
+def _pick(rng, profile):
+    return rng.choices(profile, weights=[entry[1] for entry in profile])[0]
+
+
+def _amount(rng, median):
+    # Phân phối log-normal quanh trung vị, làm tròn tới 1.000 đồng
+    return max(1000, round(median * math.exp(rng.gauss(0, 0.6)), -3))
+
+
+def _date(rng, now, days):
+    # Dữ liệu gần đây dày hơn dữ liệu cũ
+    return now - timedelta(days=min(rng.expovariate(3.0 / days), days), seconds=rng.randrange(86400))
+
+
+def _insert(model, rows):
+    from flask_app import db
+
+    for start in range(0, len(rows), INSERT_BATCH):
+        db.session.execute(insert(model), rows[start:start + INSERT_BATCH])
+
+
+def _transactions(rng, user_id, count, profile, now, days):
+    rows = []
+    for _ in range(count):
+        category, _, median, words = _pick(rng, profile)
+        rows.append({
+            'user_id': user_id,
+            'category': category,
+            'amount': _amount(rng, median),
+            'description': rng.choice(words),
+            'date': _date(rng, now, days),
+            'created_at': now,
+            'updated_at': now
+        })
+    return rows
+
+
+def seed_database(users=10, expenses=500, incomes=50, notifications=50, items=10,
+                  days=365, distribution='zipf', seed=42, prefix='seed'):
+    """
+    Chèn `users` user mới; `expenses`, `incomes`, `notifications`, `items` là
+    số dòng trung bình mỗi user, chia theo `distribution`. Mọi user có mật
+    khẩu SEED_PASSWORD. Trả về (danh sách user id, số dòng theo bảng).
+    """
+    from flask_app import db
+    from flask_app.hashing import password_hasher
+    from flask_app.models import User, Expense, Income, Notification, UserItem
+    from flask_app.services.rollup_service import RollupService
+    from flask_app.services.search_service import SearchService
+
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    weights = user_weights(users, distribution)
+    password_hash = password_hasher.hash(SEED_PASSWORD)
+
+    offset = db.session.query(func.count(User.id)).scalar()
+    names = [f'{prefix}{offset + i}' for i in range(users)]
+    _insert(User, [{
+        'username': name,
+        'email': f'{name}@example.com',
+        'password_hash': password_hash,
+        'created_at': now,
+        'updated_at': now
+    } for name in names])
+    user_ids = [user_id for user_id, in db.session.query(User.id).filter(User.username.in_(names)).order_by(User.id)]
+
+    counts = {'users': len(user_ids), 'expenses': 0, 'incomes': 0, 'notifications': 0, 'user_items': 0}
+    for user_id, weight in zip(user_ids, weights):
+        expense_rows = _transactions(rng, user_id, round(expenses * weight), EXPENSE_PROFILE, now, days)
+        income_rows = _transactions(rng, user_id, round(incomes * weight), INCOME_PROFILE, now, days)
+        notification_rows = [{
+            'user_id': user_id,
+            'title': rng.choice(NOTIFICATION_TITLES),
+            'description': f'Thông báo tự động số {i}',
+            'is_read': rng.random() < 0.7,
+            'created_at': _date(rng, now, days),
+            'updated_at': now
+        } for i in range(round(notifications * weight))]
+        item_rows = []
+        for _ in range(round(items * weight)):
+            status = rng.choice(ITEM_STATUSES)
+            balance = 0 if status == 'returned' else _amount(rng, 300000)
+            item_rows.append({
+                'user_id': user_id,
+                'name': rng.choice(ITEM_NAMES),
+                'status': status,
+                'quantity': rng.randint(1, 3),
+                'balance': balance,
+                'deposit': round(balance * rng.choice((0, 0.5, 1)), -3),
+                'description': None,
+                'created_at': _date(rng, now, days),
+                'updated_at': now
+            })
+
+        for model, rows, key in (
+            (Expense, expense_rows, 'expenses'),
+            (Income, income_rows, 'incomes'),
+            (Notification, notification_rows, 'notifications'),
+            (UserItem, item_rows, 'user_items'),
+        ):
+            _insert(model, rows)
+            counts[key] += len(rows)
+    db.session.commit()
+
+    for user_id in user_ids:
+        RollupService.rebuild(user_id)
+        SearchService.reindex(user_id)
+    return user_ids, counts
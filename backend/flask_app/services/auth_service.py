@@ -1,4 +1,5 @@
-from werkzeug.security import generate_password_hash
+from flask_app.hashing import password_hasher, HashingUnavailable
+from flask_app.revocation import token_denylist
 from flask_app.models.user import User
 from flask_app import db
 
@@ -9,18 +10,48 @@ class AuthService:
             return None, 'Tên người dùng đã tồn tại'
         if User.query.filter_by(email=email).first():
             return None, 'Email đã tồn tại'
-            
-        user = User(username=username, email=email)
-        user.set_password(password)
-        
+
+        # Trả connection về pool trong lúc chờ băm mật khẩu
+        db.session.close()
+        user = User(username=username, email=email, password_hash=password_hasher.hash(password))
+
         db.session.add(user)
         db.session.commit()
-        
+
         return user, None
 
     @staticmethod
     def authenticate_user(username, password):
+        """
+        Kiểm tra mật khẩu trên pool băm; hash tạo với cấu hình cũ được băm
+        lại theo cấu hình hiện tại. Raise HashingUnavailable khi pool đầy.
+        """
         user = User.query.filter_by(username=username).first()
-        if not user or not user.check_password(password):
+        # user đã nạp đủ cột, đóng session để không giữ connection trong lúc băm
+        db.session.close()
+        if not user or not password_hasher.verify(user.password_hash, password):
             return None, 'Tên người dùng hoặc mật khẩu không hợp lệ'
-        return user, None
\ No newline at end of file
+
+        if password_hasher.needs_rehash(user.password_hash):
+            AuthService.rehash_password(user, password)
+        return user, None
+
+    @staticmethod
+    def rehash_password(user, password):
+        """Băm lại mật khẩu đã xác thực; bỏ qua (thử lại ở lần đăng nhập sau) nếu pool đang bận"""
+        try:
+            password_hash = password_hasher.hash(password)
+        except HashingUnavailable:
+            return False
+        # Chỉ ghi nếu hash chưa bị đổi bởi request khác (đổi mật khẩu, đăng nhập song song)
+        db.session.query(User).filter_by(id=user.id, password_hash=user.password_hash).update(
+            {'password_hash': password_hash}, synchronize_session=False
+        )
+        db.session.commit()
+        user.password_hash = password_hash
+        return True
+
+    @staticmethod
+    def revoke_token(jwt_payload):
+        """Thu hồi token tới khi nó hết hạn (token không có exp bị thu hồi vĩnh viễn)"""
+        token_denylist.revoke(jwt_payload['jti'], jwt_payload.get('exp'))
@@ -0,0 +1,194 @@
+import calendar
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import select, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from flask_app.models.rollup import UserTotal, DailyRollup, MonthlyRollup, BalanceCheckpoint
+from flask_app.services.rollup_service import EXPENSE, INCOME
+from flask_app import db
+
+BALANCE_INTERVALS = ('day', 'week', 'month')
+
+
+def _before_month(model, month):
+    return or_(model.year < month.year, and_(model.year == month.year, model.month < month.month))
+
+
+def bucket_ends(start, end, interval):
+    """Ngày cuối của từng khoảng (ngày / tuần kết thúc Chủ nhật / tháng) trong [start, end]"""
+    ends = []
+    current = start
+    while current <= end:
+        if interval == 'week':
+            current += timedelta(days=6 - current.weekday())
+        elif interval == 'month':
+            current = current.replace(day=calendar.monthrange(current.year, current.month)[1])
+        ends.append(min(current, end))
+        current += timedelta(days=1)
+    return ends
+
+
+class BalanceService:
+    """
+    Số dư (tổng thu - tổng chi cộng dồn) theo thời gian. Số dư tại một ngày
+    bằng checkpoint của đầu tháng (BalanceCheckpoint) cộng các dòng rollup
+    ngày từ đầu tháng tới ngày đó, nên không phải cộng lại toàn bộ lịch sử.
+    Giao dịch không có ngày không thuộc về ngày nào và không được tính.
+    """
+
+    @staticmethod
+    def get_checkpoint(user_id, month):
+        """(tổng thu, tổng chi) của mọi giao dịch trước ngày đầu tháng `month`, tạo checkpoint nếu chưa có"""
+        return BalanceService.get_checkpoints(user_id, [month])[month]
+
+    @staticmethod
+    def get_checkpoints(user_id, months):
+        """{tháng: (tổng thu, tổng chi)} cho từng ngày đầu tháng trong `months`, tạo các checkpoint còn thiếu"""
+        months = sorted(set(months))
+        if not months:
+            return {}
+        found = {
+            checkpoint.month: (checkpoint.total_income, checkpoint.total_expense)
+            for checkpoint in db.session.execute(
+                select(BalanceCheckpoint).where(
+                    BalanceCheckpoint.user_id == user_id,
+                    BalanceCheckpoint.month >= months[0],
+                    BalanceCheckpoint.month <= months[-1]
+                )
+            ).scalars()
+            if checkpoint.month in months
+        }
+        missing = [month for month in months if month not in found]
+        if missing:
+            found.update(BalanceService._create_checkpoints(user_id, missing))
+        return found
+
+    @staticmethod
+    def _create_checkpoints(user_id, months):
+        # Ghi trong session và transaction riêng: không commit hay kết thúc
+        # transaction đọc của request (thường là GET) đang dùng db.session
+        results = {}
+        try:
+            with Session(db.engine) as session, session.begin():
+                # Khóa dòng user_totals trước khi đọc rollup: thao tác ghi giao dịch
+                # cập nhật dòng này đầu tiên và xóa checkpoint bị ảnh hưởng trong cùng
+                # transaction, nên checkpoint ghi ra không thể bỏ sót giao dịch vừa ghi
+                locked = session.execute(
+                    select(UserTotal.user_id).where(UserTotal.user_id == user_id).with_for_update()
+                ).first()
+                if locked is None:
+                    return {month: (Decimal('0'), Decimal('0')) for month in months}
+                existing = {
+                    checkpoint.month: checkpoint for checkpoint in session.execute(
+                        select(BalanceCheckpoint).where(
+                            BalanceCheckpoint.user_id == user_id,
+                            BalanceCheckpoint.month >= months[0],
+                            BalanceCheckpoint.month <= months[-1]
+                        )
+                    ).scalars()
+                }
+
+                # Cộng tiếp từ checkpoint gần nhất trước đó (nếu có) bằng rollup tháng
+                previous = session.execute(
+                    select(BalanceCheckpoint).where(
+                        BalanceCheckpoint.user_id == user_id,
+                        BalanceCheckpoint.month < months[0]
+                    ).order_by(BalanceCheckpoint.month.desc()).limit(1)
+                ).scalar()
+                conditions = [MonthlyRollup.user_id == user_id, _before_month(MonthlyRollup, months[-1])]
+                totals = {INCOME: Decimal('0'), EXPENSE: Decimal('0')}
+                if previous is not None:
+                    conditions.append(~_before_month(MonthlyRollup, previous.month))
+                    totals = {INCOME: previous.total_income, EXPENSE: previous.total_expense}
+                rows = session.execute(
+                    select(MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.kind, MonthlyRollup.total)
+                    .where(*conditions).order_by(MonthlyRollup.year, MonthlyRollup.month)
+                ).all()
+
+                index = 0
+                for month in months:
+                    while index < len(rows) and (rows[index].year, rows[index].month) < (month.year, month.month):
+                        if rows[index].kind in totals:
+                            totals[rows[index].kind] += Decimal(str(rows[index].total or 0))
+                        index += 1
+                    if month in existing:
+                        results[month] = (existing[month].total_income, existing[month].total_expense)
+                        continue
+                    results[month] = (totals[INCOME], totals[EXPENSE])
+                    session.add(BalanceCheckpoint(
+                        user_id=user_id, month=month, total_income=totals[INCOME], total_expense=totals[EXPENSE]
+                    ))
+        except IntegrityError:
+            # Request khác vừa tạo cùng checkpoint (SQLite không khóa dòng)
+            pass
+        return results
+
+    @staticmethod
+    def get_history(user_id, start, end, interval='day', max_points=None):
+        """
+        Số dư cuối mỗi khoảng `interval` ('day', 'week', 'month') từ ngày
+        `start` tới ngày `end`: danh sách dict date, total_income,
+        total_expense, balance. ValueError nếu tham số không hợp lệ hoặc
+        nhiều hơn `max_points` điểm.
+        """
+        if interval not in BALANCE_INTERVALS:
+            raise ValueError(f'interval phải là một trong {", ".join(BALANCE_INTERVALS)}')
+        if start > end:
+            raise ValueError('from phải trước hoặc bằng to')
+        ends = bucket_ends(start, end, interval)
+        if max_points is not None and len(ends) > max_points:
+            raise ValueError(f'Quá nhiều điểm ({len(ends)} > {max_points}), hãy thu hẹp khoảng thời gian hoặc tăng interval')
+
+        # Mỗi điểm dùng checkpoint của tháng chứa nó (điểm là ngày cuối tháng dùng
+        # luôn checkpoint đầu tháng sau) cộng các ngày từ đầu tháng tới điểm đó.
+        # Checkpoint chỉ được tạo tới tháng hiện tại (tháng sau còn thay đổi khi có giao dịch mới)
+        current = datetime.utcnow().date().replace(day=1)
+        anchors = [min((point + timedelta(days=1)).replace(day=1), current) for point in ends]
+        checkpoints = BalanceService.get_checkpoints(user_id, anchors)
+
+        # Chỉ đọc rollup ngày trong các đoạn [đầu tháng, điểm], gộp các đoạn liền nhau
+        ranges = []
+        for anchor, point in zip(anchors, ends):
+            if anchor > point:
+                continue
+            if ranges and anchor <= ranges[-1][1] + timedelta(days=1):
+                ranges[-1][1] = max(ranges[-1][1], point)
+            else:
+                ranges.append([anchor, point])
+        rows = []
+        if ranges:
+            rows = db.session.execute(
+                select(DailyRollup.day, DailyRollup.kind, DailyRollup.total).where(
+                    DailyRollup.user_id == user_id,
+                    DailyRollup.kind.in_((INCOME, EXPENSE)),
+                    or_(*[and_(DailyRollup.day >= low, DailyRollup.day <= high) for low, high in ranges])
+                ).order_by(DailyRollup.day)
+            ).all()
+
+        # Tổng cộng dồn theo ngày để lấy tổng của một đoạn bằng phép trừ
+        days = [row.day for row in rows]
+        cumulative = [(Decimal('0'), Decimal('0'))]
+        for day, kind, total in rows:
+            income, expense = cumulative[-1]
+            if kind == INCOME:
+                income += Decimal(str(total))
+            else:
+                expense += Decimal(str(total))
+            cumulative.append((income, expense))
+
+        points = []
+        for anchor, point in zip(anchors, ends):
+            income, expense = checkpoints[anchor]
+            low, high = bisect_left(days, anchor), bisect_right(days, point)
+            if low < high:
+                income += cumulative[high][0] - cumulative[low][0]
+                expense += cumulative[high][1] - cumulative[low][1]
+            points.append({
+                'date': point,
+                'total_income': income,
+                'total_expense': expense,
+                'balance': income - expense
+            })
+        return points
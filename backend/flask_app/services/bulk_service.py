@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import select, update, delete, func
+from flask_app.models.notification import Notification
+from flask_app.services.rollup_service import RollupService, TRANSACTION_MODELS
+from flask_app.services.search_service import SearchService
+from flask_app.services.version_service import VersionService, MODEL_COLLECTIONS
+from flask_app.events import mark_changed
+from flask_app.utils import parse_id_list, validate_date
+from flask_app import db
+
+TRANSACTION_KINDS = {model: kind for kind, model in TRANSACTION_MODELS.items()}
+
+
+def _transaction_filter(model, user_id, ids=None, category=None, start_date=None, end_date=None):
+    conditions = [model.user_id == user_id]
+    if ids is not None:
+        conditions.append(model.id.in_(ids))
+    if category:
+        conditions.append(model.category == category)
+    if start_date:
+        conditions.append(model.date >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        conditions.append(model.date < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    return conditions
+
+
+class BulkService:
+    """
+    Thao tác hàng loạt bằng một câu UPDATE/DELETE theo tập hợp (không nạp
+    entity), giữ đồng bộ rollup, chỉ mục tìm kiếm, phiên bản dòng/danh sách
+    và cache dashboard trong cùng transaction.
+    """
+
+    @staticmethod
+    def mark_notifications_read(user_id, ids=None):
+        """Đánh dấu đã đọc các thông báo `ids` (hoặc tất cả), trả về số dòng thay đổi"""
+        conditions = [Notification.user_id == user_id, Notification.is_read.isnot(True)]
+        if ids is not None:
+            conditions.append(Notification.id.in_(ids))
+        result = db.session.execute(
+            update(Notification)
+            .where(*conditions)
+            .values(is_read=True, version=Notification.version + 1, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            RollupService.apply_unread(user_id, -result.rowcount)
+            VersionService.bump(user_id, MODEL_COLLECTIONS[Notification])
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def delete_transactions(model, user_id, ids):
+        """Xóa các expense/income `ids` của user, trả về số dòng đã xóa"""
+        kind = TRANSACTION_KINDS[model]
+        conditions = _transaction_filter(model, user_id, ids=ids)
+
+        # Khóa và đọc các cột cần cho rollup của những dòng sẽ bị xóa
+        rows = db.session.execute(
+            select(model.id, model.date, model.category, model.amount)
+            .where(*conditions)
+            .with_for_update()
+        ).all()
+        if not rows:
+            return 0
+
+        deleted_ids = [row.id for row in rows]
+        result = db.session.execute(
+            delete(model).where(model.user_id == user_id, model.id.in_(deleted_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+        groups = {}
+        for row in rows:
+            key = (row.date.date() if row.date else None, row.category)
+            total, count = groups.get(key, (Decimal('0'), 0))
+            groups[key] = (total + Decimal(str(row.amount)), count + 1)
+        for (day, category), (total, count) in groups.items():
+            RollupService.apply_transaction(kind, user_id, day, category, total, sign=-1, count=count)
+
+        SearchService.remove_ids(model, deleted_ids)
+        VersionService.bump(user_id, MODEL_COLLECTIONS[model])
+        mark_changed(db.session, user_id)
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def recategorize(model, user_id, new_category, ids=None, category=None, start_date=None, end_date=None):
+        """Đổi danh mục của các expense/income khớp bộ lọc, trả về số dòng thay đổi"""
+        kind = TRANSACTION_KINDS[model]
+        conditions = _transaction_filter(model, user_id, ids, category, start_date, end_date)
+        conditions.append(model.category != new_category)
+
+        # Tổng theo danh mục cũ để chuyển sang rollup của danh mục mới
+        moved = db.session.execute(
+            select(model.category, func.sum(model.amount), func.count())
+            .where(*conditions)
+            .group_by(model.category)
+            .with_for_update()
+        ).all()
+        if not moved:
+            return 0
+
+        result = db.session.execute(
+            update(model)
+            .where(*conditions)
+            .values(category=new_category, version=model.version + 1, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        for old_category, total, count in moved:
+            RollupService.move_category(kind, user_id, old_category, new_category, total, count)
+
+        VersionService.bump(user_id, MODEL_COLLECTIONS[model])
+        mark_changed(db.session, user_id)
+        db.session.commit()
+        return result.rowcount
+
+
+def recategorize_args(model, data):
+    """
+    Đọc body của request đổi danh mục: `category` (mới, bắt buộc) và ít nhất
+    một điều kiện lọc trong `ids`, `from_category`, `from`, `to`.
+    Ném ValueError nếu không hợp lệ.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Body phải là JSON object')
+    categories = [choice[0] for choice in model.CATEGORY_CHOICES]
+    new_category = data.get('category')
+    if new_category not in categories:
+        raise ValueError('Danh mục mới không hợp lệ')
+
+    filters = {'ids': parse_id_list(data.get('ids'), required=False)}
+    from_category = data.get('from_category')
+    if from_category is not None:
+        if from_category not in categories:
+            raise ValueError('Danh mục cũ không hợp lệ')
+        filters['category'] = from_category
+    for arg, key in (('from', 'start_date'), ('to', 'end_date')):
+        value = data.get(arg)
+        if value is not None:
+            filters[key] = validate_date(value) if isinstance(value, str) else None
+            if filters[key] is None:
+                raise ValueError(f'{arg} phải có định dạng YYYY-MM-DD')
+
+    if not any(value is not None for value in filters.values()):
+        raise ValueError('Cần ít nhất một điều kiện lọc: ids, from_category, from hoặc to')
+    return new_category, filters
@@ -1,4 +1,7 @@
 from flask_app.models.expense import Expense
+from flask_app.services.rollup_service import RollupService, EXPENSE
+from flask_app.utils import parse_datetime, paginate_keyset, select_columns, date_window, filter_conditions
+from flask_app.services.search_service import SearchService
 from flask_app import db
 from datetime import datetime
 
@@ -10,9 +13,11 @@ class ExpenseService:
             category=category,
             amount=amount,
             description=description,
-            date=date or datetime.utcnow()
+            date=parse_datetime(date) or datetime.utcnow()
         )
         db.session.add(expense)
+        RollupService.track(expense)
+        SearchService.index(expense)
         db.session.commit()
         return expense
 
@@ -24,16 +29,37 @@ class ExpenseService:
     def get_all_expenses(user_id):
         return Expense.query.filter_by(user_id=user_id).order_by(Expense.date.desc()).all()
 
+    @staticmethod
+    def get_expenses_page(user_id, cursor=None, limit=50, fields=None, filters=None):
+        conditions = filter_conditions(Expense, filters)
+        if fields:
+            # Chỉ đọc các cột được yêu cầu (cùng cột keyset), trả về Row thay vì entity
+            query = select_columns(Expense, fields, Expense.date, Expense.id).where(Expense.user_id == user_id, *conditions)
+        else:
+            query = Expense.query.filter(Expense.user_id == user_id, *conditions)
+        return paginate_keyset(query, Expense.date, Expense.id, cursor, limit)
+
+    @staticmethod
+    def get_expenses_summary(user_id, filters=None):
+        """(số expense, tổng tiền) của cả cửa sổ lọc, không phụ thuộc trang"""
+        return RollupService.summarize(EXPENSE, user_id, filters)
+
     @staticmethod
     def update_expense(expense_id, user_id, **kwargs):
         expense = Expense.query.filter_by(id=expense_id, user_id=user_id).first()
         if not expense:
             return None
-            
+
+        if 'date' in kwargs:
+            kwargs['date'] = parse_datetime(kwargs['date'])
+
+        before = RollupService.snapshot(expense)
         for key, value in kwargs.items():
             if hasattr(expense, key):
                 setattr(expense, key, value)
-        
+        RollupService.track_change(before, expense)
+        SearchService.index(expense)
+
         db.session.commit()
         return expense
 
@@ -41,6 +67,8 @@ class ExpenseService:
     def delete_expense(expense_id, user_id):
         expense = Expense.query.filter_by(id=expense_id, user_id=user_id).first()
         if expense:
+            RollupService.track(expense, sign=-1)
+            SearchService.remove(expense)
             db.session.delete(expense)
             db.session.commit()
             return True
@@ -48,8 +76,9 @@ class ExpenseService:
 
     @staticmethod
     def get_expenses_by_time_period(user_id, start_date, end_date):
+        # Tính trọn ngày cuối: [start_date, end_date + 1 ngày)
+        start, end = date_window(start_date, end_date)
         return Expense.query.filter(
             Expense.user_id == user_id,
-            Expense.date >= start_date,
-            Expense.date <= end_date
+            *filter_conditions(Expense, {'start': start, 'end': end})
         ).order_by(Expense.date.desc()).all()
\ No newline at end of file
@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Response, current_app, request, stream_with_context
+from sqlalchemy import select
+from flask_app.models.expense import Expense
+from flask_app.models.income import Income
+from flask_app.models.notification import Notification
+from flask_app.utils import get_filter_args, filter_conditions
+from flask_app import db
+
+# model -> (các cột xuất ra, cột dùng để lọc theo khoảng thời gian)
+EXPORT_COLUMNS = {
+    Expense: (('id', 'date', 'category', 'amount', 'description', 'created_at'), 'date'),
+    Income: (('id', 'date', 'category', 'amount', 'description', 'created_at'), 'date'),
+    Notification: (('id', 'created_at', 'title', 'description', 'is_read'), 'created_at'),
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+def _format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class ExportService:
+    """
+    Xuất dữ liệu dạng luồng: đọc theo lô bằng yield_per (server-side cursor
+    trên MySQL) và sinh từng đoạn CSV/NDJSON, nên bộ nhớ không phụ thuộc
+    vào số dòng được xuất.
+    """
+
+    @staticmethod
+    def iter_rows(model, user_id, filters=None, batch_size=1000):
+        """Các dòng của user theo bộ lọc `filters` (kết quả của get_filter_args)"""
+        columns, date_column = EXPORT_COLUMNS[model]
+        date_attr = getattr(model, date_column)
+        if date_column == 'date':
+            conditions = filter_conditions(model, filters)
+        else:
+            # Notification không có danh mục / số tiền, chỉ lọc khoảng thời gian theo created_at
+            conditions = []
+            if filters and filters.get('start') is not None:
+                conditions.append(date_attr >= filters['start'])
+            if filters and filters.get('end') is not None:
+                conditions.append(date_attr < filters['end'])
+        stmt = select(*[getattr(model, name) for name in columns]).where(model.user_id == user_id, *conditions)
+        stmt = stmt.order_by(date_attr, model.id).execution_options(yield_per=batch_size)
+
+        for partition in db.session.execute(stmt).partitions():
+            yield from partition
+
+    @staticmethod
+    def render_csv(model, rows, batch_size=1000):
+        columns = EXPORT_COLUMNS[model][0]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for count, row in enumerate(rows, start=1):
+            writer.writerow([_format_value(value) for value in row])
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    @staticmethod
+    def render_ndjson(model, rows, batch_size=1000):
+        columns = EXPORT_COLUMNS[model][0]
+        lines = []
+        for row in rows:
+            lines.append(json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False))
+            if len(lines) >= batch_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def encode(chunks, compress=False):
+        """Mã hóa UTF-8, nén gzip theo luồng nếu `compress`"""
+        if not compress:
+            for chunk in chunks:
+                yield chunk.encode('utf-8')
+            return
+
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
+
+    @staticmethod
+    def export(model, user_id, fmt='csv', compress=False, batch_size=1000, filters=None):
+        rows = ExportService.iter_rows(model, user_id, filters, batch_size=batch_size)
+        render = ExportService.render_csv if fmt == 'csv' else ExportService.render_ndjson
+        return ExportService.encode(render(model, rows, batch_size), compress)
+
+
+def export_response(model, user_id, filename):
+    """
+    Tạo Response dạng luồng từ tham số `format`, `gzip` và các bộ lọc danh
+    sách (`period`, `from`, `to`, `category`, `min_amount`, `max_amount`,
+    xem get_filter_args) của request. Ném ValueError nếu tham số không hợp lệ.
+
+    Với gzip, response là một file .gz (Content-Type application/gzip, không
+    có Content-Encoding) để client lưu nguyên file nén thay vì tự giải nén.
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError('Tham số format phải là csv hoặc ndjson')
+
+    try:
+        filters = get_filter_args()
+    except ValueError as e:
+        raise ValueError(f'Bộ lọc không hợp lệ: {e}')
+
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    chunks = ExportService.export(
+        model, user_id, fmt, compress,
+        batch_size=current_app.config['EXPORT_BATCH_SIZE'],
+        filters=filters
+    )
+    if compress:
+        mimetype, filename = 'application/gzip', f'{filename}.{fmt}.gz'
+    else:
+        mimetype, filename = EXPORT_FORMATS[fmt], f'{filename}.{fmt}'
+    headers = {'Content-Disposition': f'attachment; filename={filename}'}
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
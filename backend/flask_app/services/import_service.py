@@ -0,0 +1,175 @@
+import csv
+import hashlib
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from marshmallow import ValidationError
+from sqlalchemy import insert, select, func
+from flask_app.services.rollup_service import RollupService, EXPENSE, INCOME
+from flask_app.services.search_service import SearchService
+from flask_app.models.expense import Expense
+from flask_app.models.income import Income
+from flask_app.utils import parse_datetime
+from flask_app.events import mark_changed
+from flask_app.services.version_service import VersionService, MODEL_COLLECTIONS
+from flask_app import db
+
+IMPORT_KINDS = {
+    Expense: EXPENSE,
+    Income: INCOME
+}
+
+CSV_TYPES = ('text/csv', 'application/csv')
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+
+
+def row_hash(date, amount, description):
+    """Khóa chống trùng của một giao dịch: (date, amount, description)"""
+    key = f'{date.isoformat()}|{Decimal(str(amount)).quantize(Decimal("0.01"))}|{description or ""}'
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def parse_stream(stream, content_type):
+    """
+    Đọc lần lượt từng dòng từ body request (CSV có header hoặc NDJSON).
+    Sinh ra (số dòng, dict dữ liệu) hoặc (số dòng, thông báo lỗi) nếu dòng không đọc được.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if content_type in CSV_TYPES:
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            if None in row:
+                yield number, 'Số cột không khớp với header'
+                continue
+            yield number, {key.strip(): value for key, value in row.items() if value not in ('', None)}
+    elif content_type in NDJSON_TYPES:
+        number = 0
+        for line in text:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield number, 'JSON không hợp lệ'
+                continue
+            yield number, row if isinstance(row, dict) else 'Mỗi dòng phải là một JSON object'
+    else:
+        raise ValueError(f'Content-Type không được hỗ trợ: {content_type}')
+
+
+class ImportService:
+    """
+    Nhập hàng loạt expense/income: kiểm tra theo từng lô bằng schema, bỏ qua
+    dòng trùng (date, amount, description) và chèn các dòng hợp lệ bằng
+    INSERT nhiều dòng, tất cả trong một transaction.
+    """
+
+    @staticmethod
+    def import_rows(model, schema, user_id, rows, chunk_size=500, max_errors=1000):
+        report = {'imported': 0, 'duplicates': 0, 'failed': 0, 'errors': []}
+        seen = set()
+
+        def add_error(number, errors):
+            report['failed'] += 1
+            if len(report['errors']) < max_errors:
+                report['errors'].append({'row': number, 'errors': errors})
+
+        chunk = []
+        for number, row in rows:
+            if isinstance(row, str):
+                add_error(number, row)
+                continue
+            chunk.append((number, row))
+            if len(chunk) >= chunk_size:
+                ImportService._import_chunk(model, schema, user_id, chunk, seen, report, add_error)
+                chunk = []
+        if chunk:
+            ImportService._import_chunk(model, schema, user_id, chunk, seen, report, add_error)
+
+        db.session.commit()
+        return report
+
+    @staticmethod
+    def _import_chunk(model, schema, user_id, chunk, seen, report, add_error):
+        now = datetime.utcnow()
+        loaded = []
+        for number, row in chunk:
+            try:
+                data = schema.load(row)
+            except ValidationError as err:
+                add_error(number, err.messages)
+                continue
+            data['date'] = parse_datetime(data.get('date')) or now
+            loaded.append((number, data))
+        if not loaded:
+            return
+
+        # Các giao dịch đã có trong database cùng ngày giờ với lô này
+        dates = {data['date'] for _, data in loaded}
+        existing = {
+            row_hash(row.date, row.amount, row.description)
+            for row in db.session.execute(
+                select(model.date, model.amount, model.description).where(
+                    model.user_id == user_id,
+                    model.date.in_(dates)
+                )
+            )
+        }
+
+        values = []
+        for number, data in loaded:
+            key = row_hash(data['date'], data['amount'], data.get('description'))
+            if key in existing or key in seen:
+                report['duplicates'] += 1
+                continue
+            seen.add(key)
+            values.append({
+                'user_id': user_id,
+                'category': data['category'],
+                'amount': data['amount'],
+                'description': data.get('description'),
+                'date': data['date'],
+                'created_at': now,
+                'updated_at': now
+            })
+        if not values:
+            return
+
+        ImportService._insert(model, user_id, values)
+        ImportService._apply_rollups(IMPORT_KINDS[model], user_id, values)
+        mark_changed(db.session, user_id)
+        VersionService.bump(user_id, MODEL_COLLECTIONS[model])
+        report['imported'] += len(values)
+
+    @staticmethod
+    def _insert(model, user_id, values):
+        if db.session.get_bind().dialect.insert_executemany_returning:
+            # Trả về luôn các cột cần đánh chỉ mục nên không cần giữ thứ tự tham số
+            # (sort_by_parameter_order buộc SQLite chèn từng dòng một)
+            rows = db.session.execute(
+                insert(model).returning(model.id, model.user_id, model.description), values
+            ).mappings().all()
+            SearchService.index_rows(model, rows)
+            return
+
+        # Không có executemany RETURNING (mysqlconnector, pymysql): vẫn chèn cả lô
+        # bằng một câu lệnh rồi đọc lại id của các dòng vừa chèn theo mốc id lớn
+        # nhất trước đó (transaction không thấy dòng chưa commit của request khác)
+        last_id = db.session.execute(select(func.max(model.id))).scalar() or 0
+        db.session.execute(insert(model), values)
+        rows = db.session.execute(
+            select(model.id, model.user_id, model.description)
+            .where(model.user_id == user_id, model.id > last_id)
+        ).mappings().all()
+        SearchService.index_rows(model, rows)
+
+    @staticmethod
+    def _apply_rollups(kind, user_id, values):
+        groups = {}
+        for row in values:
+            key = (row['date'].date(), row['category'])
+            total, count = groups.get(key, (Decimal('0'), 0))
+            groups[key] = (total + Decimal(str(row['amount'])), count + 1)
+        for (day, category), (total, count) in groups.items():
+            RollupService.apply_transaction(kind, user_id, day, category, total, count=count)
@@ -1,4 +1,7 @@
 from flask_app.models.income import Income
+from flask_app.services.rollup_service import RollupService, INCOME
+from flask_app.utils import parse_datetime, paginate_keyset, select_columns, date_window, filter_conditions
+from flask_app.services.search_service import SearchService
 from flask_app import db
 from datetime import datetime
 
@@ -10,9 +13,11 @@ class IncomeService:
             category=category,
             amount=amount,
             description=description,
-            date=date or datetime.utcnow()
+            date=parse_datetime(date) or datetime.utcnow()
         )
         db.session.add(income)
+        RollupService.track(income)
+        SearchService.index(income)
         db.session.commit()
         return income
 
@@ -24,16 +29,37 @@ class IncomeService:
     def get_all_incomes(user_id):
         return Income.query.filter_by(user_id=user_id).order_by(Income.date.desc()).all()
 
+    @staticmethod
+    def get_incomes_page(user_id, cursor=None, limit=50, fields=None, filters=None):
+        conditions = filter_conditions(Income, filters)
+        if fields:
+            # Chỉ đọc các cột được yêu cầu (cùng cột keyset), trả về Row thay vì entity
+            query = select_columns(Income, fields, Income.date, Income.id).where(Income.user_id == user_id, *conditions)
+        else:
+            query = Income.query.filter(Income.user_id == user_id, *conditions)
+        return paginate_keyset(query, Income.date, Income.id, cursor, limit)
+
+    @staticmethod
+    def get_incomes_summary(user_id, filters=None):
+        """(số income, tổng tiền) của cả cửa sổ lọc, không phụ thuộc trang"""
+        return RollupService.summarize(INCOME, user_id, filters)
+
     @staticmethod
     def update_income(income_id, user_id, **kwargs):
         income = Income.query.filter_by(id=income_id, user_id=user_id).first()
         if not income:
             return None
-            
+
+        if 'date' in kwargs:
+            kwargs['date'] = parse_datetime(kwargs['date'])
+
+        before = RollupService.snapshot(income)
         for key, value in kwargs.items():
             if hasattr(income, key):
                 setattr(income, key, value)
-        
+        RollupService.track_change(before, income)
+        SearchService.index(income)
+
         db.session.commit()
         return income
 
@@ -41,6 +67,8 @@ class IncomeService:
     def delete_income(income_id, user_id):
         income = Income.query.filter_by(id=income_id, user_id=user_id).first()
         if income:
+            RollupService.track(income, sign=-1)
+            SearchService.remove(income)
             db.session.delete(income)
             db.session.commit()
             return True
@@ -48,8 +76,9 @@ class IncomeService:
 
     @staticmethod
     def get_incomes_by_time_period(user_id, start_date, end_date):
+        # Tính trọn ngày cuối: [start_date, end_date + 1 ngày)
+        start, end = date_window(start_date, end_date)
         return Income.query.filter(
             Income.user_id == user_id,
-            Income.date >= start_date,
-            Income.date <= end_date
+            *filter_conditions(Income, {'start': start, 'end': end})
         ).order_by(Income.date.desc()).all()
\ No newline at end of file
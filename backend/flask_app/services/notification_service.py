@@ -1,5 +1,11 @@
 from flask_app.models.notification import Notification
+from flask_app.utils import paginate_keyset, select_columns
+from flask_app.services.search_service import SearchService
+from flask_app.services.rollup_service import RollupService
+from flask_app.schemas.compiled import notification_serializer
+from flask_app.realtime import notification_hub
 from flask_app import db
+from flask import current_app
 from datetime import datetime
 
 class NotificationService:
@@ -11,9 +17,26 @@ class NotificationService:
             description=description
         )
         db.session.add(notification)
+        RollupService.apply_unread(user_id, 1)
+        SearchService.index(notification)
         db.session.commit()
+
+        # Chỉ phát sự kiện sau khi commit để client không nhận thông báo bị rollback
+        notification_hub.publish(
+            user_id,
+            notification.id,
+            current_app.json.dumps(notification_serializer.dump(notification))
+        )
         return notification
 
+    @staticmethod
+    def get_notifications_since(user_id, last_id, limit):
+        """Các thông báo có id > last_id (theo thứ tự id), dùng cho Last-Event-ID"""
+        return Notification.query.filter(
+            Notification.user_id == user_id,
+            Notification.id > last_id
+        ).order_by(Notification.id).limit(limit).all()
+
     @staticmethod
     def get_notification_by_id(notification_id, user_id):
         return Notification.query.filter_by(id=notification_id, user_id=user_id).first()
@@ -22,16 +45,28 @@ class NotificationService:
     def get_all_notifications(user_id):
         return Notification.query.filter_by(user_id=user_id).order_by(Notification.created_at.desc()).all()
 
+    @staticmethod
+    def get_notifications_page(user_id, cursor=None, limit=50, fields=None):
+        if fields:
+            # Chỉ đọc các cột được yêu cầu (cùng cột keyset), trả về Row thay vì entity
+            query = select_columns(Notification, fields, Notification.created_at, Notification.id).where(Notification.user_id == user_id)
+        else:
+            query = Notification.query.filter_by(user_id=user_id)
+        return paginate_keyset(query, Notification.created_at, Notification.id, cursor, limit)
+
     @staticmethod
     def update_notification(notification_id, user_id, **kwargs):
         notification = Notification.query.filter_by(id=notification_id, user_id=user_id).first()
         if not notification:
             return None
             
+        was_unread = not notification.is_read
         for key, value in kwargs.items():
             if hasattr(notification, key):
                 setattr(notification, key, value)
-        
+        RollupService.apply_unread(user_id, int(not notification.is_read) - int(was_unread))
+        SearchService.index(notification)
+
         db.session.commit()
         return notification
 
@@ -39,6 +74,9 @@ class NotificationService:
     def delete_notification(notification_id, user_id):
         notification = Notification.query.filter_by(id=notification_id, user_id=user_id).first()
         if notification:
+            if not notification.is_read:
+                RollupService.apply_unread(user_id, -1)
+            SearchService.remove(notification)
             db.session.delete(notification)
             db.session.commit()
             return True
@@ -48,6 +86,8 @@ class NotificationService:
     def mark_as_read(notification_id, user_id):
         notification = Notification.query.filter_by(id=notification_id, user_id=user_id).first()
         if notification:
+            if not notification.is_read:
+                RollupService.apply_unread(user_id, -1)
             notification.is_read = True
             db.session.commit()
             return True
@@ -0,0 +1,203 @@
+from datetime import datetime, time, timedelta
+from sqlalchemy import select, func, extract, cast, type_coerce, Integer, Float
+from flask_app.services.rollup_service import EXPENSE, INCOME, TRANSACTION_MODELS
+from flask_app.utils import generate_monthly_labels
+from flask_app import db
+
+try:
+    import numpy as np
+except ImportError:  # numpy là tùy chọn, thiếu thì tính bằng vòng lặp Python
+    np = None
+
+REPORT_ENGINES = ('numpy', 'python')
+
+
+def _month_index(value):
+    return value.year * 12 + value.month - 1
+
+
+def _round(value):
+    return None if value is None else round(float(value), 2)
+
+
+def _rounded(values):
+    return [_round(value) for value in values]
+
+
+class ReportService:
+    """
+    Báo cáo theo tháng trên một khoảng thời gian tùy ý: thu/chi/chênh lệch,
+    tỷ lệ tiết kiệm, thay đổi so với tháng trước, trung bình trượt và bảng
+    pivot tháng x danh mục.
+
+    Database cộng sẵn theo ô (tháng, danh mục) và trả về ba cột (chỉ số
+    tháng year * 12 + month - 1, danh mục, tổng dạng float): vài trăm ô cho
+    nhiều năm dữ liệu thay vì hàng chục nghìn dòng giao dịch phải chuyển
+    sang Python. Với numpy, pivot và các chuỗi được tính trên mảng
+    (bincount, cumsum, diff); nếu không có numpy thì dùng bản vòng lặp
+    Python cho ra cùng kết quả.
+    """
+
+    @staticmethod
+    def fetch_columns(user_id, kind, start, end):
+        """(chỉ số tháng, danh mục, tổng) theo ô của các giao dịch từ ngày `start` tới hết ngày `end`, dạng cột"""
+        model = TRANSACTION_MODELS[kind]
+        month = cast(extract('year', model.date) * 12 + extract('month', model.date) - 1, Integer)
+        rows = db.session.execute(
+            select(
+                month.label('month_index'),
+                model.category,
+                func.sum(type_coerce(model.amount, Float))
+            ).where(
+                model.user_id == user_id,
+                model.date >= datetime.combine(start, time.min),
+                model.date < datetime.combine(end + timedelta(days=1), time.min)
+            ).group_by('month_index', model.category)
+        ).all()
+        if not rows:
+            return (), (), ()
+        return tuple(zip(*rows))
+
+    @staticmethod
+    def build_report(user_id, start, end, window=3, engine='python', max_months=None):
+        """
+        Báo cáo theo tháng từ ngày `start` tới ngày `end`. `window` là số tháng
+        của trung bình trượt, `engine` là 'python' hoặc 'numpy' (dùng 'python'
+        nếu chưa cài numpy). ValueError nếu tham số không hợp lệ hoặc khoảng
+        thời gian dài hơn `max_months` tháng.
+        """
+        if engine not in REPORT_ENGINES:
+            raise ValueError(f'engine phải là một trong {", ".join(REPORT_ENGINES)}')
+        if np is None:
+            engine = 'python'
+        if start > end:
+            raise ValueError('from phải trước hoặc bằng to')
+        if window < 1:
+            raise ValueError('window phải lớn hơn 0')
+        months = generate_monthly_labels(start, end)
+        if max_months is not None and len(months) > max_months:
+            raise ValueError(f'Quá nhiều tháng ({len(months)} > {max_months}), hãy thu hẹp khoảng thời gian')
+
+        compute = _numpy_series if engine == 'numpy' else _python_series
+        first_month = _month_index(start)
+        series = {
+            kind: compute(ReportService.fetch_columns(user_id, kind, start, end), first_month, len(months), window)
+            for kind in (INCOME, EXPENSE)
+        }
+        summary = (_numpy_summary if engine == 'numpy' else _python_summary)(
+            series[INCOME]['totals'], series[EXPENSE]['totals']
+        )
+
+        report = {
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'window': window,
+            'months': months,
+            'net': _rounded(summary['net']),
+            'savings_rate': _rounded(summary['savings_rate']),
+            'totals': {
+                'income': _round(summary['income_total']),
+                'expense': _round(summary['expense_total']),
+                'net': _round(summary['income_total'] - summary['expense_total']),
+                'savings_rate': _round(summary['total_savings_rate'])
+            }
+        }
+        for kind in (INCOME, EXPENSE):
+            report[kind] = {
+                'totals': _rounded(series[kind]['totals']),
+                'change': _rounded(series[kind]['change']),
+                'change_pct': _rounded(series[kind]['change_pct']),
+                'rolling_mean': _rounded(series[kind]['rolling_mean']),
+                'categories': {
+                    category: _rounded(values) for category, values in series[kind]['categories'].items()
+                }
+            }
+        return report
+
+
+def _numpy_series(columns, first_month, month_count, window):
+    month, category, amount = columns
+    month = np.asarray(month, dtype=np.int64) - first_month
+    amount = np.asarray(amount, dtype=np.float64)
+    names, codes = np.unique(np.asarray(category, dtype=object), return_inverse=True)
+
+    # Pivot tháng x danh mục bằng một lần bincount trên chỉ số phẳng
+    pivot = np.bincount(
+        month * len(names) + codes, weights=amount, minlength=month_count * len(names)
+    ).reshape(month_count, len(names)) if len(names) else np.zeros((month_count, 0))
+    totals = pivot.sum(axis=1)
+
+    previous = totals[:-1]
+    change = np.diff(totals)
+    change_pct = np.full(change.shape, np.nan)
+    np.divide(change * 100, previous, out=change_pct, where=previous != 0)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(totals)))
+    index = np.arange(month_count)
+    lower = np.maximum(index + 1 - window, 0)
+    rolling_mean = (cumulative[index + 1] - cumulative[lower]) / (index + 1 - lower)
+
+    return {
+        'totals': totals.tolist(),
+        'change': [None] + change.tolist(),
+        'change_pct': [None] + [None if np.isnan(value) else value for value in change_pct.tolist()],
+        'rolling_mean': rolling_mean.tolist(),
+        'categories': {name: pivot[:, position].tolist() for position, name in enumerate(names)}
+    }
+
+
+def _numpy_summary(income, expense):
+    income, expense = np.asarray(income), np.asarray(expense)
+    net = income - expense
+    rate = np.full(net.shape, np.nan)
+    np.divide(net * 100, income, out=rate, where=income != 0)
+    income_total, expense_total = float(income.sum()), float(expense.sum())
+    return {
+        'net': net.tolist(),
+        'savings_rate': [None if np.isnan(value) else value for value in rate.tolist()],
+        'income_total': income_total,
+        'expense_total': expense_total,
+        'total_savings_rate': (income_total - expense_total) * 100 / income_total if income_total else None
+    }
+
+
+def _python_series(columns, first_month, month_count, window):
+    totals = [0.0] * month_count
+    categories = {}
+    for month, category, amount in zip(*columns):
+        position = month - first_month
+        totals[position] += amount
+        if category not in categories:
+            categories[category] = [0.0] * month_count
+        categories[category][position] += amount
+
+    change, change_pct, rolling_mean = [None], [None], []
+    for position in range(1, month_count):
+        delta = totals[position] - totals[position - 1]
+        change.append(delta)
+        change_pct.append(delta * 100 / totals[position - 1] if totals[position - 1] else None)
+    for position in range(month_count):
+        values = totals[max(position + 1 - window, 0):position + 1]
+        rolling_mean.append(sum(values) / len(values))
+
+    return {
+        'totals': totals,
+        'change': change,
+        'change_pct': change_pct,
+        'rolling_mean': rolling_mean,
+        'categories': {category: categories[category] for category in sorted(categories)}
+    }
+
+
+def _python_summary(income, expense):
+    net = [income_value - expense_value for income_value, expense_value in zip(income, expense)]
+    income_total, expense_total = sum(income), sum(expense)
+    return {
+        'net': net,
+        'savings_rate': [
+            value * 100 / income_value if income_value else None for value, income_value in zip(net, income)
+        ],
+        'income_total': income_total,
+        'expense_total': expense_total,
+        'total_savings_rate': (income_total - expense_total) * 100 / income_total if income_total else None
+    }
@@ -0,0 +1,317 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from sqlalchemy import func, extract, select, literal, insert, delete, and_, or_
+from flask_app.models.expense import Expense
+from flask_app.models.income import Income
+from flask_app.models.user_item import UserItem
+from flask_app.models.notification import Notification
+from flask_app.models.rollup import UserTotal, DailyRollup, MonthlyRollup, CategoryRollup, BalanceCheckpoint
+from flask_app.utils import parse_datetime, upsert, filter_conditions
+from flask_app.events import mark_changed
+from flask_app.services.version_service import VersionService, ROLLUP_COLLECTION
+from flask_app import db
+
+EXPENSE = 'expense'
+INCOME = 'income'
+
+TRANSACTION_MODELS = {
+    EXPENSE: Expense,
+    INCOME: Income
+}
+
+TOTAL_COLUMNS = {
+    EXPENSE: 'total_expense',
+    INCOME: 'total_income'
+}
+
+
+def _whole_day(value):
+    return value is None or value == datetime.combine(value.date(), time.min)
+
+
+def _to_decimal(value):
+    if value is None:
+        return Decimal('0')
+    return Decimal(str(value))
+
+
+class RollupService:
+    """
+    Bảng tổng hợp (rollup) cho dashboard, được cập nhật cùng transaction
+    với mỗi thao tác tạo/sửa/xóa expense, income và user item.
+    """
+
+    @staticmethod
+    def snapshot(obj):
+        """Các giá trị của bản ghi ảnh hưởng tới rollup"""
+        if isinstance(obj, Expense):
+            return (EXPENSE, obj.user_id, parse_datetime(obj.date), obj.category, _to_decimal(obj.amount))
+        if isinstance(obj, Income):
+            return (INCOME, obj.user_id, parse_datetime(obj.date), obj.category, _to_decimal(obj.amount))
+        if isinstance(obj, UserItem):
+            return ('debt', obj.user_id, _to_decimal(obj.balance))
+        return None
+
+    @staticmethod
+    def track(obj, sign=1):
+        """Cộng (sign=1) hoặc trừ (sign=-1) một bản ghi vào các bảng rollup"""
+        RollupService._apply_snapshot(RollupService.snapshot(obj), sign)
+
+    @staticmethod
+    def track_change(before, obj):
+        """Chuyển phần đóng góp của bản ghi từ `before` (snapshot) sang giá trị hiện tại"""
+        after = RollupService.snapshot(obj)
+        if before == after:
+            return
+        RollupService._apply_snapshot(before, -1)
+        RollupService._apply_snapshot(after, 1)
+
+    @staticmethod
+    def _apply_snapshot(snapshot, sign):
+        if snapshot is None:
+            return
+        if snapshot[0] == 'debt':
+            RollupService.apply_debt(snapshot[1], snapshot[2] * sign)
+        else:
+            RollupService.apply_transaction(*snapshot, sign=sign)
+
+    @staticmethod
+    def apply_transaction(kind, user_id, date, category, amount, sign=1, count=1):
+        amount = _to_decimal(amount) * sign
+        count = count * sign
+        date = parse_datetime(date)
+
+        upsert(UserTotal, {'user_id': user_id}, {TOTAL_COLUMNS[kind]: amount})
+        upsert(
+            CategoryRollup,
+            {'user_id': user_id, 'kind': kind, 'category': category},
+            {'total': amount, 'count': count}
+        )
+        if date is None:
+            return
+        upsert(
+            DailyRollup,
+            {'user_id': user_id, 'kind': kind, 'day': date.date()},
+            {'total': amount, 'count': count}
+        )
+        upsert(
+            MonthlyRollup,
+            {'user_id': user_id, 'kind': kind, 'year': date.year, 'month': date.month},
+            {'total': amount, 'count': count}
+        )
+        RollupService.invalidate_checkpoints(user_id, date)
+
+    @staticmethod
+    def invalidate_checkpoints(user_id, date):
+        """Xóa các checkpoint số dư đã bao gồm ngày `date` (checkpoint của các tháng sau ngày đó)"""
+        # Checkpoint chỉ được tạo tới tháng hiện tại nên giao dịch trong tháng hiện tại
+        # không ảnh hưởng checkpoint nào; chừa một ngày cho lệch đồng hồ giữa các process
+        current_month = (datetime.utcnow() + timedelta(days=1)).date().replace(day=1)
+        if date.date() >= current_month:
+            return
+        db.session.execute(delete(BalanceCheckpoint).where(
+            BalanceCheckpoint.user_id == user_id,
+            BalanceCheckpoint.month > date.date()
+        ))
+
+    @staticmethod
+    def apply_debt(user_id, delta):
+        if delta:
+            upsert(UserTotal, {'user_id': user_id}, {'total_debt': _to_decimal(delta)})
+
+    @staticmethod
+    def apply_unread(user_id, delta):
+        """Cộng `delta` vào bộ đếm thông báo chưa đọc của user"""
+        if delta:
+            upsert(UserTotal, {'user_id': user_id}, {'unread_notifications': delta})
+
+    @staticmethod
+    def get_unread_count(user_id):
+        totals = db.session.get(UserTotal, user_id)
+        return totals.unread_notifications if totals else 0
+
+    @staticmethod
+    def reconcile_unread(user_id=None, dry_run=False):
+        """
+        So sánh bộ đếm chưa đọc với số thông báo chưa đọc thực tế và sửa phần
+        lệch (bằng cách cộng chênh lệch, an toàn khi có ghi đồng thời).
+        Trả về danh sách (user_id, giá trị lưu, giá trị thực tế) bị lệch.
+        """
+        actual_query = db.session.query(Notification.user_id, func.count()).filter(
+            Notification.is_read.isnot(True)
+        ).group_by(Notification.user_id)
+        stored_query = db.session.query(UserTotal.user_id, UserTotal.unread_notifications)
+        if user_id is not None:
+            actual_query = actual_query.filter(Notification.user_id == user_id)
+            stored_query = stored_query.filter(UserTotal.user_id == user_id)
+        actual = dict(actual_query.all())
+        stored = dict(stored_query.all())
+
+        drift = []
+        for row_user_id in sorted(set(actual) | set(stored)):
+            expected, current = actual.get(row_user_id, 0), stored.get(row_user_id, 0)
+            if expected != current:
+                drift.append((row_user_id, current, expected))
+                if not dry_run:
+                    RollupService.apply_unread(row_user_id, expected - current)
+        if not dry_run:
+            db.session.commit()
+        return drift
+
+    @staticmethod
+    def move_category(kind, user_id, old_category, new_category, total, count):
+        """Chuyển tổng/số lượng giữa hai danh mục (tổng theo ngày/tháng không đổi)"""
+        total = _to_decimal(total)
+        upsert(
+            CategoryRollup,
+            {'user_id': user_id, 'kind': kind, 'category': old_category},
+            {'total': -total, 'count': -count}
+        )
+        upsert(
+            CategoryRollup,
+            {'user_id': user_id, 'kind': kind, 'category': new_category},
+            {'total': total, 'count': count}
+        )
+
+    @staticmethod
+    def get_totals(user_id):
+        return db.session.get(UserTotal, user_id)
+
+    @staticmethod
+    def get_daily(user_id, kind, since, until=None):
+        query = DailyRollup.query.filter(
+            DailyRollup.user_id == user_id,
+            DailyRollup.kind == kind,
+            DailyRollup.day >= since
+        )
+        if until is not None:
+            query = query.filter(DailyRollup.day <= until)
+        return query.all()
+
+    @staticmethod
+    def get_monthly_after(user_id, kind, year, month):
+        """Các tháng sau (year, month), không bao gồm chính tháng đó"""
+        return MonthlyRollup.query.filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.kind == kind,
+            or_(
+                MonthlyRollup.year > year,
+                and_(MonthlyRollup.year == year, MonthlyRollup.month > month)
+            )
+        ).all()
+
+    @staticmethod
+    def get_categories(user_id, kind):
+        return CategoryRollup.query.filter(
+            CategoryRollup.user_id == user_id,
+            CategoryRollup.kind == kind,
+            CategoryRollup.count != 0
+        ).all()
+
+    @staticmethod
+    def summarize(kind, user_id, filters=None):
+        """
+        (số giao dịch, tổng tiền) của các giao dịch khớp `filters` (xem
+        utils.get_filter_args). Cửa sổ chỉ theo ngày hoặc chỉ theo danh mục
+        được đọc từ bảng rollup tương ứng; các trường hợp còn lại tính tổng
+        trên bảng giao dịch với cùng điều kiện như danh sách.
+        """
+        filters = filters or {}
+        start, end = filters.get('start'), filters.get('end')
+        categories = filters.get('categories')
+        by_date = start is not None or end is not None
+        by_amount = filters.get('min_amount') is not None or filters.get('max_amount') is not None
+
+        if by_amount or (by_date and categories) or not (_whole_day(start) and _whole_day(end)):
+            model = TRANSACTION_MODELS[kind]
+            query = select(func.count(model.id), func.coalesce(func.sum(model.amount), 0)).where(
+                model.user_id == user_id, *filter_conditions(model, filters)
+            )
+        else:
+            rollup = DailyRollup if by_date else CategoryRollup
+            conditions = []
+            if start is not None:
+                conditions.append(DailyRollup.day >= start.date())
+            if end is not None:
+                conditions.append(DailyRollup.day < end.date())
+            if categories:
+                conditions.append(CategoryRollup.category.in_(categories))
+            query = select(func.coalesce(func.sum(rollup.count), 0), func.coalesce(func.sum(rollup.total), 0)).where(
+                rollup.user_id == user_id, rollup.kind == kind, *conditions
+            )
+        count, total = db.session.execute(query).one()
+        return int(count), _to_decimal(total)
+
+    @staticmethod
+    def rebuild(user_id=None):
+        """Xóa và tính lại toàn bộ bảng rollup từ dữ liệu gốc"""
+        if user_id is not None:
+            affected = {int(user_id)}
+        else:
+            affected = set(db.session.execute(select(UserTotal.user_id)).scalars())
+        for model in (UserTotal, DailyRollup, MonthlyRollup, CategoryRollup, BalanceCheckpoint):
+            stmt = delete(model)
+            if user_id is not None:
+                stmt = stmt.where(model.user_id == user_id)
+            db.session.execute(stmt)
+
+        for kind, model in TRANSACTION_MODELS.items():
+            day = func.date(model.date)
+            year = extract('year', model.date)
+            month = extract('month', model.date)
+            sources = [
+                (DailyRollup, ['user_id', 'kind', 'day', 'total', 'count'], [day], [day]),
+                (MonthlyRollup, ['user_id', 'kind', 'year', 'month', 'total', 'count'], [year, month], [year, month]),
+                (CategoryRollup, ['user_id', 'kind', 'category', 'total', 'count'], [model.category], [model.category]),
+            ]
+            for target, columns, keys, group_by in sources:
+                select_stmt = select(
+                    model.user_id,
+                    literal(kind),
+                    *keys,
+                    func.sum(model.amount),
+                    func.count(model.id)
+                ).group_by(model.user_id, *group_by)
+                if target is not CategoryRollup:
+                    select_stmt = select_stmt.where(model.date.isnot(None))
+                if user_id is not None:
+                    select_stmt = select_stmt.where(model.user_id == user_id)
+                db.session.execute(insert(target).from_select(columns, select_stmt))
+
+        totals = {}
+        for kind, model in TRANSACTION_MODELS.items():
+            query = db.session.query(model.user_id, func.sum(model.amount)).group_by(model.user_id)
+            if user_id is not None:
+                query = query.filter(model.user_id == user_id)
+            for row_user_id, total in query:
+                totals.setdefault(row_user_id, {})[TOTAL_COLUMNS[kind]] = total or 0
+
+        query = db.session.query(UserItem.user_id, func.sum(UserItem.balance)).group_by(UserItem.user_id)
+        if user_id is not None:
+            query = query.filter(UserItem.user_id == user_id)
+        for row_user_id, total in query:
+            totals.setdefault(row_user_id, {})['total_debt'] = total or 0
+
+        query = db.session.query(Notification.user_id, func.count()).filter(
+            Notification.is_read.isnot(True)
+        ).group_by(Notification.user_id)
+        if user_id is not None:
+            query = query.filter(Notification.user_id == user_id)
+        for row_user_id, count in query:
+            totals.setdefault(row_user_id, {})['unread_notifications'] = count
+
+        for row_user_id, values in totals.items():
+            db.session.add(UserTotal(
+                user_id=row_user_id,
+                total_income=values.get('total_income', 0),
+                total_expense=values.get('total_expense', 0),
+                total_debt=values.get('total_debt', 0),
+                unread_notifications=values.get('unread_notifications', 0)
+            ))
+
+        # Dashboard đã cache ở mọi tiến trình hết hiệu lực theo phiên bản rollup
+        for row_user_id in sorted(affected | set(totals)):
+            VersionService.bump(row_user_id, ROLLUP_COLLECTION)
+        mark_changed(db.session, user_id)
+        db.session.commit()
+        return len(totals)
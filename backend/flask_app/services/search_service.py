@@ -0,0 +1,288 @@
+import re
+import unicodedata
+from collections import Counter
+from types import SimpleNamespace
+from sqlalchemy import inspect, select, delete, insert, text, bindparam, and_, or_
+from flask_app.models.expense import Expense
+from flask_app.models.income import Income
+from flask_app.models.notification import Notification
+from flask_app.models.user_item import UserItem
+from flask_app.models.search import SearchToken, FTS_TABLE
+from flask_app import db
+
+# kind -> (model, các cột được đánh chỉ mục, mã dùng để mã hóa rowid FTS5)
+SEARCH_KINDS = {
+    'expenses': (Expense, ('description',), 1),
+    'incomes': (Income, ('description',), 2),
+    'notifications': (Notification, ('title', 'description'), 3),
+    'user_items': (UserItem, ('name',), 4),
+}
+MODEL_KINDS = {model: kind for kind, (model, _, _) in SEARCH_KINDS.items()}
+
+TOKEN_PATTERN = re.compile(r'\w+')
+MAX_TOKEN_LENGTH = 64
+ROWID_FACTOR = 8
+DOCUMENT_BACKENDS = ('fts5', 'fulltext')
+
+_backends = {}
+
+
+def tokenize(value):
+    """Tách chuỗi thành token: chữ thường, bỏ dấu tiếng Việt"""
+    if not value:
+        return []
+    value = unicodedata.normalize('NFKD', value.lower().replace('đ', 'd'))
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_PATTERN.findall(value)]
+
+
+def scoped_tokens(user_id, kind, tokens):
+    """
+    Token lưu trong search_documents: gắn tiền tố u<user_id>k<mã kind>t để
+    mỗi (user, kind) có danh sách tài liệu riêng trong chỉ mục, nên MATCH
+    chỉ duyệt tài liệu của user đó. '_' bị tách vì là dấu phân cách của FTS5.
+    """
+    scope = f'u{int(user_id)}k{SEARCH_KINDS[kind][2]}t'
+    return [scope + part for token in tokens for part in token.split('_') if part]
+
+
+def _document_tokens(obj, columns):
+    tokens = []
+    for column in columns:
+        tokens.extend(tokenize(getattr(obj, column)))
+    return tokens
+
+
+class SearchService:
+    """
+    Tìm kiếm toàn văn trên description/title/name.
+
+    Backend được chọn theo database:
+    - mysql: bảng `search_documents` có chỉ mục FULLTEXT (MATCH ... AGAINST)
+    - sqlite: bảng ảo FTS5 `search_documents`
+    - còn lại (hoặc SQLite không có FTS5): inverted index trong bảng `search_tokens`
+
+    Trong `search_documents` mọi token đều gắn phạm vi user/kind
+    (scoped_tokens), nên độ trễ tìm kiếm phụ thuộc số tài liệu của user chứ
+    không phụ thuộc tổng số dòng của mọi user. Chỉ mục được services cập
+    nhật trong cùng transaction với thao tác ghi.
+    """
+
+    @staticmethod
+    def backend():
+        bind = db.session.get_bind()
+        key = str(bind.url)
+        if key not in _backends:
+            if bind.dialect.name == 'mysql':
+                _backends[key] = 'fulltext'
+            # Kiểm tra trên connection của session: inspect(engine) mượn một
+            # connection khác và có thể rollback transaction đang mở (StaticPool)
+            elif bind.dialect.name == 'sqlite' and inspect(db.session.connection()).has_table(FTS_TABLE):
+                _backends[key] = 'fts5'
+            else:
+                _backends[key] = 'tokens'
+        return _backends[key]
+
+    @staticmethod
+    def index(obj):
+        """Thêm hoặc cập nhật một bản ghi trong chỉ mục"""
+        kind = MODEL_KINDS.get(type(obj))
+        if kind is None:
+            return
+        backend = SearchService.backend()
+        if obj.id is None:
+            db.session.flush()
+
+        SearchService._remove(backend, kind, obj.id)
+        SearchService._insert(backend, kind, obj)
+
+    @staticmethod
+    def _insert(backend, kind, obj):
+        SearchService._insert_many(backend, kind, [obj])
+
+    @staticmethod
+    def _insert_many(backend, kind, objs):
+        # Một câu lệnh executemany cho cả lô thay vì một INSERT mỗi bản ghi
+        columns = SEARCH_KINDS[kind][1]
+        if backend in DOCUMENT_BACKENDS:
+            # Cột UNINDEXED của FTS5 không có type affinity nên luôn lưu user_id dạng int
+            documents = [
+                {
+                    'rowid': obj.id * ROWID_FACTOR + SEARCH_KINDS[kind][2],
+                    'body': ' '.join(scoped_tokens(obj.user_id, kind, tokens)),
+                    'user_id': int(obj.user_id),
+                    'kind': kind,
+                    'ref_id': obj.id
+                }
+                for obj, tokens in ((obj, _document_tokens(obj, columns)) for obj in objs) if tokens
+            ]
+            if documents:
+                db.session.execute(
+                    text(f'INSERT INTO {FTS_TABLE} (rowid, body, user_id, kind, ref_id) '
+                         'VALUES (:rowid, :body, :user_id, :kind, :ref_id)'),
+                    documents
+                )
+        else:
+            tokens = [
+                {'user_id': obj.user_id, 'token': token, 'kind': kind, 'ref_id': obj.id, 'weight': weight}
+                for obj in objs
+                for token, weight in Counter(_document_tokens(obj, columns)).items()
+            ]
+            if tokens:
+                db.session.execute(insert(SearchToken), tokens)
+
+    @staticmethod
+    def index_rows(model, rows):
+        """Đánh chỉ mục các dòng vừa chèn hàng loạt (mapping có id, user_id và các cột văn bản)"""
+        kind = MODEL_KINDS.get(model)
+        if kind is None:
+            return
+        SearchService._insert_many(SearchService.backend(), kind, [SimpleNamespace(**row) for row in rows])
+
+    @staticmethod
+    def remove(obj):
+        """Xóa một bản ghi khỏi chỉ mục"""
+        kind = MODEL_KINDS.get(type(obj))
+        if kind is not None and obj.id is not None:
+            SearchService._remove(SearchService.backend(), kind, obj.id)
+
+    @staticmethod
+    def remove_ids(model, ids):
+        """Xóa hàng loạt các bản ghi `ids` của `model` khỏi chỉ mục bằng một câu lệnh"""
+        kind = MODEL_KINDS.get(model)
+        if kind is None or not ids:
+            return
+        if SearchService.backend() in DOCUMENT_BACKENDS:
+            db.session.execute(
+                text(f'DELETE FROM {FTS_TABLE} WHERE rowid IN :rowids').bindparams(bindparam('rowids', expanding=True)),
+                {'rowids': [ref_id * ROWID_FACTOR + SEARCH_KINDS[kind][2] for ref_id in ids]}
+            )
+        else:
+            db.session.execute(
+                delete(SearchToken).where(SearchToken.kind == kind, SearchToken.ref_id.in_(ids))
+            )
+
+    @staticmethod
+    def _remove(backend, kind, ref_id):
+        if backend in DOCUMENT_BACKENDS:
+            db.session.execute(
+                text(f'DELETE FROM {FTS_TABLE} WHERE rowid = :rowid'),
+                {'rowid': ref_id * ROWID_FACTOR + SEARCH_KINDS[kind][2]}
+            )
+        else:
+            db.session.execute(
+                delete(SearchToken).where(SearchToken.kind == kind, SearchToken.ref_id == ref_id)
+            )
+
+    @staticmethod
+    def search(user_id, query, kind, limit=20, offset=0):
+        """
+        Trả về các bản ghi của `kind` khớp với mọi token trong `query`
+        (token cuối được so khớp theo tiền tố), sắp xếp theo độ liên quan
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        backend = SearchService.backend()
+        model = SEARCH_KINDS[kind][0]
+        if backend == 'fulltext':
+            ids = SearchService._search_fulltext(user_id, tokens, kind, limit, offset)
+        elif backend == 'fts5':
+            ids = SearchService._search_fts5(user_id, tokens, kind, limit, offset)
+        else:
+            ids = SearchService._search_tokens(user_id, tokens, kind, limit, offset)
+
+        if not ids:
+            return []
+        rows = {row.id: row for row in model.query.filter(model.id.in_(ids))}
+        return [rows[ref_id] for ref_id in ids if ref_id in rows]
+
+    @staticmethod
+    def _search_fulltext(user_id, tokens, kind, limit, offset):
+        # Token đã gắn phạm vi user/kind nên không cần lọc thêm theo user_id và kind
+        scoped = scoped_tokens(user_id, kind, tokens)
+        if not scoped:
+            return []
+        *exact, prefix = scoped
+        terms = ' '.join(f'+{token}' for token in exact) + f' +{prefix}*'
+        rows = db.session.execute(
+            text(f'SELECT ref_id FROM {FTS_TABLE} WHERE MATCH(body) AGAINST(:terms IN BOOLEAN MODE) '
+                 'ORDER BY MATCH(body) AGAINST(:terms IN BOOLEAN MODE) DESC, ref_id DESC '
+                 'LIMIT :limit OFFSET :offset'),
+            {'terms': terms.strip(), 'limit': limit, 'offset': offset}
+        )
+        return [row.ref_id for row in rows]
+
+    @staticmethod
+    def _search_fts5(user_id, tokens, kind, limit, offset):
+        scoped = scoped_tokens(user_id, kind, tokens)
+        if not scoped:
+            return []
+        *exact, prefix = scoped
+        terms = ' '.join(f'"{token}"' for token in exact) + f' "{prefix}"*'
+        rows = db.session.execute(
+            text(f'SELECT ref_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :terms '
+                 'ORDER BY rank LIMIT :limit OFFSET :offset'),
+            {'terms': terms.strip(), 'limit': limit, 'offset': offset}
+        )
+        return [row.ref_id for row in rows]
+
+    @staticmethod
+    def _search_tokens(user_id, tokens, kind, limit, offset):
+        *exact, prefix = tokens
+        conditions = [SearchToken.token == token for token in set(exact)]
+        conditions.append(and_(SearchToken.token >= prefix, SearchToken.token < prefix + '\uffff'))
+        rows = db.session.execute(
+            select(SearchToken.token, SearchToken.ref_id, SearchToken.weight).where(
+                SearchToken.user_id == user_id,
+                SearchToken.kind == kind,
+                or_(*conditions)
+            )
+        ).all()
+
+        # tf theo từng token của câu truy vấn, chỉ giữ tài liệu chứa đủ mọi token
+        terms = set(tokens)
+        postings = {term: {} for term in terms}
+        for row in rows:
+            for term in terms:
+                if row.token == term or (term == prefix and row.token.startswith(prefix)):
+                    postings[term][row.ref_id] = postings[term].get(row.ref_id, 0) + row.weight
+        if not all(postings.values()):
+            return []
+
+        scores = None
+        for term, documents in postings.items():
+            matched = set(documents) if scores is None else set(documents) & set(scores)
+            scores = {
+                ref_id: (scores or {}).get(ref_id, 0) + documents[ref_id] / len(documents)
+                for ref_id in matched
+            }
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return [ref_id for ref_id, _ in ranked[offset:offset + limit]]
+
+    @staticmethod
+    def reindex(user_id=None):
+        """Xây lại chỉ mục từ các bảng gốc, trả về số bản ghi đã đánh chỉ mục"""
+        backend = SearchService.backend()
+        if backend in DOCUMENT_BACKENDS:
+            if user_id is None:
+                db.session.execute(text(f'DELETE FROM {FTS_TABLE}'))
+            else:
+                db.session.execute(text(f'DELETE FROM {FTS_TABLE} WHERE user_id = :user_id'), {'user_id': int(user_id)})
+        else:
+            stmt = delete(SearchToken)
+            if user_id is not None:
+                stmt = stmt.where(SearchToken.user_id == user_id)
+            db.session.execute(stmt)
+
+        count = 0
+        for kind, (model, columns, _) in SEARCH_KINDS.items():
+            query = model.query
+            if user_id is not None:
+                query = query.filter(model.user_id == user_id)
+            for obj in query.yield_per(1000):
+                SearchService._insert(backend, kind, obj)
+                count += 1
+        db.session.commit()
+        return count
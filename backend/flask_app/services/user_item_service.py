@@ -1,4 +1,7 @@
 from flask_app.models.user_item import UserItem
+from flask_app.services.rollup_service import RollupService
+from flask_app.utils import paginate_keyset, select_columns
+from flask_app.services.search_service import SearchService
 from flask_app import db
 
 class UserItemService:
@@ -14,6 +17,8 @@ class UserItemService:
             description=description
         )
         db.session.add(user_item)
+        RollupService.track(user_item)
+        SearchService.index(user_item)
         db.session.commit()
         return user_item
 
@@ -25,16 +30,28 @@ class UserItemService:
     def get_all_user_items(user_id):
         return UserItem.query.filter_by(user_id=user_id).all()
 
+    @staticmethod
+    def get_user_items_page(user_id, cursor=None, limit=50, fields=None):
+        if fields:
+            # Chỉ đọc các cột được yêu cầu (cùng cột keyset), trả về Row thay vì entity
+            query = select_columns(UserItem, fields, UserItem.created_at, UserItem.id).where(UserItem.user_id == user_id)
+        else:
+            query = UserItem.query.filter_by(user_id=user_id)
+        return paginate_keyset(query, UserItem.created_at, UserItem.id, cursor, limit)
+
     @staticmethod
     def update_user_item(item_id, user_id, **kwargs):
         user_item = UserItem.query.filter_by(id=item_id, user_id=user_id).first()
         if not user_item:
             return None
-            
+
+        before = RollupService.snapshot(user_item)
         for key, value in kwargs.items():
             if hasattr(user_item, key):
                 setattr(user_item, key, value)
-        
+        RollupService.track_change(before, user_item)
+        SearchService.index(user_item)
+
         db.session.commit()
         return user_item
 
@@ -42,6 +59,8 @@ class UserItemService:
     def delete_user_item(item_id, user_id):
         user_item = UserItem.query.filter_by(id=item_id, user_id=user_id).first()
         if user_item:
+            RollupService.track(user_item, sign=-1)
+            SearchService.remove(user_item)
             db.session.delete(user_item)
             db.session.commit()
             return True
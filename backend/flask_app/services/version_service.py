@@ -0,0 +1,63 @@
+from sqlalchemy import select
+from flask_app.models.expense import Expense
+from flask_app.models.income import Income
+from flask_app.models.notification import Notification
+from flask_app.models.user_item import UserItem
+from flask_app.models.version import CollectionVersion
+from flask_app.utils import upsert
+from flask_app import db
+
+# model -> tên danh sách dùng trong collection_versions và ETag
+MODEL_COLLECTIONS = {
+    Expense: 'expenses',
+    Income: 'incomes',
+    Notification: 'notifications',
+    UserItem: 'user_items'
+}
+# Phiên bản của các bảng rollup, tăng khi rollup được tính lại ngoài luồng ghi thông thường
+ROLLUP_COLLECTION = 'rollups'
+
+
+class VersionService:
+    """
+    Phiên bản của danh sách (theo người dùng) và của từng dòng, dùng làm
+    validator cho ETag / If-None-Match / If-Match mà không cần đọc dữ liệu.
+    """
+
+    @staticmethod
+    def get(user_id, collection):
+        version = db.session.execute(
+            select(CollectionVersion.version).where(
+                CollectionVersion.user_id == user_id,
+                CollectionVersion.collection == collection
+            )
+        ).scalar()
+        return version or 0
+
+    @staticmethod
+    def get_many(user_id, collections):
+        """Phiên bản của nhiều danh sách bằng một câu lệnh, theo thứ tự của `collections`"""
+        versions = dict(db.session.execute(
+            select(CollectionVersion.collection, CollectionVersion.version).where(
+                CollectionVersion.user_id == user_id,
+                CollectionVersion.collection.in_(collections)
+            )
+        ).all())
+        return tuple(versions.get(collection, 0) for collection in collections)
+
+    @staticmethod
+    def bump(user_id, collection, connection=None):
+        """Tăng phiên bản của danh sách trong transaction hiện tại"""
+        upsert(
+            CollectionVersion,
+            {'user_id': int(user_id), 'collection': collection},
+            {'version': 1},
+            connection=connection
+        )
+
+    @staticmethod
+    def get_row_version(model, row_id, user_id):
+        """Phiên bản của một dòng, None nếu không tồn tại hoặc không thuộc user"""
+        return db.session.execute(
+            select(model.version).where(model.id == row_id, model.user_id == user_id)
+        ).scalar()
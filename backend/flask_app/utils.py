@@ -1,7 +1,14 @@
-from datetime import datetime, timedelta
-from flask import jsonify
+from datetime import datetime, date, time, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+import base64
+import hashlib
+import json
+from flask import jsonify, request, current_app, make_response
 from functools import wraps
+from sqlalchemy import and_, or_, insert, update, select, Select
+from sqlalchemy.orm.exc import StaleDataError
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_app import db
 
 # Utility functions for the application
 
@@ -12,6 +19,22 @@ def validate_date(date_str, date_format='%Y-%m-%d'):
     except ValueError:
         return None
 
+def parse_datetime(value):
+    """
+    Convert a datetime, date or ISO 8601 string to a naive UTC datetime
+    """
+    if value is None:
+        return value
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        return datetime.combine(value, time.min)
+    else:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 def calculate_time_period(period):
     """
     Calculate start and end date based on period string
@@ -46,7 +69,7 @@ def admin_required(fn):
         verify_jwt_in_request()
         current_user_id = get_jwt_identity()
         
-        if current_user_id != 1:
+        if int(current_user_id) != 1:
             return jsonify({"error": "Cần có quyền truy cập của quản trị viên"}), 403
         return fn(*args, **kwargs)
     return wrapper
@@ -59,6 +82,8 @@ def handle_db_errors(fn):
     def wrapper(*args, **kwargs):
         try:
             return fn(*args, **kwargs)
+        except StaleDataError:
+            return stale_row_response()
         except Exception as e:
             return jsonify({
                 "error": "Thao tác cơ sở dữ liệu không thành công",
@@ -82,6 +107,217 @@ def generate_monthly_labels(start_date, end_date):
     
     return labels
 
+def encode_cursor(*values):
+    """
+    Encode keyset values into an opaque, URL-safe cursor token
+    """
+    payload = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    token = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode())
+    return token.decode().rstrip('=')
+
+def decode_cursor(token):
+    """
+    Decode a cursor token produced by encode_cursor into (sort_value, id)
+    Raises ValueError for malformed tokens
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        sort_value, last_id = json.loads(raw)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(last_id, int):
+        raise ValueError('Invalid cursor')
+    return parse_datetime(sort_value), last_id
+
+def get_page_args():
+    """
+    Read `cursor` and `limit` query parameters
+    Raises ValueError for malformed values
+    """
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', type=int) or current_app.config['PAGE_SIZE']
+    if limit < 1:
+        raise ValueError('Invalid limit')
+    limit = min(limit, current_app.config['MAX_PAGE_SIZE'])
+    return (decode_cursor(cursor) if cursor else None), limit
+
+def get_fields_arg(schema):
+    """
+    Read the `fields` query parameter (comma separated) as a tuple of field
+    names of `schema`, or None when absent
+    Raises ValueError for unknown fields
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in schema.dump_fields]
+    if not fields or unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    return fields
+
+def parse_id_list(values, required=True):
+    """
+    Validate a JSON list of integer ids (at most BULK_MAX_IDS, duplicates
+    removed); returns None when absent and not `required`
+    Raises ValueError for malformed or oversized lists
+    """
+    if values is None and not required:
+        return None
+    if not isinstance(values, list) or not values:
+        raise ValueError('ids must be a non-empty list')
+    if any(not isinstance(value, int) or isinstance(value, bool) for value in values):
+        raise ValueError('ids must be integers')
+    ids = list(dict.fromkeys(values))
+    if len(ids) > current_app.config['BULK_MAX_IDS']:
+        raise ValueError('Too many ids')
+    return ids
+
+def select_columns(model, fields, *required):
+    """
+    Core select of only the columns named in `fields` plus `required`
+    columns (e.g. the keyset columns); rows come back as lightweight Row
+    objects instead of ORM entities
+    """
+    names = dict.fromkeys((*fields, *(column.key for column in required)))
+    return select(*(model.__table__.c[name] for name in names))
+
+def paginate_keyset(query, sort_column, id_column, cursor=None, limit=50):
+    """
+    Keyset pagination ordered by (sort_column, id_column) descending,
+    rows with a NULL sort_column come last. Never uses OFFSET, so every
+    page costs the same as the first one.
+    `query` is either an ORM Query or a Core Select (see select_columns)
+    Returns (items, next_cursor)
+    """
+    def fetch(page):
+        if isinstance(page, Select):
+            return db.session.execute(page).all()
+        return page.all()
+
+    items = []
+    if cursor is None or cursor[0] is not None:
+        page = query.filter(sort_column.isnot(None))
+        if cursor is not None:
+            value, last_id = cursor
+            page = page.filter(
+                sort_column <= value,
+                or_(sort_column < value, and_(sort_column == value, id_column < last_id))
+            )
+        items = fetch(page.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1))
+
+    if len(items) <= limit:
+        page = query.filter(sort_column.is_(None))
+        if cursor is not None and cursor[0] is None:
+            page = page.filter(id_column < cursor[1])
+        items += fetch(page.order_by(id_column.desc()).limit(limit + 1 - len(items)))
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return items, next_cursor
+
+def date_window(start_date=None, end_date=None):
+    """
+    Convert an inclusive range of days to a half-open datetime window
+    [start, end), so the whole last day is included and the predicates
+    stay plain range scans on the (user_id, date) index
+    """
+    start = datetime.combine(start_date, time.min) if start_date else None
+    end = datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None
+    return start, end
+
+def _parse_amount(value):
+    if value is None or value == '':
+        return None
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'Invalid amount: {value}')
+    if not amount.is_finite():
+        raise ValueError(f'Invalid amount: {value}')
+    return amount
+
+def get_filter_args():
+    """
+    Read the transaction list filters: `period` (see calculate_time_period),
+    `from`/`to` (YYYY-MM-DD, inclusive), `category` (comma separated) and
+    `min_amount`/`max_amount`; `period` and `from`/`to` are intersected
+    Returns a dict of start, end, categories, min_amount, max_amount (None when absent)
+    Raises ValueError for malformed values
+    """
+    start_date = end_date = None
+    period = request.args.get('period')
+    if period:
+        start_date, end_date = calculate_time_period(period)
+        if start_date is None:
+            raise ValueError(f'Invalid period: {period}')
+    for name in ('from', 'to'):
+        raw = request.args.get(name)
+        if not raw:
+            continue
+        day = validate_date(raw)
+        if day is None:
+            raise ValueError(f'Invalid date: {raw}')
+        if name == 'from':
+            start_date = max(start_date, day) if start_date else day
+        else:
+            end_date = min(end_date, day) if end_date else day
+
+    start, end = date_window(start_date, end_date)
+    categories = tuple(dict.fromkeys(
+        name.strip() for name in request.args.get('category', '').split(',') if name.strip()
+    ))
+    return {
+        'start': start,
+        'end': end,
+        'categories': categories or None,
+        'min_amount': _parse_amount(request.args.get('min_amount')),
+        'max_amount': _parse_amount(request.args.get('max_amount')),
+    }
+
+def filter_conditions(model, filters):
+    """
+    SQL predicates on a transaction model (Expense, Income) for the filters
+    returned by get_filter_args
+    """
+    if not filters:
+        return []
+    conditions = []
+    if filters.get('start') is not None:
+        conditions.append(model.date >= filters['start'])
+    if filters.get('end') is not None:
+        conditions.append(model.date < filters['end'])
+    if filters.get('categories'):
+        conditions.append(model.category.in_(filters['categories']))
+    if filters.get('min_amount') is not None:
+        conditions.append(model.amount >= filters['min_amount'])
+    if filters.get('max_amount') is not None:
+        conditions.append(model.amount <= filters['max_amount'])
+    return conditions
+
+def summary_headers(count, total):
+    """
+    Response headers carrying the row count and amount total of the
+    filtered window (across all pages)
+    """
+    return {'X-Total-Count': str(count), 'X-Total-Amount': f'{total:.2f}'}
+
+def page_headers(next_cursor):
+    """
+    Response headers carrying the cursor of the next page, if any
+    """
+    return {'X-Next-Cursor': next_cursor} if next_cursor else {}
+
+def partial_headers(timed_out):
+    """
+    Response headers flagging a partial result: X-Partial is true when some
+    parts (listed comma separated in X-Timed-Out) missed their deadline
+    """
+    return {'X-Partial': 'true' if timed_out else 'false', 'X-Timed-Out': ','.join(timed_out)}
+
 def build_response(data=None, message="Success", status=200, error=None):
     """
     Standardize API response format
@@ -112,4 +348,123 @@ def parse_request_data(schema):
                 )
             return fn(data, *args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+def upsert(model, keys, deltas, connection=None):
+    """
+    Add `deltas` to the row identified by `keys`, inserting it if missing
+    Runs in the current transaction of db.session (or `connection`)
+    """
+    executor = connection if connection is not None else db.session
+    bind = connection if connection is not None else db.session.get_bind()
+    dialect = bind.dialect.name
+    table = model.__table__
+    values = {**keys, **deltas}
+
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update(
+            {name: table.c[name] + stmt.inserted[name] for name in deltas}
+        )
+        executor.execute(stmt)
+        return
+
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + stmt.excluded[name] for name in deltas}
+        )
+        executor.execute(stmt)
+        return
+
+    result = executor.execute(
+        update(table)
+        .where(*[table.c[name] == value for name, value in keys.items()])
+        .values({name: table.c[name] + value for name, value in deltas.items()})
+    )
+    if result.rowcount == 0:
+        executor.execute(insert(table).values(**values))
+
+def collection_etag(collection):
+    """
+    Decorator for list endpoints: answer 304 Not Modified when If-None-Match
+    matches the user's collection version, without running the view
+    The ETag also covers the query string, since it selects the page
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            from flask_app.services.version_service import VersionService
+
+            version = VersionService.get(get_jwt_identity(), collection)
+            key = request.query_string
+            if request.args.get('period'):
+                # A relative period selects a different window every day
+                key += datetime.utcnow().date().isoformat().encode()
+            digest = hashlib.sha1(key).hexdigest()[:12]
+            etag = f'{collection}.{version}.{digest}'
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def stale_row_response():
+    """
+    412 response for a write that lost a race on a versioned row: either
+    If-Match did not match, or the row version changed between load and
+    flush (StaleDataError); the failed transaction is rolled back
+    """
+    db.session.rollback()
+    return jsonify({'error': 'Dữ liệu đã bị thay đổi, hãy tải lại'}), 412
+
+def row_etag(model, id_arg):
+    """
+    Decorator for detail endpoints backed by a versioned row
+    GET honours If-None-Match (304), writes honour If-Match (412); both are
+    checked against the row version alone, before the view loads anything.
+    A concurrent write that bumps the version before this one flushes also
+    ends in 412 instead of a 500
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            from flask_app.services.version_service import VersionService
+
+            user_id = get_jwt_identity()
+            row_id = kwargs[id_arg]
+            version = VersionService.get_row_version(model, row_id, user_id)
+            if version is not None:
+                etag = f'{model.__tablename__}.{row_id}.{version}'
+                if request.method in ('GET', 'HEAD') and request.if_none_match.contains_weak(etag):
+                    response = current_app.response_class(status=304)
+                    response.set_etag(etag)
+                    return response
+                if request.if_match and not request.if_match.contains(etag):
+                    return stale_row_response()
+
+            try:
+                response = make_response(fn(*args, **kwargs))
+            except StaleDataError:
+                return stale_row_response()
+            if response.status_code == 200 and request.method != 'DELETE':
+                if request.method not in ('GET', 'HEAD'):
+                    version = VersionService.get_row_version(model, row_id, user_id)
+                if version is not None:
+                    response.set_etag(f'{model.__tablename__}.{row_id}.{version}')
+                    response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,34 @@
+"""Composite indexes for per-user access paths
+
+Revision ID: 0a406a3bb67c
+Revises: 3c5a19e49897
+Create Date: 2026-10-17 10:03:27.518830
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a406a3bb67c'
+down_revision = '3c5a19e49897'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_expenses_user_id_date', 'expenses', ['user_id', 'date'], unique=False)
+    op.create_index('ix_incomes_user_id_date', 'incomes', ['user_id', 'date'], unique=False)
+    op.create_index('ix_notifications_user_id_created_at', 'notifications', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_notifications_user_id_is_read', 'notifications', ['user_id', 'is_read'], unique=False)
+    op.create_index('ix_user_items_user_id_name', 'user_items', ['user_id', 'name'], unique=False)
+    op.create_index('ix_user_items_user_id_created_at', 'user_items', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_items_user_id_created_at', table_name='user_items')
+    op.drop_index('ix_user_items_user_id_name', table_name='user_items')
+    op.drop_index('ix_notifications_user_id_is_read', table_name='notifications')
+    op.drop_index('ix_notifications_user_id_created_at', table_name='notifications')
+    op.drop_index('ix_incomes_user_id_date', table_name='incomes')
+    op.drop_index('ix_expenses_user_id_date', table_name='expenses')
@@ -0,0 +1,115 @@
+"""Full-text search indexes
+
+Revision ID: 20b29bce3ddd
+Revises: 0a406a3bb67c
+Create Date: 2026-10-17 11:20:54.771902
+
+"""
+from collections import Counter
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20b29bce3ddd'
+down_revision = '0a406a3bb67c'
+branch_labels = None
+depends_on = None
+
+# kind -> (bảng, các cột văn bản, mã rowid) như SEARCH_KINDS của search_service
+SEARCH_TABLES = {
+    'expenses': ('expenses', ('description',), 1),
+    'incomes': ('incomes', ('description',), 2),
+    'notifications': ('notifications', ('title', 'description'), 3),
+    'user_items': ('user_items', ('name',), 4),
+}
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    op.create_table('search_tokens',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=64), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('ref_id', sa.Integer(), nullable=False),
+    sa.Column('weight', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'token', 'kind', 'ref_id')
+    )
+    op.create_index('ix_search_tokens_kind_ref_id', 'search_tokens', ['kind', 'ref_id'], unique=False)
+
+    bind = op.get_bind()
+    documents = False
+    if bind.dialect.name == 'mysql':
+        op.create_table('search_documents',
+        sa.Column('rowid', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('ref_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('rowid'),
+        mysql_engine='InnoDB'
+        )
+        op.create_index('ix_search_documents_user_id', 'search_documents', ['user_id'], unique=False)
+        op.create_index('ft_search_documents_body', 'search_documents', ['body'], unique=False, mysql_prefix='FULLTEXT')
+        documents = True
+    elif bind.dialect.name == 'sqlite':
+        if bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar():
+            op.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS search_documents '
+                'USING fts5(body, user_id UNINDEXED, kind UNINDEXED, ref_id UNINDEXED)'
+            )
+            documents = True
+
+    backfill(bind, documents)
+
+
+def backfill(bind, documents):
+    """Đánh chỉ mục dữ liệu đã có giống `SearchService.reindex`"""
+    # Tách token (bỏ dấu tiếng Việt) phải làm ở Python, dùng lại hàm của service
+    # để chỉ mục của migration giống hệt chỉ mục do ứng dụng ghi
+    from flask_app.services.search_service import tokenize, scoped_tokens, ROWID_FACTOR
+
+    if documents:
+        target = sa.table('search_documents', sa.column('rowid'), sa.column('body'), sa.column('user_id'),
+                          sa.column('kind'), sa.column('ref_id'))
+    else:
+        target = sa.table('search_tokens', sa.column('user_id'), sa.column('token'), sa.column('kind'),
+                          sa.column('ref_id'), sa.column('weight'))
+
+    for kind, (name, columns, code) in SEARCH_TABLES.items():
+        source = sa.table(name, sa.column('id'), sa.column('user_id'), *[sa.column(column) for column in columns])
+        result = bind.execute(sa.select(source).order_by(source.c.id))
+        while True:
+            rows = result.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            values = []
+            for row in rows:
+                tokens = [token for column in columns for token in tokenize(row._mapping[column])]
+                if not tokens:
+                    continue
+                if documents:
+                    values.append({
+                        'rowid': row.id * ROWID_FACTOR + code,
+                        'body': ' '.join(scoped_tokens(row.user_id, kind, tokens)),
+                        'user_id': int(row.user_id),
+                        'kind': kind,
+                        'ref_id': row.id
+                    })
+                else:
+                    values.extend(
+                        {'user_id': row.user_id, 'token': token, 'kind': kind, 'ref_id': row.id, 'weight': weight}
+                        for token, weight in Counter(tokens).items()
+                    )
+            if values:
+                op.bulk_insert(target, values)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name in ('mysql', 'sqlite'):
+        op.execute('DROP TABLE IF EXISTS search_documents')
+
+    op.drop_index('ix_search_tokens_kind_ref_id', table_name='search_tokens')
+    op.drop_table('search_tokens')
@@ -0,0 +1,93 @@
+"""Rollup tables for dashboard
+
+Revision ID: 3c5a19e49897
+Revises: 34a6ef99c60a
+Create Date: 2026-10-17 09:12:41.203518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5a19e49897'
+down_revision = '34a6ef99c60a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_income', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('total_expense', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('total_debt', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('daily_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'kind', 'day')
+    )
+    op.create_table('monthly_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'kind', 'year', 'month')
+    )
+    op.create_table('category_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'kind', 'category')
+    )
+
+    backfill()
+
+
+def backfill():
+    """Tính các bảng rollup từ dữ liệu hiện có (giống RollupService.rebuild)"""
+    op.execute(
+        "INSERT INTO user_totals (user_id, total_income, total_expense, total_debt) "
+        "SELECT users.id, "
+        "COALESCE((SELECT SUM(amount) FROM incomes WHERE incomes.user_id = users.id), 0), "
+        "COALESCE((SELECT SUM(amount) FROM expenses WHERE expenses.user_id = users.id), 0), "
+        "COALESCE((SELECT SUM(balance) FROM user_items WHERE user_items.user_id = users.id), 0) "
+        "FROM users WHERE users.id IN ("
+        "SELECT user_id FROM expenses UNION SELECT user_id FROM incomes UNION SELECT user_id FROM user_items)"
+    )
+
+    daily = sa.table('daily_rollups', *(sa.column(name) for name in ('user_id', 'kind', 'day', 'total', 'count')))
+    monthly = sa.table('monthly_rollups', *(sa.column(name) for name in ('user_id', 'kind', 'year', 'month', 'total', 'count')))
+    category = sa.table('category_rollups', *(sa.column(name) for name in ('user_id', 'kind', 'category', 'total', 'count')))
+    for kind, table_name in (('expense', 'expenses'), ('income', 'incomes')):
+        source = sa.table(table_name, sa.column('user_id'), sa.column('category'), sa.column('amount'), sa.column('date'))
+        day = sa.func.date(source.c.date)
+        year = sa.extract('year', source.c.date)
+        month = sa.extract('month', source.c.date)
+        for target, keys in ((daily, [day]), (monthly, [year, month]), (category, [source.c.category])):
+            query = sa.select(
+                source.c.user_id, sa.literal(kind), *keys, sa.func.sum(source.c.amount), sa.func.count()
+            ).group_by(source.c.user_id, *keys)
+            if target is not category:
+                query = query.where(source.c.date.isnot(None))
+            op.execute(sa.insert(target).from_select([column.name for column in target.c], query))
+
+
+def downgrade():
+    op.drop_table('category_rollups')
+    op.drop_table('monthly_rollups')
+    op.drop_table('daily_rollups')
+    op.drop_table('user_totals')
@@ -0,0 +1,38 @@
+"""Unread notification counter on user_totals
+
+Revision ID: 3f225adbf221
+Revises: fa16b06c443b
+Create Date: 2026-10-17 15:06:52.381940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f225adbf221'
+down_revision = 'fa16b06c443b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_totals', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unread_notifications', sa.Integer(), server_default='0', nullable=False))
+
+    # Khởi tạo bộ đếm từ dữ liệu hiện có
+    op.execute(
+        "INSERT INTO user_totals (user_id, total_income, total_expense, total_debt, unread_notifications) "
+        "SELECT DISTINCT user_id, 0, 0, 0, 0 FROM notifications "
+        "WHERE user_id NOT IN (SELECT user_id FROM user_totals)"
+    )
+    op.execute(
+        "UPDATE user_totals SET unread_notifications = ("
+        "SELECT COUNT(*) FROM notifications "
+        "WHERE notifications.user_id = user_totals.user_id AND (notifications.is_read IS NULL OR notifications.is_read = 0))"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('user_totals', schema=None) as batch_op:
+        batch_op.drop_column('unread_notifications')
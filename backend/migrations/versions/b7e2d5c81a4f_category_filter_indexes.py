@@ -0,0 +1,26 @@
+"""Indexes for category filters on transaction lists
+
+Revision ID: b7e2d5c81a4f
+Revises: 3f225adbf221
+Create Date: 2026-10-17 18:22:41.093517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d5c81a4f'
+down_revision = '3f225adbf221'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_expenses_user_id_category_date', 'expenses', ['user_id', 'category', 'date'], unique=False)
+    op.create_index('ix_incomes_user_id_category_date', 'incomes', ['user_id', 'category', 'date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_incomes_user_id_category_date', table_name='incomes')
+    op.drop_index('ix_expenses_user_id_category_date', table_name='expenses')
@@ -0,0 +1,30 @@
+"""Per-user collection versions
+
+Revision ID: c2d5e8a1f4b7
+Revises: 20b29bce3ddd
+Create Date: 2026-10-17 11:52:37.418306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d5e8a1f4b7'
+down_revision = '20b29bce3ddd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('collection_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('collection', sa.String(length=20), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'collection')
+    )
+
+
+def downgrade():
+    op.drop_table('collection_versions')
@@ -0,0 +1,31 @@
+"""Monthly balance checkpoints for balance history
+
+Revision ID: d41c7a9e6b20
+Revises: b7e2d5c81a4f
+Create Date: 2026-10-17 21:05:13.482671
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c7a9e6b20'
+down_revision = 'b7e2d5c81a4f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('balance_checkpoints',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('total_income', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('total_expense', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'month')
+    )
+
+
+def downgrade():
+    op.drop_table('balance_checkpoints')
@@ -0,0 +1,30 @@
+"""Row versions for ETags and optimistic locking
+
+Revision ID: fa16b06c443b
+Revises: c2d5e8a1f4b7
+Create Date: 2026-10-17 13:41:08.274905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fa16b06c443b'
+down_revision = 'c2d5e8a1f4b7'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('expenses', 'incomes', 'notifications', 'user_items')
+
+
+def upgrade():
+    for table in VERSIONED_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for table in reversed(VERSIONED_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('version')